@@ -33,14 +33,7 @@ class Agent:
 
     def _get_tool_definitions(self) -> list[ToolDefinition]:
         """Convert tools to LLM-compatible definitions"""
-        return [
-            ToolDefinition(
-                name=tool.name,
-                description=tool.description,
-                parameters=tool.parameters
-            )
-            for tool in self.tools.values()
-        ]
+        return [ToolDefinition(**tool.to_definition()) for tool in self.tools.values()]
 
     async def run(
         self,
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Depends
+from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Depends, Response
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import Literal, List, Dict, Any, Optional
@@ -44,6 +44,7 @@ class WorkflowCreateRequest(BaseModel):
     steps: List[Dict[str, Any]]
     variables: Dict[str, Any] = {}
     tags: List[str] = []
+    parallel: bool = False
 
 
 class ScheduleRequest(BaseModel):
@@ -560,7 +561,8 @@ async def create_workflow(request: WorkflowCreateRequest):
         description=request.description,
         steps=request.steps,
         variables=request.variables,
-        tags=request.tags
+        tags=request.tags,
+        parallel=request.parallel
     )
 
     return {"id": workflow.id, "name": workflow.name, "status": "created"}
@@ -581,7 +583,7 @@ async def list_workflows(tags: str = None, search: str = None):
                 "id": w.id,
                 "name": w.name,
                 "description": w.description,
-                "steps_count": len(w.steps),
+                "steps_count": w.steps_count,
                 "tags": w.tags,
                 "updated_at": w.updated_at.isoformat() if w.updated_at else None
             }
@@ -704,22 +706,8 @@ async def list_scheduled_tasks():
     if not scheduler:
         return {"tasks": []}
 
-    tasks = await scheduler.list_tasks()
-    return {
-        "tasks": [
-            {
-                "id": t.id,
-                "workflow_id": t.workflow_id,
-                "name": t.name,
-                "enabled": t.enabled,
-                "last_run": t.last_run.isoformat() if t.last_run else None,
-                "next_run": t.next_run.isoformat() if t.next_run else None,
-                "run_count": t.run_count
-            }
-            for t in tasks
-        ],
-        "stats": scheduler.get_stats()
-    }
+    # Already-encoded JSON: skips FastAPI's jsonable_encoder walk over every task
+    return Response(content=scheduler.list_tasks_json(), media_type="application/json")
 
 
 @router.post("/schedule/{task_id}/pause")
@@ -766,14 +754,8 @@ async def cancel_task(task_id: str):
 async def list_tools():
     tools = _components.get("tools", {})
     return {
-        "tools": [
-            {
-                "name": name,
-                "description": tool.description,
-                "parameters": tool.parameters
-            }
-            for name, tool in tools.items()
-        ]
+        # Listed under the registry key, which can differ from tool.name
+        "tools": [{**tool.to_definition(), "name": name} for name, tool in tools.items()]
     }
 
 
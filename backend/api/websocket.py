@@ -53,9 +53,26 @@ async def websocket_endpoint(websocket: WebSocket, components: Dict[str, Any]):
         ))
 
     if workflow_engine:
-        workflow_engine.add_event_handler(lambda e: asyncio.create_task(
-            manager.send_event(websocket, e["type"], e["data"])
-        ))
+        # Batched: one task per batch instead of per event, and the events
+        # still go out as individual messages, in order
+        async def forward_workflow_events(batch):
+            for event in batch["data"]["events"]:
+                await manager.send_event(websocket, event["type"], event["data"])
+
+        workflow_engine.add_event_handler(
+            lambda batch: asyncio.create_task(forward_workflow_events(batch)),
+            batched=True
+        )
+
+    scheduler_events = scheduler.subscribe() if scheduler else None
+    forward_task = None
+    if scheduler_events is not None:
+        async def forward_scheduler_events():
+            while True:
+                event = await scheduler_events.get()
+                await manager.send_event(websocket, event["type"], event["data"])
+
+        forward_task = asyncio.create_task(forward_scheduler_events())
 
     try:
         while True:
@@ -176,3 +193,7 @@ async def websocket_endpoint(websocket: WebSocket, components: Dict[str, Any]):
         manager.disconnect(websocket)
     except Exception as e:
         manager.disconnect(websocket)
+    finally:
+        if scheduler_events is not None:
+            forward_task.cancel()
+            scheduler.unsubscribe(scheduler_events)
@@ -29,7 +29,10 @@ else:
 # Disable asyncpg's prepared-statement cache when talking to a connection
 # pooler (e.g. Supabase pgbouncer) to avoid "prepared statement already exists".
 _connect_args = {"statement_cache_size": 0} if "asyncpg" in DATABASE_URL else {}
-engine = create_async_engine(DATABASE_URL, echo=False, connect_args=_connect_args)
+# Fixed-size pool for Postgres: enough connections for the API and scheduler
+# persistence to overlap, without overflow connections piling onto the server.
+_pool_args = {"pool_size": 20, "max_overflow": 0} if "asyncpg" in DATABASE_URL else {}
+engine = create_async_engine(DATABASE_URL, echo=False, connect_args=_connect_args, **_pool_args)
 # Create async session factory
 async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
@@ -47,9 +50,18 @@ async def init_db():
             await conn.run_sync(Base.metadata.drop_all)
             print("Database reset (RESET_DB enabled)")
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(_create_missing_indexes)
     print("Database initialized")
 
 
+def _create_missing_indexes(sync_conn):
+    """create_all() skips tables that already exist, so indexes added to the
+    models later would never reach existing databases"""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(sync_conn, checkfirst=True)
+
+
 async def get_db() -> AsyncSession:
     """Get a database session"""
     async with async_session() as session:
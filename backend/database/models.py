@@ -124,7 +124,6 @@ class ScheduledTaskModel(Base):
     """Persistent storage for scheduled workflow tasks"""
     __tablename__ = "scheduled_tasks"
     __table_args__ = (
-        Index('ix_scheduled_tasks_enabled', 'enabled'),
         Index('ix_scheduled_tasks_workflow_id', 'workflow_id'),
     )
 
@@ -139,3 +138,14 @@ class ScheduledTaskModel(Base):
     last_run = Column(DateTime(timezone=True), nullable=True)
     next_run = Column(DateTime(timezone=True), nullable=True)
     run_count = Column(Integer, default=0)
+
+
+# Partial index for startup recovery, which only ever reads enabled tasks. The
+# predicate is the same expression load_persisted_tasks filters on, so the
+# planner can match the two.
+Index(
+    'ix_scheduled_tasks_enabled_next_run',
+    ScheduledTaskModel.next_run,
+    postgresql_where=ScheduledTaskModel.enabled.is_(True),
+    sqlite_where=ScheduledTaskModel.enabled.is_(True),
+)
@@ -1,3 +1,4 @@
+import asyncio
 import os
 import sys
 from pathlib import Path
@@ -20,6 +21,7 @@ from tools import (
     ShellExecutorTool, APICallerTool, PDFReaderTool, ScreenshotTool,
     DatabaseTool, EmailSenderTool, GitOperationsTool, CalendarIntegrationTool
 )
+from tools.http_client import close_client as close_http_client
 from agents import (
     OrchestratorAgent, ResearcherAgent, CoderAgent,
     AnalystAgent, ExecutorAgent, AgentRole,
@@ -33,7 +35,7 @@ from workflows import WorkflowEngine, WorkflowManager, WorkflowScheduler
 from api.routes import router, set_components
 from api.websocket import websocket_endpoint
 from auth import auth_router
-from database.connection import init_db
+from database.connection import init_db, async_session
 from middleware.rate_limiter import RateLimitMiddleware
 
 # Create FastAPI app
@@ -202,7 +204,8 @@ def initialize_workflows():
     )
     components["scheduler"] = WorkflowScheduler(
         workflow_engine=components["workflow_engine"],
-        workflow_manager=components["workflow_manager"]
+        workflow_manager=components["workflow_manager"],
+        db_session_factory=async_session
     )
     print("Initialized workflow system")
 
@@ -238,6 +241,9 @@ async def initialize_all():
     initialize_agents()
     initialize_memory()
     initialize_workflows()
+    # Scheduled tasks live in the same database as the auth tables
+    await components["scheduler"].load_persisted_tasks()
+    await components["scheduler"].start()
 
     initialize_rag()
     await components["rag_pipeline"].init_store()
@@ -286,7 +292,21 @@ async def startup_event():
 @app.on_event("shutdown")
 async def shutdown_event():
     if components["scheduler"]:
-        components["scheduler"].shutdown()
+        await components["scheduler"].shutdown()
+
+    # Release pooled resources (connections, worker processes) held by tools
+    for tool in components["tools"].values():
+        close = getattr(tool, "close", None)
+        if close is None:
+            continue
+        try:
+            result = close()
+            if asyncio.iscoroutine(result):
+                await result
+        except Exception as e:
+            print(f"Error closing tool {tool.name}: {e}")
+
+    await close_http_client()
 
 
 @app.websocket("/ws")
@@ -2,11 +2,9 @@
 Pytest fixtures for AI Task Agent backend tests.
 """
 
-import asyncio
 import os
 import sys
 from pathlib import Path
-from typing import AsyncGenerator, Generator
 
 import pytest
 from fastapi.testclient import TestClient
@@ -16,17 +14,12 @@ from sqlalchemy.orm import sessionmaker
 # Add backend to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+# Same order as main.py: auth first, since database.connection imports
+# auth.models and auth's routes import database.connection
+import auth  # noqa: F401
 from database.models import Base
 
 
-@pytest.fixture(scope="session")
-def event_loop() -> Generator[asyncio.AbstractEventLoop, None, None]:
-    """Create an event loop for async tests."""
-    loop = asyncio.get_event_loop_policy().new_event_loop()
-    yield loop
-    loop.close()
-
-
 @pytest.fixture(scope="function")
 def test_db():
     """Create a temporary test database."""
@@ -0,0 +1,69 @@
+"""
+Tests for logging configuration.
+"""
+
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.logger import _BatchedRotatingFileHandler, setup_logging, shutdown_logging
+
+
+class TestBatchedRotatingFileHandler:
+    """Tests for the batched file handler."""
+
+    def test_size_counts_encoded_bytes(self):
+        """Test the tracked size matches the file for non-ASCII records."""
+        with tempfile.TemporaryDirectory() as log_dir:
+            path = os.path.join(log_dir, "app.log")
+            handler = _BatchedRotatingFileHandler(path, maxBytes=10_000, backupCount=1, encoding="utf-8")
+            try:
+                for _ in range(5):
+                    handler.handle(logging.makeLogRecord({"msg": "héllo wörld ✓", "levelno": logging.INFO}))
+                handler.flush()
+                assert handler._size == os.path.getsize(path)
+            finally:
+                handler.close()
+
+    def test_rolls_over_on_encoded_size(self):
+        """Test rollover triggers on bytes, not characters."""
+        with tempfile.TemporaryDirectory() as log_dir:
+            path = os.path.join(log_dir, "app.log")
+            handler = _BatchedRotatingFileHandler(path, maxBytes=100, backupCount=1, encoding="utf-8")
+            try:
+                # 30 characters but 90 bytes each
+                for _ in range(2):
+                    handler.handle(logging.makeLogRecord({"msg": "✓" * 30, "levelno": logging.INFO}))
+                assert os.path.exists(path + ".1")
+            finally:
+                handler.close()
+
+
+class TestSetupLogging:
+    """Tests for the queued logging setup."""
+
+    def test_idle_records_reach_file(self):
+        """Test a record is flushed once the queue drains, without a later record."""
+        root = logging.getLogger()
+        saved_handlers, saved_level = root.handlers[:], root.level
+        with tempfile.TemporaryDirectory() as log_dir:
+            try:
+                setup_logging(log_dir=log_dir)
+                logging.getLogger("test").warning("idle line")
+
+                log_file = Path(log_dir) / "app.log"
+                deadline = time.monotonic() + 0.5
+                while "idle line" not in log_file.read_text() and time.monotonic() < deadline:
+                    time.sleep(0.01)
+                assert "idle line" in log_file.read_text()
+            finally:
+                shutdown_logging()
+                for handler in root.handlers:
+                    handler.close()
+                root.handlers[:] = saved_handlers
+                root.setLevel(saved_level)
@@ -0,0 +1,173 @@
+"""
+Tests for the workflow scheduler.
+"""
+
+import asyncio
+import contextlib
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from workflows.scheduler import WorkflowScheduler
+
+
+class FakeExecution:
+    id = "exec"
+    status = "completed"
+
+
+class FakeEngine:
+    def __init__(self):
+        self.runs = 0
+        self.release = asyncio.Event()
+
+    async def execute(self, workflow, initial_context=None):
+        await self.release.wait()
+        self.runs += 1
+        return FakeExecution()
+
+
+class FakeManager:
+    async def get(self, workflow_id):
+        return object()
+
+
+class TestRunNow:
+    """Tests for triggering a scheduled task immediately."""
+
+    @pytest.mark.asyncio_cooperative
+    async def test_run_now_keeps_task_referenced_and_counts_run(self):
+        """Test the background run is held until done and updates the counters."""
+        engine = FakeEngine()
+        scheduler = WorkflowScheduler(engine, FakeManager())
+        try:
+            task = await scheduler.schedule("wf", "hourly", "interval", {"hours": 1})
+
+            assert await scheduler.run_now(task.id)
+            assert len(scheduler._background_tasks) == 1
+
+            engine.release.set()
+            await asyncio.gather(*scheduler._background_tasks)
+            await asyncio.sleep(0)
+
+            assert not scheduler._background_tasks
+            assert engine.runs == 1
+            stats = scheduler.get_stats()
+            assert (stats["total_tasks"], stats["enabled_tasks"], stats["total_runs"]) == (1, 1, 1)
+        finally:
+            await scheduler.shutdown()
+
+    @pytest.mark.asyncio_cooperative
+    async def test_run_now_unknown_task(self):
+        """Test run_now reports unknown task ids."""
+        scheduler = WorkflowScheduler(FakeEngine(), FakeManager())
+        try:
+            assert not await scheduler.run_now("missing")
+        finally:
+            await scheduler.shutdown()
+
+
+class TestStats:
+    """Tests for the incrementally maintained task counters."""
+
+    @pytest.mark.asyncio_cooperative
+    async def test_counters_follow_pause_resume_cancel(self):
+        """Test enabled/total counts stay in step with the task table."""
+        scheduler = WorkflowScheduler(FakeEngine(), FakeManager())
+        try:
+            first = await scheduler.schedule("wf", "a", "interval", {"minutes": 5})
+            second = await scheduler.schedule("wf", "b", "interval", {"minutes": 5})
+
+            await scheduler.pause(first.id)
+            stats = scheduler.get_stats()
+            assert (stats["total_tasks"], stats["enabled_tasks"], stats["disabled_tasks"]) == (2, 1, 1)
+
+            await scheduler.resume(first.id)
+            await scheduler.cancel(second.id)
+            stats = scheduler.get_stats()
+            assert (stats["total_tasks"], stats["enabled_tasks"], stats["disabled_tasks"]) == (1, 1, 0)
+        finally:
+            await scheduler.shutdown()
+
+
+class TestPersistence:
+    """Tests for writing scheduled tasks and run stats to the database."""
+
+    @staticmethod
+    @contextlib.asynccontextmanager
+    async def session_factory():
+        """Session factory for a scheduler database in a temporary directory"""
+        from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+        from database.models import Base
+
+        with tempfile.TemporaryDirectory() as data_dir:
+            engine = create_async_engine(f"sqlite+aiosqlite:///{data_dir}/test.db")
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+            try:
+                yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+            finally:
+                await engine.dispose()
+
+    @staticmethod
+    async def reloaded_run_count(session_factory, task_id: str) -> int:
+        restarted = WorkflowScheduler(FakeEngine(), FakeManager(), session_factory)
+        try:
+            await restarted.load_persisted_tasks()
+            assert restarted.get_stats()["total_runs"] == restarted.scheduled_tasks[task_id].run_count
+            return restarted.scheduled_tasks[task_id].run_count
+        finally:
+            await restarted.shutdown()
+
+    @pytest.mark.asyncio_cooperative
+    async def test_tasks_and_run_stats_survive_restart(self):
+        """Test a restarted scheduler reloads tasks with the flushed run counts."""
+        async with self.session_factory() as session_factory:
+            workflow_engine = FakeEngine()
+            workflow_engine.release.set()
+            scheduler = WorkflowScheduler(workflow_engine, FakeManager(), session_factory)
+            await scheduler.start()
+            task = await scheduler.schedule("wf", "hourly", "interval", {"hours": 1})
+            await scheduler.run_now(task.id)
+            await asyncio.gather(*scheduler._background_tasks)
+            # Shutdown writes out stats the flusher hasn't yet
+            await scheduler.shutdown()
+
+            assert await self.reloaded_run_count(session_factory, task.id) == 1
+
+    @pytest.mark.asyncio_cooperative
+    async def test_failed_flush_is_retried(self):
+        """Test run stats from a failed write stay queued for the next flush."""
+        async with self.session_factory() as session_factory:
+            database_down = False
+
+            def flaky_session_factory():
+                if database_down:
+                    raise ConnectionError("database unavailable")
+                return session_factory()
+
+            workflow_engine = FakeEngine()
+            workflow_engine.release.set()
+            scheduler = WorkflowScheduler(workflow_engine, FakeManager(), flaky_session_factory)
+            try:
+                task = await scheduler.schedule("wf", "hourly", "interval", {"hours": 1})
+
+                database_down = True
+                await scheduler.run_now(task.id)
+                await asyncio.gather(*scheduler._background_tasks)
+                await scheduler._flush_stats()
+                assert task.id in scheduler._dirty
+
+                database_down = False
+                await scheduler._flush_stats()
+                assert not scheduler._dirty
+            finally:
+                database_down = False
+                await scheduler.shutdown()
+
+            assert await self.reloaded_run_count(session_factory, task.id) == 1
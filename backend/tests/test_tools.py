@@ -4,7 +4,9 @@ Tests for tools functionality.
 
 import pytest
 import asyncio
+import json
 import sys
+import tempfile
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -13,13 +15,13 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 class TestCalculatorTool:
     """Tests for the calculator tool."""
 
-    @pytest.fixture
+    @pytest.fixture(scope="session")
     def calculator_tool(self):
         """Get calculator tool instance."""
         from tools.basic_tools import CalculatorTool
         return CalculatorTool()
 
-    @pytest.mark.asyncio
+    @pytest.mark.asyncio_cooperative
     async def test_addition(self, calculator_tool):
         """Test addition operation."""
         result = await calculator_tool.execute(
@@ -29,7 +31,7 @@ class TestCalculatorTool:
         )
         assert result["result"] == 8
 
-    @pytest.mark.asyncio
+    @pytest.mark.asyncio_cooperative
     async def test_subtraction(self, calculator_tool):
         """Test subtraction operation."""
         result = await calculator_tool.execute(
@@ -39,7 +41,7 @@ class TestCalculatorTool:
         )
         assert result["result"] == 6
 
-    @pytest.mark.asyncio
+    @pytest.mark.asyncio_cooperative
     async def test_multiplication(self, calculator_tool):
         """Test multiplication operation."""
         result = await calculator_tool.execute(
@@ -49,7 +51,7 @@ class TestCalculatorTool:
         )
         assert result["result"] == 42
 
-    @pytest.mark.asyncio
+    @pytest.mark.asyncio_cooperative
     async def test_division(self, calculator_tool):
         """Test division operation."""
         result = await calculator_tool.execute(
@@ -59,7 +61,7 @@ class TestCalculatorTool:
         )
         assert result["result"] == 5
 
-    @pytest.mark.asyncio
+    @pytest.mark.asyncio_cooperative
     async def test_division_by_zero(self, calculator_tool):
         """Test division by zero returns error."""
         result = await calculator_tool.execute(
@@ -69,7 +71,7 @@ class TestCalculatorTool:
         )
         assert "error" in result
 
-    @pytest.mark.asyncio
+    @pytest.mark.asyncio_cooperative
     async def test_power(self, calculator_tool):
         """Test power operation."""
         result = await calculator_tool.execute(
@@ -79,7 +81,7 @@ class TestCalculatorTool:
         )
         assert result["result"] == 1024
 
-    @pytest.mark.asyncio
+    @pytest.mark.asyncio_cooperative
     async def test_unknown_operation(self, calculator_tool):
         """Test unknown operation returns error."""
         result = await calculator_tool.execute(
@@ -93,19 +95,19 @@ class TestCalculatorTool:
 class TestDateTimeTool:
     """Tests for the datetime tool."""
 
-    @pytest.fixture
+    @pytest.fixture(scope="session")
     def datetime_tool(self):
         """Get datetime tool instance."""
         from tools.basic_tools import DateTimeTool
         return DateTimeTool()
 
-    @pytest.mark.asyncio
+    @pytest.mark.asyncio_cooperative
     async def test_current_time(self, datetime_tool):
         """Test getting current time."""
         result = await datetime_tool.execute(action="current")
         assert "current_time" in result or "datetime" in result
 
-    @pytest.mark.asyncio
+    @pytest.mark.asyncio_cooperative
     async def test_format_date(self, datetime_tool):
         """Test date formatting."""
         result = await datetime_tool.execute(
@@ -119,13 +121,13 @@ class TestDateTimeTool:
 class TestFileTools:
     """Tests for file operation tools."""
 
-    @pytest.fixture
+    @pytest.fixture(scope="session")
     def file_reader(self):
         """Get file reader tool instance."""
         from tools.basic_tools import FileReaderTool
         return FileReaderTool()
 
-    @pytest.mark.asyncio
+    @pytest.mark.asyncio_cooperative
     async def test_read_nonexistent_file(self, file_reader):
         """Test reading a file that doesn't exist."""
         result = await file_reader.execute(
@@ -191,3 +193,516 @@ class TestSafeExpressionEvaluator:
         # Should not be able to access builtins
         with pytest.raises((FeatureNotAvailable, Exception, NameError)):
             evaluator.eval("open('/etc/passwd')")
+
+
+class TestCodeExecutorTool:
+    """Tests for the code executor tool."""
+
+    @pytest.mark.asyncio_cooperative
+    async def test_runs_are_isolated(self):
+        """Test state from one snippet is not visible to the next."""
+        from tools.code_executor import CodeExecutorTool
+
+        with tempfile.TemporaryDirectory() as workspace:
+            tool = CodeExecutorTool(workspace)
+            await tool.execute(code="import os, sys\nos.environ['LEAK'] = '1'\nsys.modules['leak'] = sys")
+            result = await tool.execute(code="import os, sys\nprint(os.environ.get('LEAK'), 'leak' in sys.modules)")
+
+        assert result.success
+        assert "None False" in result.output
+
+    @pytest.mark.asyncio_cooperative
+    async def test_captures_fd_and_child_output(self):
+        """Test output written straight to fd 1 or by child processes is kept."""
+        from tools.code_executor import CodeExecutorTool
+
+        with tempfile.TemporaryDirectory() as workspace:
+            tool = CodeExecutorTool(workspace)
+            result = await tool.execute(
+                code="import os, subprocess\nos.write(1, b'raw\\n')\nsubprocess.run(['echo', 'child'])"
+            )
+
+        assert result.success
+        assert "raw" in result.output
+        assert "child" in result.output
+
+
+class TestAPICallerTool:
+    """Tests for the API caller tool."""
+
+    @pytest.mark.asyncio_cooperative
+    async def test_conditional_cache_is_keyed_by_headers(self):
+        """Test a cached body is never replayed for different credentials."""
+        from unittest.mock import patch
+
+        import httpx
+        from tools.api_caller import APICallerTool
+
+        def handler(request):
+            if request.headers.get("if-none-match") == '"v1"':
+                return httpx.Response(304)
+            user = request.headers.get("authorization", "anonymous")
+            return httpx.Response(200, json={"user": user}, headers={"etag": '"v1"'})
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        tool = APICallerTool()
+        with patch("tools.api_caller.get_client", return_value=client):
+            alice = await tool.execute(url="https://api.test/me", headers={"Authorization": "alice"})
+            bob = await tool.execute(url="https://api.test/me", headers={"Authorization": "bob"})
+            alice_again = await tool.execute(url="https://api.test/me", headers={"Authorization": "alice"})
+        await client.aclose()
+
+        assert '"user": "alice"' in alice.output
+        assert '"user": "bob"' in bob.output
+        assert "304" in alice_again.output and '"user": "alice"' in alice_again.output
+
+
+class TestDatabaseTool:
+    """Tests for the database tool."""
+
+    @pytest.mark.asyncio_cooperative
+    async def test_pragma_writes_are_blocked(self):
+        """Test both PRAGMA write forms are refused and the connection is untouched."""
+        from tools.database import DatabaseTool
+
+        with tempfile.TemporaryDirectory() as workspace:
+            tool = DatabaseTool(str(Path(workspace) / "test.db"))
+            try:
+                for query in (
+                    "PRAGMA journal_mode(DELETE)",
+                    "PRAGMA journal_mode = DELETE",
+                    "/* note */ PRAGMA main.journal_mode=DELETE",
+                    "PRAGMA writable_schema = ON",
+                ):
+                    result = await tool.execute(query=query)
+                    assert not result.success, query
+                    assert "blocked" in result.error
+
+                result = await tool.execute(query="PRAGMA journal_mode")
+                assert result.success
+                assert "wal" in result.output
+            finally:
+                await tool.close()
+
+    @pytest.mark.asyncio_cooperative
+    async def test_read_only_pragmas_are_allowed(self):
+        """Test introspection pragmas still work."""
+        from tools.database import DatabaseTool
+
+        with tempfile.TemporaryDirectory() as workspace:
+            tool = DatabaseTool(str(Path(workspace) / "test.db"))
+            try:
+                await tool.execute(query="CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)")
+                result = await tool.execute(query="PRAGMA table_info(items)")
+                assert result.success
+                assert "name" in result.output
+            finally:
+                await tool.close()
+
+    def test_row_limit_is_spliced_into_plain_selects(self):
+        """Test the row limit is appended as written and skipped where it doesn't apply."""
+        from tools.database import SQLGLOT_AVAILABLE, _MAX_ROWS, _with_row_limit
+
+        if not SQLGLOT_AVAILABLE:
+            pytest.skip("sqlglot not installed")
+
+        limit = f"LIMIT {_MAX_ROWS + 1}"
+        assert _with_row_limit('SELECT id AS "My Id" FROM t;') == f'SELECT id AS "My Id" FROM t {limit}'
+        assert _with_row_limit("SELECT * FROM t -- trailing") == f"SELECT * FROM t {limit}"
+        assert _with_row_limit("SELECT * FROM a UNION SELECT * FROM b") == f"SELECT * FROM a UNION SELECT * FROM b {limit}"
+        for query in ("SELECT * FROM t LIMIT 5", "SELECT 1; SELECT 2", "UPDATE t SET x = 1"):
+            assert _with_row_limit(query) == query
+
+    @pytest.mark.asyncio_cooperative
+    async def test_large_select_is_truncated(self):
+        """Test results past the row limit are reported as truncated."""
+        from tools.database import _MAX_ROWS, DatabaseTool
+
+        with tempfile.TemporaryDirectory() as workspace:
+            tool = DatabaseTool(str(Path(workspace) / "test.db"))
+            try:
+                await tool.execute(query="CREATE TABLE items (id INTEGER PRIMARY KEY)")
+                await tool.execute(
+                    query="INSERT INTO items (id) SELECT value FROM json_each(?)",
+                    params=[json.dumps(list(range(_MAX_ROWS * 2)))]
+                )
+                result = await tool.execute(query="SELECT id FROM items ORDER BY id")
+                assert result.success
+                assert f"**Rows:** {_MAX_ROWS}+ (truncated)" in result.output
+
+                result = await tool.execute(query=f"SELECT id FROM items LIMIT {_MAX_ROWS}")
+                assert f"**Rows:** {_MAX_ROWS}\n" in result.output
+            finally:
+                await tool.close()
+
+
+class TestCalendarIntegrationTool:
+    """Tests for the calendar tool."""
+
+    @pytest.mark.asyncio_cooperative
+    async def test_concurrent_creates_are_not_lost(self):
+        """Test overlapping create/delete calls all land in the file."""
+        import json
+        from tools.calendar_integration import CalendarIntegrationTool
+
+        with tempfile.TemporaryDirectory() as workspace:
+            tool = CalendarIntegrationTool(workspace)
+            results = await asyncio.gather(*(
+                tool.execute(action="create", title=f"Event {i}", start_time="2030-01-01 10:00")
+                for i in range(20)
+            ))
+            assert all(result.success for result in results)
+
+            with open(tool.calendar_file) as f:
+                events = json.load(f)
+            assert len(events) == 20
+            assert len({event["id"] for event in events}) == 20
+
+            await asyncio.gather(*(
+                tool.execute(action="delete", event_id=event["id"]) for event in events[:5]
+            ))
+            with open(tool.calendar_file) as f:
+                assert len(json.load(f)) == 15
+
+    @pytest.mark.asyncio_cooperative
+    async def test_upcoming_uses_start_time_range(self):
+        """Test the start-time index returns only events inside the window."""
+        from datetime import datetime, timedelta
+        from tools.calendar_integration import CalendarIntegrationTool
+
+        with tempfile.TemporaryDirectory() as workspace:
+            tool = CalendarIntegrationTool(workspace)
+            now = datetime.now()
+            for title, offset in (("past", -2), ("soon", 2), ("later", 20), ("tomorrow", 1)):
+                start = (now + timedelta(days=offset)).strftime("%Y-%m-%d %H:%M")
+                await tool.execute(action="create", title=title, start_time=start)
+
+            result = await tool.execute(action="upcoming", days=7)
+
+            assert result.success
+            assert "tomorrow" in result.output and "soon" in result.output
+            assert "past" not in result.output and "later" not in result.output
+            assert result.output.index("tomorrow") < result.output.index("soon")
+
+    @pytest.mark.asyncio_cooperative
+    async def test_event_ids_do_not_collide_across_instances(self):
+        """Test two tools whose counters overlap still hand out distinct IDs."""
+        import itertools
+        import json
+        from tools.calendar_integration import CalendarIntegrationTool
+
+        with tempfile.TemporaryDirectory() as workspace:
+            first = CalendarIntegrationTool(workspace)
+            second = CalendarIntegrationTool(workspace)
+            first._id_counter = itertools.count(1)
+            second._id_counter = itertools.count(1)
+
+            await first.execute(action="create", title="a", start_time="2030-01-01 10:00")
+            await second.execute(action="create", title="b", start_time="2030-01-01 10:00")
+
+            with open(first.calendar_file) as f:
+                events = json.load(f)
+            assert len({event["id"] for event in events}) == 2
+
+
+class TestDataConverterTool:
+    """Tests for the data converter tool."""
+
+    @staticmethod
+    def _expected_csv(rows):
+        import csv
+        import io
+
+        output = io.StringIO()
+        writer = csv.writer(output)
+        writer.writerow(rows[0].keys())
+        writer.writerows(row.values() for row in rows)
+        return output.getvalue()
+
+    def test_csv_format_does_not_depend_on_size(self):
+        """Test small and large JSON -> CSV outputs use the same conventions."""
+        from tools.data_converter import DataConverterTool
+
+        tool = DataConverterTool()
+        for count in (3, 1500):
+            rows = [{"id": i, "name": f"item {i}", "active": i % 2 == 0} for i in range(count)]
+            output = tool._format_output(rows, "csv", "root", "item", True)
+            assert output == self._expected_csv(rows)
+            assert output.startswith("id,name,active\r\n0,item 0,True\r\n")
+
+    @pytest.mark.asyncio_cooperative
+    async def test_csv_to_csv_matches_csv_module(self):
+        """Test CSV input written back out keeps the csv module's quoting."""
+        from tools.data_converter import DataConverterTool
+
+        rows = [{"name": "plain", "note": 'has "quotes", commas'}, {"name": "x", "note": "multi\nline"}]
+        data = self._expected_csv(rows)
+
+        result = await DataConverterTool().execute(input_format="csv", output_format="csv", input_data=data)
+
+        assert result.success
+        assert result.output == data
+
+    @pytest.mark.asyncio_cooperative
+    async def test_json_keeps_integers_wider_than_64_bits(self):
+        """Test big integers survive a JSON round trip exactly."""
+        from tools.data_converter import DataConverterTool
+
+        data = '{"big": 18446744073709551616, "neg": -9223372036854775809, "small": 1}'
+        result = await DataConverterTool().execute(
+            input_format="json", output_format="json", input_data=data, pretty=False
+        )
+
+        assert result.success
+        assert json.loads(result.output) == {"big": 2**64, "neg": -2**63 - 1, "small": 1}
+
+
+class TestScreenshotTool:
+    """Tests for the screenshot tool's direct CDP path."""
+
+    @pytest.mark.asyncio_cooperative
+    async def test_failed_chrome_launch_is_not_retried(self):
+        """Test a Chrome that fails to start is only launched once."""
+        from unittest.mock import AsyncMock, patch
+
+        from tools import screenshot
+
+        with tempfile.TemporaryDirectory() as workspace, \
+                patch.object(screenshot, "WEBSOCKETS_AVAILABLE", True), \
+                patch.object(screenshot, "PLAYWRIGHT_AVAILABLE", False), \
+                patch.object(screenshot, "_find_chrome", return_value="/nonexistent/chrome"), \
+                patch.object(screenshot._CDPBrowser, "start", AsyncMock(side_effect=RuntimeError("no chrome"))) as start:
+            tool = screenshot.ScreenshotTool(workspace)
+            first = await tool.execute(url="https://example.com")
+            second = await tool.execute(url="https://example.com")
+
+        assert not first.success and not second.success
+        assert "no chrome" in second.error
+        assert start.await_count == 1
+
+    @pytest.mark.asyncio_cooperative
+    async def test_event_waiter_predicate(self):
+        """Test event waiters skip events their predicate rejects."""
+        import json
+
+        from tools.screenshot import _CDPBrowser
+
+        class FakeSocket:
+            def __init__(self, messages):
+                self._messages = [json.dumps(m) for m in messages]
+
+            def __aiter__(self):
+                return self
+
+            async def __anext__(self):
+                await asyncio.sleep(0)
+                if not self._messages:
+                    raise StopAsyncIteration
+                return self._messages.pop(0)
+
+        browser = _CDPBrowser("chrome")
+        idle = browser.wait_for_event(
+            "Page.lifecycleEvent", "s1", lambda event: event.get("name") == "networkIdle"
+        )
+        browser._ws = FakeSocket([
+            {"sessionId": "s1", "method": "Page.lifecycleEvent", "params": {"name": "load"}},
+            {"sessionId": "s1", "method": "Page.lifecycleEvent", "params": {"name": "networkIdle"}},
+        ])
+        await browser._read_loop()
+
+        assert idle.result() == {"name": "networkIdle"}
+
+
+class TestSharedHTTPClient:
+    """Tests for the process-wide HTTP client."""
+
+    @pytest.mark.asyncio_cooperative
+    async def test_cookies_are_not_persisted(self):
+        """Test a Set-Cookie on one response is not sent on the next request."""
+        import httpx
+        from tools import http_client
+
+        def handler(request):
+            return httpx.Response(
+                200,
+                headers={"set-cookie": "session=alice; Path=/"},
+                json={"cookie": request.headers.get("cookie")}
+            )
+
+        await http_client.close_client()
+        client = http_client.get_client()
+        client._transport = httpx.MockTransport(handler)
+        try:
+            await client.get("https://api.test/login")
+            response = await client.get("https://api.test/me")
+            assert response.json() == {"cookie": None}
+            assert not client.cookies
+
+            response = await client.get("https://api.test/me", headers={"Cookie": "session=bob"})
+            assert response.json() == {"cookie": "session=bob"}
+        finally:
+            await http_client.close_client()
+
+
+class TestToolDefinition:
+    """Tests for the LLM-facing tool definition."""
+
+    def test_definition_matches_tool_properties(self):
+        """Test to_definition reports the tool's schema and is built once."""
+        from tools.data_converter import DataConverterTool
+
+        tool = DataConverterTool()
+        definition = tool.to_definition()
+
+        assert definition == {
+            "name": tool.name,
+            "description": tool.description,
+            "parameters": tool.parameters
+        }
+        assert tool.to_definition() is definition
+
+    def test_parameters_cannot_be_mutated_through_a_tool(self):
+        """Test changing one tool's schema doesn't leak into other instances."""
+        from tools.api_caller import APICallerTool
+
+        schema = APICallerTool().parameters
+        schema["properties"]["url"]["description"] = "changed"
+        schema["required"].append("method")
+
+        fresh = APICallerTool().parameters
+        assert fresh["properties"]["url"]["description"] == "The API endpoint URL"
+        assert fresh["required"] == ["url"]
+
+
+class TestWebBrowserTool:
+    """Tests for the web browser tool."""
+
+    @staticmethod
+    async def _fetch(html: str):
+        from unittest.mock import patch
+
+        import httpx
+        from tools.web_browser import WebBrowserTool
+
+        def handler(request):
+            return httpx.Response(200, text=html, headers={"content-type": "text/html"})
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        with patch("tools.web_browser.get_client", return_value=client):
+            result = await WebBrowserTool().execute(url="https://site.test/")
+        await client.aclose()
+        return result
+
+    @pytest.mark.asyncio_cooperative
+    async def test_keeps_title_and_drops_head(self):
+        """Test the title is kept while scripts and page chrome are dropped."""
+        result = await self._fetch(
+            "<html><head><title>Page Title</title><script>var x;</script></head>"
+            "<body><nav>menu</nav><p>Body text</p></body></html>"
+        )
+
+        assert result.success
+        assert "Page Title" in result.output and "Body text" in result.output
+        assert "var x" not in result.output and "menu" not in result.output
+
+    @pytest.mark.asyncio_cooperative
+    async def test_bare_fragment_is_not_dropped(self):
+        """Test markup without <html>/<body> still yields its text."""
+        result = await self._fetch("<p>just a fragment</p>")
+
+        assert result.success
+        assert "just a fragment" in result.output
+
+
+class TestShellExecutorTool:
+    """Tests for the shell executor tool."""
+
+    @pytest.mark.asyncio_cooperative
+    async def test_case_folded_blocked_pattern_is_reported(self):
+        """Test a Unicode case variant of a blocked pattern is blocked, not a crash."""
+        from tools.shell_executor import ShellExecutorTool
+
+        with tempfile.TemporaryDirectory() as workspace:
+            tool = ShellExecutorTool(workspace_path=workspace)
+            for command in ("echo ſhutdown", "echo SHUTDOWN", "MKFS.ext4 /dev/null"):
+                result = await tool.execute(command=command)
+                assert not result.success, command
+                assert "blocked pattern" in result.error
+
+            assert "shutdown" in (await tool.execute(command="echo ſhutdown")).error
+
+    @pytest.mark.asyncio_cooperative
+    async def test_relative_command_runs_from_working_dir(self):
+        """Test a relative script path resolves against the working dir, not the server cwd."""
+        from unittest.mock import patch
+
+        from tools.shell_executor import ShellExecutorTool
+
+        with tempfile.TemporaryDirectory() as workspace:
+            script = Path(workspace) / "bin" / "hello"
+            script.parent.mkdir()
+            script.write_text("#!/bin/sh\necho from workspace\n")
+            script.chmod(0o755)
+            tool = ShellExecutorTool(workspace_path=workspace)
+
+            result = await tool.execute(command="bin/hello")
+            assert result.success, result.error
+            assert "from workspace" in result.output
+
+            # Even if the server's cwd happens to have a ./missing.sh
+            with patch("tools.shell_executor.shutil.which", return_value="/srv/missing.sh"):
+                result = await tool.execute(command="./missing.sh")
+            assert not result.success
+            assert "Errno" not in result.error
+
+
+class TestGitOperationsTool:
+    """Tests for the git operations tool."""
+
+    @staticmethod
+    def _git(repo: str, *args: str) -> str:
+        import subprocess
+
+        return subprocess.run(
+            ["git", "-c", "user.name=t", "-c", "user.email=t@t", *args],
+            cwd=repo, check=True, capture_output=True, text=True
+        ).stdout.strip()
+
+    @pytest.mark.asyncio_cooperative
+    async def test_show_follows_nested_ref_updates(self):
+        """Test moving a nested branch is seen by show and branches immediately."""
+        from tools.git_operations import GitOperationsTool
+
+        with tempfile.TemporaryDirectory() as workspace:
+            self._git(workspace, "init", "-q")
+            for message in ("first", "second"):
+                self._git(workspace, "commit", "-q", "--allow-empty", "-m", message)
+            self._git(workspace, "branch", "feature/x")
+            tool = GitOperationsTool(workspace)
+
+            assert "second" in (await tool.execute(operation="show", commit="feature/x")).output
+
+            self._git(workspace, "branch", "-f", "feature/x", "HEAD~1")
+            result = await tool.execute(operation="show", commit="feature/x")
+            assert "first" in result.output and "second" not in result.output
+            assert "first" in (await tool.execute(operation="branches")).output
+
+            sha = self._git(workspace, "rev-parse", "HEAD")
+            assert (await tool.execute(operation="show", commit=sha)).success
+            assert len(tool._result_cache) == 1
+
+    def test_concurrency_limit_works_across_event_loops(self):
+        """Test contended git calls work in each of several event loops."""
+        from tools import git_operations
+        from tools.git_operations import GitOperationsTool
+
+        with tempfile.TemporaryDirectory() as workspace:
+            self._git(workspace, "init", "-q")
+            tool = GitOperationsTool(workspace)
+
+            async def burst():
+                calls = [tool.execute(operation="status") for _ in range(git_operations._GIT_CONCURRENCY * 2)]
+                return await asyncio.gather(*calls)
+
+            for _ in range(2):
+                assert all(result.success for result in asyncio.run(burst()))
@@ -0,0 +1,418 @@
+"""
+Tests for the workflow engine.
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from tools.base import ToolResult
+from workflows.workflow_engine import StepType, Workflow, WorkflowEngine, WorkflowStep
+
+
+class RecordingTool:
+    """Tool stub that records its calls and echoes its params"""
+
+    def __init__(self):
+        self.calls = []
+
+    async def execute(self, **params):
+        self.calls.append(params)
+        return ToolResult(success=True, output=str(params))
+
+
+class SlowTool(RecordingTool):
+    """Recording tool that sleeps for params["delay"] and tracks overlap"""
+
+    def __init__(self):
+        super().__init__()
+        self.active = 0
+        self.peak = 0
+
+    async def execute(self, **params):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(params.get("delay", 0.05))
+            if params.get("fail"):
+                raise RuntimeError("boom")
+            return await super().execute(**params)
+        finally:
+            self.active -= 1
+
+
+def tool_step(step_id: str, **kwargs) -> WorkflowStep:
+    params = kwargs.pop("params", {})
+    return WorkflowStep(
+        id=step_id,
+        name=step_id,
+        type=StepType.TOOL,
+        config={"tool": "echo", "params": {"n": step_id, **params}},
+        **kwargs
+    )
+
+
+class TestMemoization:
+    """Tests for reusing results of pure steps."""
+
+    @pytest.mark.asyncio_cooperative
+    async def test_pure_tool_step_reuses_result(self):
+        """Test a pure tool step runs once per distinct resolved config."""
+        tool = RecordingTool()
+        engine = WorkflowEngine({"echo": tool})
+
+        for query in ("a", "a", "b", "a"):
+            workflow = Workflow(
+                id="memo",
+                name="memo",
+                variables={"search_params": {"query": query}},
+                steps=[tool_step("search", pure=True, inputs={"params": "search_params"})]
+            )
+            execution = await engine.execute(workflow)
+            assert execution.status == "completed"
+
+        assert [call["query"] for call in tool.calls] == ["a", "b"]
+
+    @pytest.mark.asyncio_cooperative
+    async def test_context_reading_step_is_not_memoized(self):
+        """Test a pure condition step re-evaluates when the context changes."""
+        tool = RecordingTool()
+        engine = WorkflowEngine({"echo": tool})
+
+        for flag in (True, False):
+            workflow = Workflow(
+                id="cond",
+                name="cond",
+                variables={"flag": flag},
+                steps=[WorkflowStep(
+                    id="branch",
+                    name="branch",
+                    type=StepType.CONDITION,
+                    pure=True,
+                    config={
+                        "condition": "flag",
+                        "then": {"tool": "echo", "params": {"branch": "then"}},
+                        "else": {"tool": "echo", "params": {"branch": "else"}}
+                    }
+                )]
+            )
+            await engine.execute(workflow)
+
+        assert [call["branch"] for call in tool.calls] == ["then", "else"]
+
+
+class TestWorkflowManager:
+    """Tests for workflow persistence."""
+
+    @pytest.mark.asyncio_cooperative
+    async def test_update_keeps_step_options(self):
+        """Test replacing steps keeps pure/cache_ttl/condition/on_error."""
+        import tempfile
+
+        from workflows.workflow_manager import WorkflowManager
+
+        with tempfile.TemporaryDirectory() as storage:
+            manager = WorkflowManager(storage)
+            workflow = await manager.create(name="w", steps=[{"name": "s", "type": "tool"}])
+            step = {
+                "id": "s",
+                "name": "s",
+                "type": "tool",
+                "pure": True,
+                "cache_ttl": 60,
+                "condition": "ready",
+                "on_error": "skip",
+            }
+
+            updated = await manager.update(workflow.id, steps=[step])
+
+            saved = updated.steps[0]
+            assert (saved.pure, saved.cache_ttl, saved.condition, saved.on_error) == (True, 60, "ready", "skip")
+
+
+class TestExecutionContext:
+    """Tests for the layered execution context."""
+
+    @pytest.mark.asyncio_cooperative
+    async def test_execution_serializes_to_json(self):
+        """Test executions can be dumped for the API and websocket."""
+        from fastapi.encoders import jsonable_encoder
+
+        engine = WorkflowEngine({"echo": RecordingTool()})
+        workflow = Workflow(id="ser", name="ser", variables={"x": 1}, steps=[tool_step("a")])
+
+        execution = await engine.execute(workflow, {"y": 2})
+
+        dumped = execution.model_dump(mode="json")
+        assert dumped["context"]["x"] == 1 and dumped["context"]["y"] == 2
+        assert "a_output" in dumped["context"] and "steps" not in dumped["context"]
+        assert jsonable_encoder(execution)["context"] == dumped["context"]
+        assert '"a_output"' in execution.model_dump_json()
+
+
+class TestEvents:
+    """Tests for engine event delivery."""
+
+    @pytest.mark.asyncio_cooperative
+    async def test_handlers_get_individual_events(self):
+        """Test plain handlers see each event, batched handlers see batches."""
+        engine = WorkflowEngine({"echo": RecordingTool()})
+        events, batches = [], []
+        engine.add_event_handler(events.append)
+        engine.add_event_handler(batches.append, batched=True)
+
+        await engine.execute(Workflow(id="ev", name="ev", steps=[tool_step("a"), tool_step("b")]))
+
+        types = [event["type"] for event in events]
+        assert types == [
+            "workflow_started", "step_started", "step_completed",
+            "step_started", "step_completed", "workflow_completed"
+        ]
+        assert all(batch["type"] == "batch" for batch in batches)
+        assert [event for batch in batches for event in batch["data"]["events"]] == events
+
+
+class TestTransformStep:
+    """Tests for JSON transform steps."""
+
+    @staticmethod
+    async def _transform(transform: str, value):
+        engine = WorkflowEngine({})
+        workflow = Workflow(
+            id="transform",
+            name="transform",
+            variables={"value": value},
+            steps=[WorkflowStep(
+                id="t",
+                name="t",
+                type=StepType.TRANSFORM,
+                config={"transform": transform},
+                inputs={"input": "value"}
+            )]
+        )
+        execution = await engine.execute(workflow)
+        assert execution.status == "completed", execution.error
+        return execution.step_results["t"]["result"]
+
+    @pytest.mark.asyncio_cooperative
+    async def test_json_stringify_keeps_json_dumps_format(self):
+        """Test stringified output matches json.dumps byte for byte."""
+        import json
+
+        value = {"name": "café", "n": 1, "items": [1, 2]}
+        assert await self._transform("json_stringify", value) == json.dumps(value)
+
+    @pytest.mark.asyncio_cooperative
+    async def test_json_parse_keeps_big_integers(self):
+        """Test integers wider than 64 bits are not turned into floats."""
+        result = await self._transform("json_parse", '{"id": 123456789012345678901234567890}')
+        assert result == {"id": 123456789012345678901234567890}
+
+    @pytest.mark.asyncio_cooperative
+    async def test_json_parse_passes_parsed_input_through(self):
+        """Test already-parsed input is returned unchanged."""
+        assert await self._transform("json_parse", {"a": 1}) == {"a": 1}
+
+
+class TestParallelWorkflow:
+    """Tests for running independent steps of a parallel workflow together."""
+
+    def test_plan_follows_input_and_condition_references(self):
+        """Test tool steps depend only on the steps they reference."""
+        engine = WorkflowEngine({"echo": RecordingTool()})
+        workflow = Workflow(
+            id="dag",
+            name="dag",
+            parallel=True,
+            steps=[
+                tool_step("a"),
+                tool_step("b"),
+                tool_step("c", inputs={"previous": "a_output"}),
+                tool_step("d", condition="b_output != None"),
+                WorkflowStep(id="t", name="t", type=StepType.TRANSFORM, config={"input": "x"}),
+                tool_step("e")
+            ]
+        )
+
+        assert engine._plan(workflow).deps == [set(), set(), {0}, {1}, {0, 1, 2, 3}, {4}]
+
+    def test_plan_cache_is_bounded(self):
+        """Test plans for old workflows are evicted, least recently used first."""
+        engine = WorkflowEngine({"echo": RecordingTool()})
+        engine.PLAN_CACHE_SIZE = 2
+        workflows = [Workflow(id=f"w{i}", name="w", steps=[tool_step("a")]) for i in range(3)]
+
+        engine._plan(workflows[0])
+        engine._plan(workflows[1])
+        engine._plan(workflows[0])
+        engine._plan(workflows[2])
+
+        assert list(engine._plans) == ["w0", "w2"]
+
+    @pytest.mark.asyncio_cooperative
+    async def test_independent_steps_overlap_only_when_parallel(self):
+        """Test independent steps run together in a parallel workflow and not otherwise."""
+        for parallel, expected_peak in ((False, 1), (True, 2)):
+            tool = SlowTool()
+            engine = WorkflowEngine({"echo": tool})
+            workflow = Workflow(
+                id=f"overlap-{parallel}",
+                name="overlap",
+                parallel=parallel,
+                steps=[tool_step("a"), tool_step("b"), tool_step("c", inputs={"previous": "a_output"})]
+            )
+
+            execution = await engine.execute(workflow)
+
+            assert execution.status == "completed"
+            assert tool.peak == expected_peak
+            assert [call["n"] for call in tool.calls][-1] == "c"
+
+    @pytest.mark.asyncio_cooperative
+    async def test_failed_step_fails_parallel_workflow(self):
+        """Test a failing step fails the workflow and cancels its siblings."""
+        engine = WorkflowEngine({"echo": SlowTool()})
+        workflow = Workflow(
+            id="fail",
+            name="fail",
+            parallel=True,
+            steps=[
+                tool_step("a", params={"fail": True, "delay": 0.01}),
+                tool_step("b", params={"delay": 5})
+            ]
+        )
+
+        execution = await asyncio.wait_for(engine.execute(workflow), timeout=2)
+
+        assert execution.status == "failed"
+        assert execution.error == "boom"
+
+
+class TestConditionWait:
+    """Tests for condition waits in parallel workflows."""
+
+    @pytest.mark.asyncio_cooperative
+    async def test_wait_wakes_when_step_result_lands(self):
+        """Test a condition wait returns when its step finishes, not at the next interval."""
+        engine = WorkflowEngine({"echo": SlowTool()})
+        workflow = Workflow(
+            id="wait",
+            name="wait",
+            parallel=True,
+            steps=[
+                tool_step("a"),
+                WorkflowStep(
+                    id="w",
+                    name="w",
+                    type=StepType.WAIT,
+                    config={"type": "condition", "condition": "steps.a", "interval": 30, "timeout": 60}
+                ),
+                tool_step("c", inputs={"waited": "w_output"})
+            ]
+        )
+
+        assert engine._plan(workflow).deps == [set(), set(), {1}]
+        execution = await asyncio.wait_for(engine.execute(workflow), timeout=5)
+
+        assert execution.status == "completed"
+        assert execution.step_results["w"]["condition_met"] is True
+        assert execution.step_results["w"]["elapsed"] < 5
+
+    @pytest.mark.asyncio_cooperative
+    async def test_wait_times_out(self):
+        """Test a condition that never holds times out instead of waiting an interval."""
+        engine = WorkflowEngine({"echo": RecordingTool()})
+        workflow = Workflow(
+            id="timeout",
+            name="timeout",
+            parallel=True,
+            steps=[WorkflowStep(
+                id="w",
+                name="w",
+                type=StepType.WAIT,
+                config={"type": "condition", "condition": "never", "interval": 30, "timeout": 0.05}
+            )]
+        )
+
+        execution = await asyncio.wait_for(engine.execute(workflow), timeout=5)
+
+        assert execution.step_results["w"] == {"condition_met": False, "timeout": True}
+
+
+class TestLoopStep:
+    """Tests for loop steps."""
+
+    @staticmethod
+    def loop_workflow(**config) -> Workflow:
+        return Workflow(
+            id="loop",
+            name="loop",
+            steps=[WorkflowStep(
+                id="l",
+                name="l",
+                type=StepType.LOOP,
+                config={"items": list(range(8)), "body": {"tool": "echo", "params": {}}, **config}
+            )]
+        )
+
+    @pytest.mark.asyncio_cooperative
+    async def test_iterations_are_bounded_by_concurrency(self):
+        """Test iterations run one at a time by default and up to concurrency otherwise."""
+        for config, expected_peak in (({}, 1), ({"concurrency": 4}, 4)):
+            tool = SlowTool()
+            engine = WorkflowEngine({"echo": tool})
+
+            execution = await engine.execute(self.loop_workflow(**config))
+
+            assert execution.status == "completed"
+            assert len(execution.step_results["l"]["results"]) == 8
+            assert tool.peak == expected_peak
+
+    @pytest.mark.asyncio_cooperative
+    async def test_loop_variable_does_not_leak(self):
+        """Test the loop variable is not left in the context after the loop."""
+        engine = WorkflowEngine({"echo": SlowTool()})
+
+        execution = await engine.execute(self.loop_workflow(concurrency=4))
+
+        assert "item" not in execution.context
+
+    @pytest.mark.asyncio_cooperative
+    async def test_failed_iteration_fails_loop(self):
+        """Test a failing iteration fails the step without waiting for the rest."""
+        engine = WorkflowEngine({"echo": SlowTool()})
+        workflow = self.loop_workflow(concurrency=4, body={"tool": "echo", "params": {"fail": True}})
+
+        execution = await asyncio.wait_for(engine.execute(workflow), timeout=5)
+
+        assert execution.status == "failed"
+        assert execution.error == "boom"
+
+
+class TestStepInputs:
+    """Tests for resolving step inputs from the context."""
+
+    @pytest.mark.asyncio_cooperative
+    async def test_changed_inputs_are_recompiled(self):
+        """Test replacing or editing a step's inputs takes effect on the next run."""
+        tool = RecordingTool()
+        engine = WorkflowEngine({"echo": tool})
+        step = tool_step("search", inputs={"params": "first"})
+        workflow = Workflow(
+            id="inputs",
+            name="inputs",
+            variables={"first": {"query": "a"}, "second": {"query": "b"}, "third": {"query": "c"}},
+            steps=[step]
+        )
+
+        await engine.execute(workflow)
+        step.inputs = {"params": "second"}
+        await engine.execute(workflow)
+        step.inputs["params"] = "third"
+        await engine.execute(workflow)
+
+        assert [call["query"] for call in tool.calls] == ["a", "b", "c"]
@@ -1,16 +1,65 @@
+import copy
 import json
 import httpx
+from collections import OrderedDict
 from typing import Dict, Any, Literal
 from .base import BaseTool, ToolResult
+from .http_client import get_client
+
+
+_JSON_MIME_PREFIX = "application/json"
+_SUPPORTED_METHODS = frozenset({"GET", "POST", "PUT", "DELETE", "PATCH"})
+_BODY_METHODS = frozenset({"POST", "PUT", "PATCH"})
+
+_PARAMETERS_APICALLER = {
+    "type": "object",
+    "properties": {
+        "url": {
+            "type": "string",
+            "description": "The API endpoint URL"
+        },
+        "method": {
+            "type": "string",
+            "enum": ["GET", "POST", "PUT", "DELETE", "PATCH"],
+            "description": "HTTP method",
+            "default": "GET"
+        },
+        "headers": {
+            "type": "object",
+            "description": "Request headers as key-value pairs"
+        },
+        "body": {
+            "type": "object",
+            "description": "Request body for POST/PUT/PATCH (will be JSON encoded)"
+        },
+        "params": {
+            "type": "object",
+            "description": "URL query parameters"
+        }
+    },
+    "required": ["url"]
+}
 
 
 class APICallerTool(BaseTool):
     """Make HTTP API requests"""
 
-    def __init__(self, timeout: int = 30, max_response_size: int = 50000):
+    def __init__(
+        self,
+        timeout: int = 30,
+        max_response_size: int = 50000,
+        cache_size: int = 256
+    ):
         self.timeout = timeout
         self.max_response_size = max_response_size
-        self.client = httpx.AsyncClient(timeout=timeout, follow_redirects=True)
+
+        # Conditional-request cache for GETs:
+        # (method, url, params, headers) -> (etag, last_modified, content_type, encoding, body)
+        # Headers are part of the key so a body fetched with one set of
+        # credentials (Authorization, Cookie, API-key headers) is never
+        # served to a request made with another
+        self.cache_size = cache_size
+        self._cache: OrderedDict[tuple, tuple] = OrderedDict()
 
     @property
     def name(self) -> str:
@@ -23,34 +72,8 @@ Useful for interacting with REST APIs, fetching JSON data, and webhooks."""
 
     @property
     def parameters(self) -> dict:
-        return {
-            "type": "object",
-            "properties": {
-                "url": {
-                    "type": "string",
-                    "description": "The API endpoint URL"
-                },
-                "method": {
-                    "type": "string",
-                    "enum": ["GET", "POST", "PUT", "DELETE", "PATCH"],
-                    "description": "HTTP method",
-                    "default": "GET"
-                },
-                "headers": {
-                    "type": "object",
-                    "description": "Request headers as key-value pairs"
-                },
-                "body": {
-                    "type": "object",
-                    "description": "Request body for POST/PUT/PATCH (will be JSON encoded)"
-                },
-                "params": {
-                    "type": "object",
-                    "description": "URL query parameters"
-                }
-            },
-            "required": ["url"]
-        }
+        # A copy, so callers can't alter the schema shared by every instance
+        return copy.deepcopy(_PARAMETERS_APICALLER)
 
     async def execute(
         self,
@@ -72,47 +95,88 @@ Useful for interacting with REST APIs, fetching JSON data, and webhooks."""
             # Make request
             method = method.upper()
 
+            if method not in _SUPPORTED_METHODS:
+                return ToolResult(
+                    success=False,
+                    output="",
+                    error=f"Unsupported HTTP method: {method}"
+                )
+
             kwargs = {
-                "url": url,
                 "headers": request_headers,
+                "timeout": self.timeout,
+                "follow_redirects": True,
             }
 
             if params:
                 kwargs["params"] = params
 
-            if body and method in ["POST", "PUT", "PATCH"]:
+            if body and method in _BODY_METHODS:
                 kwargs["json"] = body
 
+            # Revalidate previously seen GETs instead of refetching them
+            cache_key = None
+            cached = None
             if method == "GET":
-                response = await self.client.get(**kwargs)
-            elif method == "POST":
-                response = await self.client.post(**kwargs)
-            elif method == "PUT":
-                response = await self.client.put(**kwargs)
-            elif method == "DELETE":
-                response = await self.client.delete(**kwargs)
-            elif method == "PATCH":
-                response = await self.client.patch(**kwargs)
-            else:
-                return ToolResult(
-                    success=False,
-                    output="",
-                    error=f"Unsupported HTTP method: {method}"
+                cache_key = (
+                    method,
+                    url,
+                    json.dumps(params, sort_keys=True) if params else "",
+                    tuple(sorted((k.lower(), v) for k, v in request_headers.items()))
                 )
+                cached = self._cache.get(cache_key)
+                if cached:
+                    etag, last_modified = cached[0], cached[1]
+                    if etag:
+                        request_headers.setdefault("If-None-Match", etag)
+                    if last_modified:
+                        request_headers.setdefault("If-Modified-Since", last_modified)
+
+            # Stream the body and stop reading once the size cap is reached,
+            # so oversized responses are never fully downloaded
+            buf = bytearray()
+            truncated = False
+            async with get_client().stream(method, url, **kwargs) as response:
+                async for chunk in response.aiter_bytes(chunk_size=16384):
+                    buf.extend(chunk)
+                    if len(buf) > self.max_response_size:
+                        truncated = True
+                        break
 
             # Process response
             status_code = response.status_code
             content_type = response.headers.get("content-type", "")
+            encoding = response.encoding or "utf-8"
+
+            if cache_key is not None:
+                if status_code == 304 and cached:
+                    # Not modified: serve the body we already have
+                    self._cache.move_to_end(cache_key)
+                    content_type, encoding = cached[2], cached[3]
+                    buf = bytearray(cached[4])
+                elif status_code == 200 and not truncated:
+                    etag = response.headers.get("etag")
+                    last_modified = response.headers.get("last-modified")
+                    if etag or last_modified:
+                        self._cache[cache_key] = (
+                            etag, last_modified, content_type, encoding, bytes(buf)
+                        )
+                        self._cache.move_to_end(cache_key)
+                        if len(self._cache) > self.cache_size:
+                            self._cache.popitem(last=False)
 
             # Limit response size
-            response_text = response.text[:self.max_response_size]
-            if len(response.text) > self.max_response_size:
+            response_text = buf[:self.max_response_size].decode(
+                encoding, errors="replace"
+            )
+            if truncated:
                 response_text += "\n\n[Response truncated...]"
 
             # Try to parse as JSON for prettier output
             try:
-                if "application/json" in content_type:
-                    response_data = response.json()
+                is_json = content_type.split(";", 1)[0].strip() == _JSON_MIME_PREFIX
+                if is_json and not truncated:
+                    response_data = json.loads(buf)
                     response_formatted = json.dumps(response_data, indent=2)
                 else:
                     response_formatted = response_text
@@ -155,6 +219,3 @@ Useful for interacting with REST APIs, fetching JSON data, and webhooks."""
                 output="",
                 error=f"API call failed: {str(e)}"
             )
-
-    async def close(self):
-        await self.client.aclose()
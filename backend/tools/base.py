@@ -12,6 +12,10 @@ class ToolResult(BaseModel):
 class BaseTool(ABC):
     """Abstract base class for all tools"""
 
+    # Slotted so subclasses can drop their per-instance __dict__ by
+    # declaring __slots__ of their own
+    __slots__ = ("_definition",)
+
     @property
     @abstractmethod
     def name(self) -> str:
@@ -35,10 +39,19 @@ class BaseTool(ABC):
         """Execute the tool with given parameters"""
         pass
 
+    @property
+    def definition(self) -> dict:
+        """LLM-compatible definition, built once per tool instance"""
+        try:
+            return self._definition
+        except AttributeError:
+            self._definition = {
+                "name": self.name,
+                "description": self.description,
+                "parameters": self.parameters
+            }
+            return self._definition
+
     def to_definition(self) -> dict:
         """Convert tool to LLM-compatible definition"""
-        return {
-            "name": self.name,
-            "description": self.description,
-            "parameters": self.parameters
-        }
+        return self.definition
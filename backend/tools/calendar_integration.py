@@ -1,13 +1,60 @@
 """
 Calendar Integration Tool - Simple calendar event management
 """
+import asyncio
+import copy
 import os
 import json
+import itertools
+import secrets
+import time
+from bisect import bisect_left, bisect_right
 from datetime import datetime, timedelta
-from typing import Optional, List
+from typing import Optional, List, Tuple
 from .base import BaseTool, ToolResult
 
 
+_PARAMETERS_CALENDAR = {
+    "type": "object",
+    "properties": {
+        "action": {
+            "type": "string",
+            "description": "Calendar action to perform",
+            "enum": ["create", "list", "search", "delete", "today", "upcoming"]
+        },
+        "title": {
+            "type": "string",
+            "description": "Event title (for create/search)"
+        },
+        "description": {
+            "type": "string",
+            "description": "Event description (for create)"
+        },
+        "start_time": {
+            "type": "string",
+            "description": "Event start time (ISO format or natural language like '2024-01-15 14:00')"
+        },
+        "end_time": {
+            "type": "string",
+            "description": "Event end time (optional)"
+        },
+        "event_id": {
+            "type": "string",
+            "description": "Event ID (for delete)"
+        },
+        "days": {
+            "type": "integer",
+            "description": "Number of days for upcoming events (default: 7)"
+        },
+        "query": {
+            "type": "string",
+            "description": "Search query"
+        }
+    },
+    "required": ["action"]
+}
+
+
 class CalendarIntegrationTool(BaseTool):
     """
     Simple calendar event management tool.
@@ -26,26 +73,73 @@ class CalendarIntegrationTool(BaseTool):
     def __init__(self, storage_path: str):
         self.storage_path = storage_path
         self.calendar_file = os.path.join(storage_path, "calendar.json")
+        # Counter keeps IDs unique within this instance; the random suffix keeps
+        # them unique across instances and restarts whose counters overlap
+        self._id_counter = itertools.count(int(time.time() * 1000))
+        self._id_suffix = secrets.token_hex(4)
+        # Parsed events keyed by the file's (mtime_ns, size)
+        self._cache: Optional[Tuple[int, int, List[dict]]] = None
+        # Events ordered by start time, with the parsed starts as bisect keys
+        self._events_sorted: List[dict] = []
+        self._starts: List[datetime] = []
+        self._index_source: Optional[List[dict]] = None
+        # Serializes read-modify-write cycles; the file I/O awaits in between
+        self._write_lock = asyncio.Lock()
         self._ensure_calendar_exists()
 
     def _ensure_calendar_exists(self):
         """Ensure the calendar storage file exists."""
         os.makedirs(self.storage_path, exist_ok=True)
         if not os.path.exists(self.calendar_file):
-            self._save_events([])
+            self._write_events([])
 
-    def _load_events(self) -> List[dict]:
-        """Load events from storage."""
+    def _read_events(self) -> List[dict]:
+        """Read events from storage, reusing the parsed list if the file is unchanged."""
         try:
+            st = os.stat(self.calendar_file)
+            if self._cache and self._cache[:2] == (st.st_mtime_ns, st.st_size):
+                return self._cache[2]
             with open(self.calendar_file, "r") as f:
-                return json.load(f)
+                events = json.load(f)
+            self._cache = (st.st_mtime_ns, st.st_size, events)
+            return events
         except (json.JSONDecodeError, FileNotFoundError):
             return []
 
-    def _save_events(self, events: List[dict]):
-        """Save events to storage."""
-        with open(self.calendar_file, "w") as f:
+    async def _load_events(self) -> List[dict]:
+        """Load events from storage without blocking the event loop."""
+        return await asyncio.to_thread(self._read_events)
+
+    async def _load_index(self) -> Tuple[List[datetime], List[dict]]:
+        """Return (starts, events) sorted by start time, rebuilt only when the events change."""
+        events = await self._load_events()
+        if events is not self._index_source:
+            indexed = []
+            for event in events:
+                try:
+                    start = datetime.fromisoformat(event["start_time"])
+                except (KeyError, TypeError, ValueError):
+                    continue
+                if start.tzinfo is not None:
+                    start = start.astimezone().replace(tzinfo=None)
+                indexed.append((start, event))
+            indexed.sort(key=lambda pair: pair[0])
+            self._starts = [start for start, _ in indexed]
+            self._events_sorted = [event for _, event in indexed]
+            self._index_source = events
+        return self._starts, self._events_sorted
+
+    def _write_events(self, events: List[dict]):
+        """Write events to storage, atomically so readers never see a partial file."""
+        self._cache = None
+        tmp_path = self.calendar_file + ".tmp"
+        with open(tmp_path, "w") as f:
             json.dump(events, f, indent=2, default=str)
+        os.replace(tmp_path, self.calendar_file)
+
+    async def _save_events(self, events: List[dict]):
+        """Save events to storage without blocking the event loop."""
+        await asyncio.to_thread(self._write_events, events)
 
     @property
     def name(self) -> str:
@@ -64,45 +158,8 @@ Available actions:
 
     @property
     def parameters(self) -> dict:
-        return {
-            "type": "object",
-            "properties": {
-                "action": {
-                    "type": "string",
-                    "description": "Calendar action to perform",
-                    "enum": ["create", "list", "search", "delete", "today", "upcoming"]
-                },
-                "title": {
-                    "type": "string",
-                    "description": "Event title (for create/search)"
-                },
-                "description": {
-                    "type": "string",
-                    "description": "Event description (for create)"
-                },
-                "start_time": {
-                    "type": "string",
-                    "description": "Event start time (ISO format or natural language like '2024-01-15 14:00')"
-                },
-                "end_time": {
-                    "type": "string",
-                    "description": "Event end time (optional)"
-                },
-                "event_id": {
-                    "type": "string",
-                    "description": "Event ID (for delete)"
-                },
-                "days": {
-                    "type": "integer",
-                    "description": "Number of days for upcoming events (default: 7)"
-                },
-                "query": {
-                    "type": "string",
-                    "description": "Search query"
-                }
-            },
-            "required": ["action"]
-        }
+        # A copy, so callers can't alter the schema shared by every instance
+        return copy.deepcopy(_PARAMETERS_CALENDAR)
 
     async def execute(
         self,
@@ -187,10 +244,8 @@ Available actions:
                     error=f"Invalid end time: {e}"
                 )
 
-        events = self._load_events()
-
         # Generate event ID
-        event_id = f"evt_{datetime.now().strftime('%Y%m%d%H%M%S')}_{len(events)}"
+        event_id = f"evt_{next(self._id_counter):x}_{self._id_suffix}"
 
         event = {
             "id": event_id,
@@ -201,8 +256,11 @@ Available actions:
             "created_at": datetime.now().isoformat()
         }
 
-        events.append(event)
-        self._save_events(events)
+        async with self._write_lock:
+            # Copy: the loaded list is shared with the read cache and index
+            events = list(await self._load_events())
+            events.append(event)
+            await self._save_events(events)
 
         return ToolResult(
             success=True,
@@ -211,31 +269,21 @@ Available actions:
 
     async def _list_events(self, days: int = 30) -> ToolResult:
         """List events within the specified number of days."""
-        events = self._load_events()
+        starts, events = await self._load_index()
         now = datetime.now()
         end_date = now + timedelta(days=days)
 
-        upcoming = []
-        for event in events:
-            try:
-                start = datetime.fromisoformat(event["start_time"])
-                if now <= start <= end_date:
-                    upcoming.append(event)
-            except:
-                continue
-
-        # Sort by start time
-        upcoming.sort(key=lambda e: e["start_time"])
+        lo = bisect_left(starts, now)
+        hi = bisect_right(starts, end_date)
 
-        if not upcoming:
+        if lo == hi:
             return ToolResult(
                 success=True,
                 output=f"No events found in the next {days} days."
             )
 
         output = f"Events in the next {days} days:\n\n"
-        for event in upcoming:
-            start = datetime.fromisoformat(event["start_time"])
+        for start, event in zip(starts[lo:hi], events[lo:hi]):
             output += f"- [{event['id']}] {event['title']}\n"
             output += f"  Date: {start.strftime('%Y-%m-%d %H:%M')}\n"
             if event.get("description"):
@@ -253,7 +301,7 @@ Available actions:
                 error="Search query is required"
             )
 
-        events = self._load_events()
+        events = await self._load_events()
         query_lower = query.lower()
 
         matches = [
@@ -286,18 +334,19 @@ Available actions:
                 error="Event ID is required"
             )
 
-        events = self._load_events()
-        original_count = len(events)
-        events = [e for e in events if e.get("id") != event_id]
+        async with self._write_lock:
+            events = await self._load_events()
+            original_count = len(events)
+            events = [e for e in events if e.get("id") != event_id]
 
-        if len(events) == original_count:
-            return ToolResult(
-                success=False,
-                output="",
-                error=f"Event not found: {event_id}"
-            )
+            if len(events) == original_count:
+                return ToolResult(
+                    success=False,
+                    output="",
+                    error=f"Event not found: {event_id}"
+                )
 
-        self._save_events(events)
+            await self._save_events(events)
 
         return ToolResult(
             success=True,
@@ -306,30 +355,21 @@ Available actions:
 
     async def _get_today_events(self) -> ToolResult:
         """Get events for today."""
-        events = self._load_events()
+        starts, events = await self._load_index()
         today = datetime.now().date()
+        day_start = datetime.combine(today, datetime.min.time())
 
-        today_events = []
-        for event in events:
-            try:
-                start = datetime.fromisoformat(event["start_time"])
-                if start.date() == today:
-                    today_events.append(event)
-            except:
-                continue
+        lo = bisect_left(starts, day_start)
+        hi = bisect_left(starts, day_start + timedelta(days=1))
 
-        if not today_events:
+        if lo == hi:
             return ToolResult(
                 success=True,
                 output="No events scheduled for today."
             )
 
-        # Sort by time
-        today_events.sort(key=lambda e: e["start_time"])
-
         output = f"Today's events ({today.strftime('%Y-%m-%d')}):\n\n"
-        for event in today_events:
-            start = datetime.fromisoformat(event["start_time"])
+        for start, event in zip(starts[lo:hi], events[lo:hi]):
             output += f"- {start.strftime('%H:%M')} - {event['title']}\n"
             if event.get("description"):
                 output += f"  {event['description'][:50]}\n"
@@ -1,16 +1,60 @@
 import asyncio
+import copy
 import subprocess
 import tempfile
 import os
 from pathlib import Path
 from .base import BaseTool, ToolResult
 
+EXECUTION_TIMEOUT = 30.0
+
+
+_PARAMETERS_CODE_EXECUTOR = {
+    "type": "object",
+    "properties": {
+        "code": {
+            "type": "string",
+            "description": "The Python code to execute"
+        },
+        "save_as": {
+            "type": "string",
+            "description": "Optional filename to save the code (e.g., 'script.py')"
+        }
+    },
+    "required": ["code"]
+}
+
 
 class CodeExecutorTool(BaseTool):
     def __init__(self, workspace_path: str = "./workspace"):
         self.workspace_path = Path(workspace_path).resolve()
         self.workspace_path.mkdir(parents=True, exist_ok=True)
 
+    async def _run_subprocess(self, file_path: Path) -> tuple[int | None, str, str]:
+        process = await asyncio.create_subprocess_exec(
+            "python",
+            str(file_path),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            cwd=str(self.workspace_path)
+        )
+
+        try:
+            stdout, stderr = await asyncio.wait_for(
+                process.communicate(),
+                timeout=EXECUTION_TIMEOUT
+            )
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            return None, "", ""
+
+        return (
+            process.returncode,
+            stdout.decode("utf-8", errors="replace"),
+            stderr.decode("utf-8", errors="replace")
+        )
+
     @property
     def name(self) -> str:
         return "code_executor"
@@ -21,20 +65,8 @@ class CodeExecutorTool(BaseTool):
 
     @property
     def parameters(self) -> dict:
-        return {
-            "type": "object",
-            "properties": {
-                "code": {
-                    "type": "string",
-                    "description": "The Python code to execute"
-                },
-                "save_as": {
-                    "type": "string",
-                    "description": "Optional filename to save the code (e.g., 'script.py')"
-                }
-            },
-            "required": ["code"]
-        }
+        # A copy, so callers can't alter the schema shared by every instance
+        return copy.deepcopy(_PARAMETERS_CODE_EXECUTOR)
 
     async def execute(self, code: str, save_as: str | None = None) -> ToolResult:
         try:
@@ -49,36 +81,22 @@ class CodeExecutorTool(BaseTool):
 
             file_path.write_text(code, encoding="utf-8")
 
-            # Execute the code with timeout
-            process = await asyncio.create_subprocess_exec(
-                "python",
-                str(file_path),
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                cwd=str(self.workspace_path)
-            )
+            # Execute the code with timeout; a fresh interpreter per run keeps
+            # snippets from seeing each other's modules, env, cwd or signals
+            returncode, stdout_text, stderr_text = await self._run_subprocess(file_path)
 
-            try:
-                stdout, stderr = await asyncio.wait_for(
-                    process.communicate(),
-                    timeout=30.0
-                )
-            except asyncio.TimeoutError:
-                process.kill()
+            if returncode is None:
                 return ToolResult(
                     success=False,
                     output="",
                     error="Code execution timed out after 30 seconds"
                 )
 
-            stdout_text = stdout.decode("utf-8", errors="replace")
-            stderr_text = stderr.decode("utf-8", errors="replace")
-
             # Clean up temp file if not saved
             if not save_as and file_path.exists():
                 file_path.unlink()
 
-            if process.returncode == 0:
+            if returncode == 0:
                 output = f"**Execution successful:**\n```\n{stdout_text}\n```"
                 if save_as:
                     output += f"\n\nCode saved to: {file_path}"
@@ -88,7 +106,7 @@ class CodeExecutorTool(BaseTool):
                 return ToolResult(
                     success=False,
                     output=f"**Code:**\n```python\n{code}\n```",
-                    error=f"Execution failed with exit code {process.returncode}:\n{error_output}"
+                    error=f"Execution failed with exit code {returncode}:\n{error_output}"
                 )
 
         except Exception as e:
@@ -7,8 +7,8 @@ that endpoint and returns the response, so the agents can use it like any
 built-in tool. This is the classic "webhook plugin" pattern.
 """
 import json
-import httpx
 from .base import BaseTool, ToolResult
+from .http_client import get_client
 
 
 class CustomHTTPTool(BaseTool):
@@ -35,13 +35,13 @@ class CustomHTTPTool(BaseTool):
 
     async def execute(self, **kwargs) -> ToolResult:
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                if self.method == "GET":
-                    resp = await client.get(self.endpoint_url, params=kwargs, headers=self._headers)
-                else:
-                    resp = await client.request(
-                        self.method, self.endpoint_url, json=kwargs, headers=self._headers
-                    )
+            client = get_client()
+            if self.method == "GET":
+                resp = await client.get(self.endpoint_url, params=kwargs, headers=self._headers)
+            else:
+                resp = await client.request(
+                    self.method, self.endpoint_url, json=kwargs, headers=self._headers
+                )
             resp.raise_for_status()
             try:
                 body = json.dumps(resp.json())
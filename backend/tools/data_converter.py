@@ -2,14 +2,15 @@
 Data format converter tool for converting between JSON, CSV, XML, and YAML.
 """
 
+import asyncio
 import csv
 import io
 import json
 import logging
+import re
 from pathlib import Path
 from typing import Optional, Any
 import xml.etree.ElementTree as ET
-from xml.dom import minidom
 
 from .base import BaseTool, ToolResult
 
@@ -21,6 +22,52 @@ try:
 except ImportError:
     YAML_AVAILABLE = False
 
+if YAML_AVAILABLE:
+    try:
+        from yaml import CSafeLoader as _YamlLoader, CSafeDumper as _YamlDumper
+    except ImportError:
+        from yaml import SafeLoader as _YamlLoader, SafeDumper as _YamlDumper
+        logger.warning("libyaml not available; YAML conversion will use the slower pure-Python loader")
+
+try:
+    from lxml import etree as LET
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+if LXML_AVAILABLE:
+    _xml = LET
+    # Entity resolution stays off so untrusted input can't pull in local files
+    _LXML_PARSE_OPTIONS = {
+        "remove_blank_text": True,
+        "remove_comments": True,
+        "remove_pis": True,
+        "resolve_entities": False,
+        "huge_tree": False,
+    }
+else:
+    _xml = ET
+
+# orjson silently turns integers wider than 64 bits into floats; any run of
+# 19+ digits could be one, so such JSON is parsed with the json module
+_LONG_DIGITS_RE = re.compile(r"\d{19}")
+
+# Sentinel for dict lookups where any parsed value (including "") is valid
+_MISSING = object()
+
 
 class DataConverterTool(BaseTool):
     """Tool for converting between data formats."""
@@ -103,7 +150,7 @@ class DataConverterTool(BaseTool):
                         output="",
                         error=f"Input file not found: {input_file}"
                     )
-                input_data = path.read_text(encoding="utf-8")
+                input_data = await asyncio.to_thread(path.read_text, encoding="utf-8")
             elif not input_data:
                 return ToolResult(
                     success=False,
@@ -111,8 +158,11 @@ class DataConverterTool(BaseTool):
                     error="Either input_data or input_file must be provided"
                 )
 
-            # Parse input
-            parsed_data = self._parse_input(input_data, input_format, root_element)
+            # Parsing and formatting are CPU-bound on large inputs; run them
+            # off the event loop so other requests keep being served
+            parsed_data = await asyncio.to_thread(
+                self._parse_input, input_data, input_format, root_element
+            )
             if parsed_data is None:
                 return ToolResult(
                     success=False,
@@ -121,7 +171,8 @@ class DataConverterTool(BaseTool):
                 )
 
             # Convert to output format
-            output_data = self._format_output(
+            output_data = await asyncio.to_thread(
+                self._format_output,
                 parsed_data,
                 output_format,
                 root_element,
@@ -137,13 +188,19 @@ class DataConverterTool(BaseTool):
 
             # Write to file if specified
             if output_file:
-                Path(output_file).write_text(output_data, encoding="utf-8")
+                if isinstance(output_data, bytes):
+                    await asyncio.to_thread(Path(output_file).write_bytes, output_data)
+                else:
+                    await asyncio.to_thread(Path(output_file).write_text, output_data, encoding="utf-8")
                 logger.info(f"Data converted: {input_format} -> {output_format}, saved to {output_file}")
                 return ToolResult(
                     success=True,
                     output=f"Data converted successfully and saved to {output_file}"
                 )
 
+            if isinstance(output_data, bytes):
+                output_data = output_data.decode("utf-8")
+
             logger.info(f"Data converted: {input_format} -> {output_format}")
             return ToolResult(
                 success=True,
@@ -162,20 +219,25 @@ class DataConverterTool(BaseTool):
         """Parse input data based on format."""
         try:
             if format == "json":
+                if ORJSON_AVAILABLE and not _LONG_DIGITS_RE.search(data):
+                    return orjson.loads(data)
                 return json.loads(data)
 
             elif format == "csv":
+                if PYARROW_AVAILABLE:
+                    table = self._read_csv_table(data)
+                    if table is not None:
+                        return table
                 reader = csv.DictReader(io.StringIO(data))
                 return list(reader)
 
             elif format == "xml":
-                root = ET.fromstring(data)
-                return self._xml_to_dict(root)
+                return self._xml_to_dict(data)
 
             elif format == "yaml":
                 if not YAML_AVAILABLE:
                     raise ImportError("PyYAML is not installed")
-                return yaml.safe_load(data)
+                return yaml.load(data, Loader=_YamlLoader)
 
             return None
 
@@ -190,10 +252,30 @@ class DataConverterTool(BaseTool):
         root_element: str,
         item_element: str,
         pretty: bool
-    ) -> Optional[str]:
-        """Format data to output format."""
+    ) -> Optional[str | bytes]:
+        """Format data to output format.
+
+        JSON output is returned as UTF-8 bytes when orjson is available so
+        file writes can skip the decode/encode round-trip.
+        """
         try:
+            # CSV input stays an Arrow table until something needs Python rows
+            if PYARROW_AVAILABLE and isinstance(data, pa.Table):
+                if format == "csv":
+                    return self._write_csv_table(data)
+                data = data.to_pylist()
+
             if format == "json":
+                if ORJSON_AVAILABLE:
+                    option = orjson.OPT_NON_STR_KEYS
+                    if pretty:
+                        option |= orjson.OPT_INDENT_2
+                    try:
+                        return orjson.dumps(data, option=option)
+                    except TypeError:
+                        # Integers beyond 64 bits (or other types orjson
+                        # rejects); the json module handles them
+                        pass
                 if pretty:
                     return json.dumps(data, indent=2, ensure_ascii=False)
                 return json.dumps(data, ensure_ascii=False)
@@ -204,27 +286,31 @@ class DataConverterTool(BaseTool):
                 if not data:
                     return ""
 
+                # Plain csv.writer with the field order fixed up front avoids
+                # DictWriter's per-row key validation and lookups
                 output = io.StringIO()
                 fieldnames = list(data[0].keys()) if isinstance(data[0], dict) else []
-                writer = csv.DictWriter(output, fieldnames=fieldnames)
-                writer.writeheader()
-                for row in data:
-                    if isinstance(row, dict):
-                        writer.writerow(row)
+                writer = csv.writer(output)
+                writer.writerow(fieldnames)
+                writer.writerows(
+                    [row.get(key, "") for key in fieldnames]
+                    for row in data
+                    if isinstance(row, dict)
+                )
                 return output.getvalue()
 
             elif format == "xml":
                 root = self._dict_to_xml(data, root_element, item_element)
+                if LXML_AVAILABLE:
+                    return LET.tostring(root, pretty_print=pretty, encoding="unicode")
                 if pretty:
-                    xml_str = ET.tostring(root, encoding="unicode")
-                    parsed = minidom.parseString(xml_str)
-                    return parsed.toprettyxml(indent="  ")
+                    ET.indent(root, space="  ")
                 return ET.tostring(root, encoding="unicode")
 
             elif format == "yaml":
                 if not YAML_AVAILABLE:
                     raise ImportError("PyYAML is not installed")
-                return yaml.dump(data, default_flow_style=False, allow_unicode=True)
+                return yaml.dump(data, Dumper=_YamlDumper, default_flow_style=False, allow_unicode=True)
 
             return None
 
@@ -232,57 +318,126 @@ class DataConverterTool(BaseTool):
             logger.error(f"Format error for {format}: {e}")
             return None
 
-    def _xml_to_dict(self, element: ET.Element) -> dict:
-        """Convert XML element to dictionary."""
-        result = {}
-
-        # Handle attributes
-        if element.attrib:
-            result["@attributes"] = element.attrib
-
-        # Handle children
-        children = list(element)
-        if children:
-            child_dict = {}
-            for child in children:
-                child_data = self._xml_to_dict(child)
-                if child.tag in child_dict:
-                    # Multiple children with same tag -> make list
-                    if not isinstance(child_dict[child.tag], list):
-                        child_dict[child.tag] = [child_dict[child.tag]]
-                    child_dict[child.tag].append(child_data)
-                else:
-                    child_dict[child.tag] = child_data
-            result.update(child_dict)
-        elif element.text and element.text.strip():
-            return element.text.strip()
+    def _read_csv_table(self, data: str) -> Optional["pa.Table"]:
+        """Parse CSV with Arrow's vectorized reader, keeping every cell a string.
 
-        return result if result else (element.text or "").strip()
+        Returns None when Arrow rejects the input (e.g. ragged rows) so the
+        caller can fall back to csv.DictReader.
+        """
+        header = next(csv.reader(io.StringIO(data)), None)
+        if not header:
+            return None
 
-    def _dict_to_xml(self, data: Any, tag: str, item_element: str) -> ET.Element:
-        """Convert dictionary/list to XML element."""
-        element = ET.Element(tag)
-
-        if isinstance(data, dict):
-            for key, value in data.items():
-                if key == "@attributes":
-                    for attr_key, attr_val in value.items():
-                        element.set(attr_key, str(attr_val))
-                elif isinstance(value, list):
-                    for item in value:
-                        child = self._dict_to_xml(item, key, item_element)
-                        element.append(child)
-                elif isinstance(value, dict):
-                    child = self._dict_to_xml(value, key, item_element)
-                    element.append(child)
-                else:
-                    child = ET.SubElement(element, key)
-                    child.text = str(value) if value is not None else ""
-        elif isinstance(data, list):
-            for item in data:
-                child = self._dict_to_xml(item, item_element, item_element)
-                element.append(child)
+        try:
+            return pacsv.read_csv(
+                pa.BufferReader(data.encode("utf-8")),
+                parse_options=pacsv.ParseOptions(newlines_in_values=True),
+                convert_options=pacsv.ConvertOptions(
+                    column_types=dict.fromkeys(header, pa.string()),
+                    strings_can_be_null=False,
+                    quoted_strings_can_be_null=False,
+                ),
+            )
+        except pa.ArrowException as e:
+            logger.debug(f"Arrow CSV reader failed, falling back to csv module: {e}")
+            return None
+
+    def _write_csv_table(self, table: "pa.Table") -> str:
+        """Serialize an Arrow table to CSV text.
+
+        Goes through the csv module like every other CSV output, so quoting
+        and line endings don't depend on where the rows came from; the
+        columns are pulled out whole rather than row by row.
+        """
+        output = io.StringIO()
+        writer = csv.writer(output)
+        writer.writerow(table.column_names)
+        writer.writerows(zip(*(column.to_pylist() for column in table.columns)))
+        return output.getvalue()
+
+    def _xml_to_dict(self, data: str) -> Any:
+        """Convert an XML document to a dictionary in a single streaming pass.
+
+        Each element is detached from the tree as soon as its end tag is seen,
+        so memory grows with nesting depth rather than document size.
+        """
+        source = io.BytesIO(data.encode("utf-8"))
+        if LXML_AVAILABLE:
+            events = LET.iterparse(source, events=("start", "end"), **_LXML_PARSE_OPTIONS)
         else:
-            element.text = str(data) if data is not None else ""
+            events = ET.iterparse(source, events=("start", "end"))
+
+        # Parallel stacks of open elements and their partially built dicts.
+        # A frame stays None until the element turns out to need a dict
+        # (attributes or a child), so text-only leaves never allocate one.
+        elements = []
+        frames = []
+        has_children = []
+
+        for event, element in events:
+            if event == "start":
+                if has_children:
+                    has_children[-1] = True
+                    if frames[-1] is None:
+                        frames[-1] = {}
+                elements.append(element)
+                frames.append({"@attributes": dict(element.attrib)} if element.attrib else None)
+                has_children.append(False)
+                continue
+
+            elements.pop()
+            result = frames.pop()
+            if not has_children.pop():
+                text = (element.text or "").strip()
+                value = text if text or result is None else result
+            else:
+                value = result
+
+            if not frames:
+                return value
+
+            # Multiple children with same tag -> make list
+            parent = frames[-1]
+            tag = element.tag
+            existing = parent.get(tag, _MISSING)
+            if existing is _MISSING:
+                parent[tag] = value
+            elif type(existing) is list:
+                existing.append(value)
+            else:
+                parent[tag] = [existing, value]
+
+            element.clear()
+            elements[-1].remove(element)
+
+        return None
 
+    def _dict_to_xml(self, data: Any, tag: str, item_element: str) -> ET.Element:
+        """Convert dictionary/list to XML element."""
+        element = _xml.Element(tag)
+        self._fill_xml(element, data, item_element)
         return element
+
+    def _fill_xml(self, element: ET.Element, data: Any, item_element: str) -> None:
+        """Populate element from data, dispatching on its exact type."""
+        handler = self._XML_FILLERS.get(type(data))
+        if handler is not None:
+            handler(self, element, data, item_element)
+        else:
+            element.text = "" if data is None else str(data)
+
+    def _fill_xml_dict(self, element: ET.Element, data: dict, item_element: str) -> None:
+        for key, value in data.items():
+            if key == "@attributes":
+                element.attrib.update({k: str(v) for k, v in value.items()})
+            elif type(value) is list:
+                for item in value:
+                    self._fill_xml(_xml.SubElement(element, key), item, item_element)
+            else:
+                self._fill_xml(_xml.SubElement(element, key), value, item_element)
+
+    def _fill_xml_list(self, element: ET.Element, data: list, item_element: str) -> None:
+        for item in data:
+            self._fill_xml(_xml.SubElement(element, item_element), item, item_element)
+
+    _XML_FILLERS = {dict: _fill_xml_dict, list: _fill_xml_list}
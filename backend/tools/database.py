@@ -1,27 +1,133 @@
+import asyncio
 import json
+import re
 import aiosqlite
+from functools import lru_cache
 from pathlib import Path
 from typing import List, Dict, Any
 from .base import BaseTool, ToolResult
 
+try:
+    import sqlglot
+    from sqlglot import exp as sqlglot_exp
+    from sqlglot.tokens import TokenType
+    SQLGLOT_AVAILABLE = True
+except ImportError:
+    SQLGLOT_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def _json_default(value: Any) -> str:
+    """Fallback serializer for values orjson doesn't handle (e.g. BLOBs)"""
+    return str(value)
+
+
+# Rows returned to the caller per SELECT
+_MAX_ROWS = 100
+
+# Prepared statements kept per connection by sqlite3, keyed by SQL text
+_STATEMENT_CACHE_SIZE = 256
+
+# Applied once when the shared connection is opened
+_CONNECTION_PRAGMAS = """
+PRAGMA journal_mode=WAL;
+PRAGMA synchronous=NORMAL;
+PRAGMA temp_store=MEMORY;
+PRAGMA mmap_size=268435456;
+PRAGMA cache_size=-65536;
+"""
+
+
+@lru_cache(maxsize=_STATEMENT_CACHE_SIZE)
+def _parse_sql(query: str) -> tuple | None:
+    """Parse a query with sqlglot, memoized by SQL text.
+
+    Returns None if the query can't be parsed. Callers must not mutate the
+    returned trees; copy them first.
+    """
+    try:
+        return tuple(stmt for stmt in sqlglot.parse(query, read="sqlite") if stmt is not None)
+    except sqlglot.errors.SqlglotError:
+        return None
+
+
+@lru_cache(maxsize=_STATEMENT_CACHE_SIZE)
+def _with_row_limit(query: str) -> str:
+    """Add LIMIT _MAX_ROWS + 1 to a single SELECT that has no LIMIT.
+
+    SQLite then stops producing rows the tool would discard anyway. Anything
+    that isn't a plain query, or can't be parsed, is returned unchanged. The
+    clause is spliced in after the last token rather than regenerating the
+    SQL from the tree, so result column names stay exactly as written.
+    """
+    statements = _parse_sql(query)
+    if not statements or len(statements) != 1:
+        return query
+    stmt = statements[0]
+    if not isinstance(stmt, sqlglot_exp.Query) or stmt.args.get("limit"):
+        return query
+
+    try:
+        tokens = sqlglot.tokenize(query, read="sqlite")
+    except sqlglot.errors.SqlglotError:
+        return query
+    while tokens and tokens[-1].token_type == TokenType.SEMICOLON:
+        tokens.pop()
+    if not tokens:
+        return query
+    return f"{query[:tokens[-1].end + 1]} LIMIT {_MAX_ROWS + 1}"
+
 
 class DatabaseTool(BaseTool):
     """Execute SQL queries on SQLite database"""
 
+    # Blocked dangerous operations
+    _BLOCKED_RE = re.compile(
+        r"\b(DROP\s+(?:DATABASE|TABLE)|TRUNCATE|ALTER\s+TABLE|GRANT|REVOKE)\b",
+        re.IGNORECASE
+    )
+    # Fallback for mass deletes when sqlglot isn't installed: a DELETE with
+    # no WHERE anywhere after it
+    _DELETE_ALL_RE = re.compile(r"\bDELETE\b(?![\s\S]*\bWHERE\b)", re.IGNORECASE)
+    # PRAGMA name and the character after it, past any leading comments and
+    # schema prefix; both "= value" and "(value)" set a pragma, which could
+    # undo the connection setup (e.g. journal_mode), so only known read-only
+    # pragmas are let through
+    _PRAGMA_RE = re.compile(
+        r"^(?:\s+|--[^\n]*(?:\n|$)|/\*[\s\S]*?\*/)*PRAGMA\b"
+        r"(?:\s*[\"`\[]?\w+[\"`\]]?\s*\.)?\s*[\"`\[]?(\w*)[\"`\]]?\s*(.?)",
+        re.IGNORECASE
+    )
+    # Introspection pragmas: a parenthesized argument names a table/index
+    _PRAGMA_INTROSPECTION = frozenset({
+        "table_info", "table_xinfo", "table_list", "index_list", "index_info",
+        "index_xinfo", "foreign_key_list", "foreign_key_check", "integrity_check",
+        "quick_check", "database_list", "collation_list", "function_list",
+        "module_list", "pragma_list", "compile_options",
+    })
+    # Setting pragmas: readable, but any argument would change them
+    _PRAGMA_STATUS = frozenset({
+        "journal_mode", "synchronous", "temp_store", "mmap_size", "cache_size",
+        "page_size", "page_count", "freelist_count", "max_page_count",
+        "schema_version", "user_version", "application_id", "data_version",
+        "encoding", "foreign_keys", "auto_vacuum",
+    })
+
     def __init__(self, db_path: str = "./data/agent.db"):
         self.db_path = Path(db_path).resolve()
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
 
-        # Blocked dangerous operations
-        self.blocked_patterns = [
-            "DROP DATABASE",
-            "DROP TABLE",
-            "TRUNCATE",
-            "DELETE FROM" + " " * 10,  # Prevent mass delete without WHERE
-            "ALTER TABLE",
-            "GRANT",
-            "REVOKE"
-        ]
+        # Opened lazily and reused; the lock keeps execute+fetch+commit atomic
+        self._db: aiosqlite.Connection | None = None
+        self._db_lock = asyncio.Lock()
+
+        # Rendered schema keyed by PRAGMA schema_version, which SQLite bumps on any DDL
+        self._schema_cache: tuple[int, str] | None = None
 
     @property
     def name(self) -> str:
@@ -56,13 +162,54 @@ Useful for storing and querying structured data."""
             "required": ["query"]
         }
 
+    async def _get_db(self) -> aiosqlite.Connection:
+        """Return the shared connection, opening and configuring it on first use"""
+        if self._db is None:
+            # sqlite3 reuses compiled statements for repeated SQL text, so
+            # hot queries skip SQLite's parser and planner
+            db = await aiosqlite.connect(self.db_path, cached_statements=_STATEMENT_CACHE_SIZE)
+            try:
+                await db.executescript(_CONNECTION_PRAGMAS)
+            except Exception:
+                await db.close()
+                raise
+            db.row_factory = aiosqlite.Row
+            self._db = db
+        return self._db
+
+    async def close(self):
+        """Close the shared connection"""
+        async with self._db_lock:
+            if self._db is not None:
+                await self._db.close()
+                self._db = None
+
     def _is_blocked(self, query: str) -> tuple[bool, str]:
         """Check if query contains blocked patterns"""
-        query_upper = query.upper().strip()
+        match = self._BLOCKED_RE.search(query)
+        if match:
+            return True, f"Query contains blocked pattern: {match.group(0).upper()}"
+
+        pragma = self._PRAGMA_RE.match(query)
+        if pragma:
+            pragma_name, following = pragma.group(1).lower(), pragma.group(2)
+            if pragma_name in self._PRAGMA_INTROSPECTION:
+                allowed = following in ("", ";", "(")
+            else:
+                allowed = pragma_name in self._PRAGMA_STATUS and following in ("", ";")
+            if not allowed:
+                return True, "Only read-only PRAGMA queries are allowed"
+
+        statements = _parse_sql(query) if SQLGLOT_AVAILABLE else None
+        if statements is None:
+            if self._DELETE_ALL_RE.search(query):
+                return True, "DELETE without WHERE clause"
+            return False, ""
 
-        for pattern in self.blocked_patterns:
-            if pattern in query_upper:
-                return True, f"Query contains blocked pattern: {pattern}"
+        if len(statements) > 1:
+            return True, "Only one statement can be executed at a time"
+        if any(isinstance(stmt, sqlglot_exp.Delete) and not stmt.args.get("where") for stmt in statements):
+            return True, "DELETE without WHERE clause"
 
         return False, ""
 
@@ -89,18 +236,25 @@ Useful for storing and querying structured data."""
             )
 
         try:
+            sql = query
             if explain:
-                query = f"EXPLAIN QUERY PLAN {query}"
+                query = sql = f"EXPLAIN QUERY PLAN {query}"
+            elif SQLGLOT_AVAILABLE and self._is_read_only(query):
+                # Let SQLite stop at the row limit instead of producing rows
+                # that are only fetched to be thrown away
+                sql = _with_row_limit(query)
 
-            async with aiosqlite.connect(self.db_path) as db:
-                db.row_factory = aiosqlite.Row
+            async with self._db_lock:
+                db = await self._get_db()
 
-                cursor = await db.execute(query, params)
+                cursor = await db.execute(sql, params)
 
                 if self._is_read_only(query):
-                    # Fetch results
-                    rows = await cursor.fetchall()
+                    # Fetch one row past the limit so truncation is detectable
+                    # without materializing the rest of the result set
+                    rows = await cursor.fetchmany(_MAX_ROWS + 1)
                     columns = [description[0] for description in cursor.description] if cursor.description else []
+                    await cursor.close()
 
                     if not rows:
                         return ToolResult(
@@ -108,23 +262,29 @@ Useful for storing and querying structured data."""
                             output=f"**Query:** `{query}`\n\n**Result:** No rows returned"
                         )
 
-                    # Format as table
-                    results = [dict(row) for row in rows]
-
                     # Limit results
-                    max_rows = 100
-                    truncated = len(results) > max_rows
+                    truncated = len(rows) > _MAX_ROWS
                     if truncated:
-                        results = results[:max_rows]
+                        rows = rows[:_MAX_ROWS]
+
+                    # Format as table
+                    results = [dict(row) for row in rows]
 
                     # Format output
                     output = f"**Query:** `{query}`\n\n"
                     output += f"**Columns:** {', '.join(columns)}\n"
                     output += f"**Rows:** {len(results)}"
                     if truncated:
-                        output += f" (truncated from {cursor.rowcount})"
+                        output += "+ (truncated)"
                     output += "\n\n**Results:**\n```json\n"
-                    output += json.dumps(results, indent=2, default=str)
+                    if ORJSON_AVAILABLE:
+                        output += orjson.dumps(
+                            results,
+                            default=_json_default,
+                            option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+                        ).decode("utf-8")
+                    else:
+                        output += json.dumps(results, indent=2, default=str)
                     output += "\n```"
 
                     return ToolResult(success=True, output=output)
@@ -140,6 +300,10 @@ Useful for storing and querying structured data."""
                     )
 
         except aiosqlite.Error as e:
+            # The connection outlives this call, so don't leave a failed
+            # write's transaction open for the next query
+            if self._db is not None and self._db.in_transaction:
+                await self._db.rollback()
             return ToolResult(
                 success=False,
                 output=f"**Query:** `{query}`",
@@ -155,22 +319,26 @@ Useful for storing and querying structured data."""
     async def get_schema(self) -> ToolResult:
         """Get database schema"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self._db_lock:
+                db = await self._get_db()
+                cursor = await db.execute("PRAGMA schema_version")
+                version = (await cursor.fetchone())[0]
+                if self._schema_cache is not None and self._schema_cache[0] == version:
+                    return ToolResult(success=True, output=self._schema_cache[1])
+
                 cursor = await db.execute(
                     "SELECT name, sql FROM sqlite_master WHERE type='table'"
                 )
                 tables = await cursor.fetchall()
 
                 if not tables:
-                    return ToolResult(
-                        success=True,
-                        output="**Database Schema:** No tables found"
-                    )
-
-                output = "**Database Schema:**\n\n"
-                for table in tables:
-                    output += f"### {table[0]}\n```sql\n{table[1]}\n```\n\n"
+                    output = "**Database Schema:** No tables found"
+                else:
+                    output = "**Database Schema:**\n\n"
+                    for table in tables:
+                        output += f"### {table[0]}\n```sql\n{table[1]}\n```\n\n"
 
+                self._schema_cache = (version, output)
                 return ToolResult(success=True, output=output)
 
         except Exception as e:
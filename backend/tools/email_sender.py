@@ -1,6 +1,9 @@
 import asyncio
+from email import policy
+from email.message import Message
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
+from functools import lru_cache
 from typing import List
 from .base import BaseTool, ToolResult
 
@@ -10,6 +13,32 @@ try:
 except ImportError:
     SMTP_AVAILABLE = False
 
+# Same serialization aiosmtplib applies to MIME objects (compat32, CRLF)
+_WIRE_POLICY = policy.compat32.clone(linesep="\r\n")
+
+
+@lru_cache(maxsize=32)
+def _render_message(from_addr: str, subject: str, body: str, html: bool) -> bytes:
+    """Serialize everything except the recipient headers.
+
+    Sends that reuse a template (same subject and body) skip MIME assembly
+    and transfer encoding entirely; only the To/Cc lines are built per send.
+    """
+    msg = MIMEMultipart("alternative")
+    msg["Subject"] = subject
+    msg["From"] = from_addr
+    msg.attach(MIMEText(body, "html" if html else "plain"))
+    return msg.as_bytes(policy=_WIRE_POLICY)
+
+
+def _recipient_headers(to: List[str], cc: List[str] | None) -> bytes:
+    """Serialize the To/Cc header block (CRLF-terminated, no blank line)"""
+    headers = Message()
+    headers["To"] = ", ".join(to)
+    if cc:
+        headers["Cc"] = ", ".join(cc)
+    return headers.as_bytes(policy=_WIRE_POLICY)[:-2]
+
 
 class EmailSenderTool(BaseTool):
     """Send emails via SMTP"""
@@ -29,6 +58,11 @@ class EmailSenderTool(BaseTool):
         self.require_confirmation = require_confirmation
         self.pending_email = None
 
+        # One authenticated connection reused across sends; the lock keeps
+        # concurrent sends from interleaving SMTP commands on it
+        self._smtp = None
+        self._smtp_lock = asyncio.Lock()
+
     @property
     def name(self) -> str:
         return "send_email"
@@ -146,6 +180,44 @@ Call `confirm_send_email` to send this email."""
             email["html"]
         )
 
+    async def _get_smtp(self) -> "aiosmtplib.SMTP":
+        """Return the shared SMTP client, connecting and logging in if needed"""
+        if self._smtp is None or not self._smtp.is_connected:
+            smtp = aiosmtplib.SMTP(
+                hostname=self.smtp_host,
+                port=self.smtp_port,
+                start_tls=True
+            )
+            await smtp.connect()
+            try:
+                await smtp.login(self.smtp_user, self.smtp_password)
+            except Exception:
+                smtp.close()
+                raise
+            self._smtp = smtp
+        return self._smtp
+
+    async def _send_message(self, recipients: List[str], message: bytes) -> None:
+        """Send over the shared connection, reconnecting once if the server dropped it"""
+        async with self._smtp_lock:
+            smtp = await self._get_smtp()
+            try:
+                await smtp.sendmail(self.smtp_user, recipients, message)
+            except aiosmtplib.SMTPServerDisconnected:
+                self._smtp = None
+                smtp = await self._get_smtp()
+                await smtp.sendmail(self.smtp_user, recipients, message)
+
+    async def close(self):
+        """Close the shared SMTP connection"""
+        async with self._smtp_lock:
+            if self._smtp is not None and self._smtp.is_connected:
+                try:
+                    await self._smtp.quit()
+                except aiosmtplib.SMTPException:
+                    self._smtp.close()
+            self._smtp = None
+
     async def _send_email(
         self,
         to: List[str],
@@ -155,33 +227,16 @@ Call `confirm_send_email` to send this email."""
         html: bool
     ) -> ToolResult:
         try:
-            # Create message
-            msg = MIMEMultipart("alternative")
-            msg["Subject"] = subject
-            msg["From"] = self.smtp_user
-            msg["To"] = ", ".join(to)
-
-            if cc:
-                msg["Cc"] = ", ".join(cc)
-
-            # Add body
-            if html:
-                msg.attach(MIMEText(body, "html"))
-            else:
-                msg.attach(MIMEText(body, "plain"))
+            # Create message: cached body + per-send recipient headers
+            message = _recipient_headers(to, cc) + _render_message(
+                self.smtp_user, subject, body, html
+            )
 
             # All recipients
             all_recipients = to + (cc or [])
 
             # Send
-            await aiosmtplib.send(
-                msg,
-                hostname=self.smtp_host,
-                port=self.smtp_port,
-                username=self.smtp_user,
-                password=self.smtp_password,
-                start_tls=True
-            )
+            await self._send_message(all_recipients, message)
 
             return ToolResult(
                 success=True,
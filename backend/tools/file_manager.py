@@ -1,8 +1,14 @@
+import asyncio
 import os
 import aiofiles
 from pathlib import Path
 from .base import BaseTool, ToolResult
 
+# Reads are truncated to this many characters; UTF-8 needs at most 4 bytes
+# per character, so nothing past _MAX_READ_BYTES can make it into the output
+_MAX_READ_CHARS = 10000
+_MAX_READ_BYTES = _MAX_READ_CHARS * 4
+
 
 class FileManagerTool(BaseTool):
     def __init__(self, workspace_path: str = "./workspace"):
@@ -42,7 +48,8 @@ class FileManagerTool(BaseTool):
     def _resolve_path(self, path: str) -> Path:
         """Resolve path and ensure it's within workspace"""
         resolved = (self.workspace_path / path).resolve()
-        if not str(resolved).startswith(str(self.workspace_path)):
+        # Component-wise check: a sibling like "<workspace>-evil" doesn't pass
+        if not resolved.is_relative_to(self.workspace_path):
             raise ValueError("Path must be within workspace")
         return resolved
 
@@ -99,14 +106,7 @@ class FileManagerTool(BaseTool):
             )
 
         # List directory contents
-        items = []
-        for item in sorted(target.iterdir()):
-            rel_path = item.relative_to(self.workspace_path)
-            if item.is_dir():
-                items.append(f"  [DIR]  {rel_path}/")
-            else:
-                size = item.stat().st_size
-                items.append(f"  [FILE] {rel_path} ({size} bytes)")
+        items = await asyncio.to_thread(self._scan_dir, target)
 
         if not items:
             return ToolResult(success=True, output=f"**{path}** is empty")
@@ -116,6 +116,21 @@ class FileManagerTool(BaseTool):
             output=f"**Contents of {path}:**\n" + "\n".join(items)
         )
 
+    def _scan_dir(self, target: Path) -> list[str]:
+        """Format directory entries; DirEntry caches type info from readdir"""
+        workspace = str(self.workspace_path)
+        items = []
+        with os.scandir(target) as it:
+            entries = sorted(it, key=lambda e: e.name)
+        for entry in entries:
+            rel_path = os.path.relpath(entry.path, workspace)
+            if entry.is_dir():
+                items.append(f"  [DIR]  {rel_path}/")
+            else:
+                size = entry.stat().st_size
+                items.append(f"  [FILE] {rel_path} ({size} bytes)")
+        return items
+
     async def _read_file(self, path: str) -> ToolResult:
         target = self._resolve_path(path)
         if not target.exists():
@@ -132,13 +147,16 @@ class FileManagerTool(BaseTool):
                 error=f"Cannot read a directory: {path}"
             )
 
-        async with aiofiles.open(target, "r", encoding="utf-8") as f:
-            content = await f.read()
+        # Bounded binary read + one decode: memory stays constant no matter
+        # how large the file is
+        async with aiofiles.open(target, "rb") as f:
+            raw = await f.read(_MAX_READ_BYTES + 1)
+        truncated = len(raw) > _MAX_READ_BYTES
+        content = raw[:_MAX_READ_BYTES].decode("utf-8", errors="replace")
 
         # Truncate if too long
-        max_chars = 10000
-        if len(content) > max_chars:
-            content = content[:max_chars] + "\n\n[Content truncated...]"
+        if truncated or len(content) > _MAX_READ_CHARS:
+            content = content[:_MAX_READ_CHARS] + "\n\n[Content truncated...]"
 
         return ToolResult(
             success=True,
@@ -151,8 +169,10 @@ class FileManagerTool(BaseTool):
         # Create parent directories if needed
         target.parent.mkdir(parents=True, exist_ok=True)
 
-        async with aiofiles.open(target, "w", encoding="utf-8") as f:
-            await f.write(content)
+        # Encode once and write the bytes directly rather than through TextIOWrapper
+        encoded = content.encode("utf-8")
+        async with aiofiles.open(target, "wb") as f:
+            await f.write(encoded)
 
         return ToolResult(
             success=True,
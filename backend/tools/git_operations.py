@@ -2,10 +2,33 @@
 Git Operations Tool - Read-only Git repository operations
 """
 import asyncio
+import copy
 import os
+import re
+import time
+import weakref
+from collections import OrderedDict
 from typing import Optional
 from .base import BaseTool, ToolResult
 
+# Caps concurrent git processes across all repos at ~3/4 of the CPUs, so
+# bursts of queries overlap their I/O without thrashing the machine
+_GIT_CONCURRENCY = max(2, (os.cpu_count() or 4) * 3 // 4)
+# One semaphore per event loop: a semaphore is bound to the loop it first
+# blocks on, and tests or a reloaded app may run several loops in turn
+_git_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _git_semaphore() -> asyncio.Semaphore:
+    """The git process semaphore for the running event loop"""
+    loop = asyncio.get_running_loop()
+    semaphore = _git_semaphores.get(loop)
+    if semaphore is None:
+        semaphore = _git_semaphores[loop] = asyncio.Semaphore(_GIT_CONCURRENCY)
+    return semaphore
+
 
 class GitOperationsTool(BaseTool):
     """
@@ -22,8 +45,22 @@ class GitOperationsTool(BaseTool):
     or modifications to the repository are permitted.
     """
 
+    # Files git rewrites when the index, HEAD, history or remotes change
+    _STATE_FILES = ("index", "HEAD", os.path.join("logs", "HEAD"), "config")
+    # Working-tree edits don't touch .git, so cached info is also bounded in age
+    INFO_CACHE_TTL = 1.0
+    _FULL_SHA_RE = re.compile(r"[0-9a-f]{40}|[0-9a-f]{64}")
+    RESULT_CACHE_SIZE = 256
+
     def __init__(self, workspace_path: str):
         self.workspace_path = workspace_path
+        self._workspace_abs = os.path.abspath(workspace_path)
+        # repo_path -> (state key, cached_at, info)
+        self._info_cache: dict[str, tuple[tuple, float, dict]] = {}
+        # (repo_path, args, state key) -> successful result, in LRU order
+        self._result_cache: OrderedDict[tuple, ToolResult] = OrderedDict()
+        # repo_path -> absolute git dir, resolved once per repo
+        self._git_dir_cache: dict[str, str] = {}
 
     @property
     def name(self) -> str:
@@ -82,28 +119,26 @@ Available operations:
         """Execute a read-only Git operation."""
 
         # Validate and resolve path
-        repo_path = os.path.join(self.workspace_path, path)
-        repo_path = os.path.abspath(repo_path)
+        repo_path = os.path.abspath(os.path.join(self._workspace_abs, path))
 
         # Security check: ensure path is within workspace
-        if not repo_path.startswith(os.path.abspath(self.workspace_path)):
+        if repo_path != self._workspace_abs and not repo_path.startswith(self._workspace_abs + os.sep):
             return ToolResult(
                 success=False,
                 output="",
                 error="Path is outside workspace"
             )
 
-        # Check if directory exists
-        if not os.path.isdir(repo_path):
-            return ToolResult(
-                success=False,
-                output="",
-                error=f"Directory not found: {path}"
-            )
-
-        # Check if it's a Git repository
-        git_dir = os.path.join(repo_path, ".git")
-        if not os.path.isdir(git_dir):
+        # Check if it's a Git repository. Known repos are answered from the
+        # git dir cache without touching the filesystem; the directory itself
+        # is only stat'ed to pick the error message.
+        if await self._git_dir(repo_path) is None:
+            if not os.path.isdir(repo_path):
+                return ToolResult(
+                    success=False,
+                    output="",
+                    error=f"Directory not found: {path}"
+                )
             return ToolResult(
                 success=False,
                 output="",
@@ -165,9 +200,9 @@ Available operations:
                 error=f"Git operation failed: {str(e)}"
             )
 
-    async def _run_git(self, cwd: str, args: list) -> ToolResult:
-        """Run a Git command and return the result."""
-        try:
+    async def _exec_git(self, cwd: str, args: list) -> tuple[int, bytes, bytes]:
+        """Run a Git command and return (returncode, stdout, stderr) as raw bytes."""
+        async with _git_semaphore():
             process = await asyncio.create_subprocess_exec(
                 "git", *args,
                 cwd=cwd,
@@ -175,12 +210,49 @@ Available operations:
                 stderr=asyncio.subprocess.PIPE
             )
 
-            stdout, stderr = await asyncio.wait_for(
-                process.communicate(),
-                timeout=30  # 30 second timeout
-            )
+            async with asyncio.timeout(30):  # 30 second timeout
+                stdout, stderr = await process.communicate()
+        return process.returncode, stdout, stderr
+
+    async def _run_git(self, cwd: str, args: list) -> ToolResult:
+        """Run a Git command and return the result, cached while the repo state is unchanged."""
+        key = self._result_cache_key(cwd, args)
+        if key is not None:
+            cached = self._result_cache.get(key)
+            if cached is not None:
+                self._result_cache.move_to_end(key)
+                return cached.model_copy()
+
+        result = await self._run_git_uncached(cwd, args)
+
+        if key is not None and result.success:
+            self._result_cache[key] = result.model_copy()
+            if len(self._result_cache) > self.RESULT_CACHE_SIZE:
+                self._result_cache.popitem(last=False)
+        return result
+
+    def _result_cache_key(self, cwd: str, args: list) -> Optional[tuple]:
+        """Cache key for a read-only command, or None if it must always run.
+
+        Only output that can't change behind a stat is cached: status, diff
+        and blame read the working tree, and log, branches and show <ref>
+        depend on refs, which can be nested arbitrarily deep under refs/ (or
+        packed) so no fixed set of mtimes tracks them.
+        """
+        # A full object id names immutable content, whatever HEAD is doing
+        if args[0] == "show" and self._FULL_SHA_RE.fullmatch(args[1]):
+            return (cwd, tuple(args))
+        # Remotes live in .git/config, which is part of the state key
+        if args[0] == "remote":
+            return (cwd, tuple(args), self._state_key(cwd))
+        return None
+
+    async def _run_git_uncached(self, cwd: str, args: list) -> ToolResult:
+        """Run a Git command and return the result."""
+        try:
+            returncode, stdout, stderr = await self._exec_git(cwd, args)
 
-            if process.returncode == 0:
+            if returncode == 0:
                 return ToolResult(
                     success=True,
                     output=stdout.decode("utf-8", errors="replace")
@@ -205,10 +277,17 @@ Available operations:
                 error="Git is not installed or not in PATH"
             )
 
+    async def _run_git_raw(self, cwd: str, args: list) -> bytes | None:
+        """Run a Git command and return undecoded stdout, or None on failure."""
+        try:
+            returncode, stdout, _ = await self._exec_git(cwd, args)
+        except (asyncio.TimeoutError, FileNotFoundError):
+            return None
+        return stdout if returncode == 0 else None
+
     async def get_repo_info(self, path: str = ".") -> dict:
         """Get comprehensive repository information."""
-        repo_path = os.path.join(self.workspace_path, path)
-        repo_path = os.path.abspath(repo_path)
+        repo_path = os.path.abspath(os.path.join(self._workspace_abs, path))
 
         info = {
             "is_git_repo": False,
@@ -219,41 +298,122 @@ Available operations:
         }
 
         # Check if Git repo
-        if not os.path.isdir(os.path.join(repo_path, ".git")):
+        if await self._git_dir(repo_path) is None:
             return info
 
         info["is_git_repo"] = True
 
-        # Get current branch
-        result = await self._run_git(repo_path, ["branch", "--show-current"])
-        if result.success:
-            info["current_branch"] = result.output.strip()
-
-        # Get status
-        result = await self._run_git(repo_path, ["status", "--porcelain"])
-        if result.success:
+        key = self._state_key(repo_path)
+        cached = self._info_cache.get(repo_path)
+        if (
+            cached is not None
+            and cached[0] == key
+            and time.monotonic() - cached[1] < self.INFO_CACHE_TTL
+        ):
+            return copy.deepcopy(cached[2])
+
+        # The queries are independent, so run the git processes concurrently
+        status_r, log_r, remotes_r = await asyncio.gather(
+            # porcelain v2 carries the branch header, so one process covers both
+            self._run_git(repo_path, ["status", "--branch", "--porcelain=v2"]),
+            # NUL-separated records, decoded one at a time below
+            self._run_git_raw(repo_path, ["log", "-5", "--format=%h %s", "-z"]),
+            self._run_git_raw(repo_path, ["remote", "-v"]),
+            return_exceptions=True
+        )
+
+        # Get current branch and status
+        result = status_r
+        if isinstance(result, ToolResult) and result.success:
+            branch, ahead, behind, changes = self._parse_status_v2(result.output)
+            info["current_branch"] = branch
             info["status"] = {
-                "clean": len(result.output.strip()) == 0,
-                "changes": result.output.strip().split("\n") if result.output.strip() else []
+                "clean": not changes,
+                "changes": changes,
+                "ahead": ahead,
+                "behind": behind
             }
 
         # Get recent commits
-        result = await self._run_git(repo_path, ["log", "-5", "--oneline"])
-        if result.success:
+        if isinstance(log_r, bytes):
             info["recent_commits"] = [
-                line.strip() for line in result.output.strip().split("\n")
-                if line.strip()
+                record.decode("utf-8", errors="replace")
+                for record in log_r.split(b"\0")
+                if record
             ]
 
         # Get remotes
-        result = await self._run_git(repo_path, ["remote", "-v"])
-        if result.success:
+        if isinstance(remotes_r, bytes):
             remotes = {}
-            for line in result.output.strip().split("\n"):
-                if line.strip():
-                    parts = line.split()
-                    if len(parts) >= 2:
-                        remotes[parts[0]] = parts[1]
+            for line in remotes_r.decode("utf-8", errors="replace").splitlines():
+                parts = line.split()
+                if len(parts) >= 2:
+                    remotes[parts[0]] = parts[1]
             info["remotes"] = list(remotes.items())
 
+        self._info_cache[repo_path] = (key, time.monotonic(), copy.deepcopy(info))
         return info
+
+    async def _git_dir(self, repo_path: str) -> Optional[str]:
+        """Resolve the repository's git dir, or None if repo_path isn't a repository.
+
+        `.git` may be a file (worktrees, submodules), so git itself is asked
+        where the real directory is; the answer is cached per repo.
+        """
+        git_dir = self._git_dir_cache.get(repo_path)
+        if git_dir is not None:
+            return git_dir
+
+        if not os.path.exists(os.path.join(repo_path, ".git")):
+            return None
+        stdout = await self._run_git_raw(repo_path, ["rev-parse", "--absolute-git-dir"])
+        if stdout is None:
+            return None
+
+        git_dir = os.fsdecode(stdout.rstrip(b"\n"))
+        self._git_dir_cache[repo_path] = git_dir
+        return git_dir
+
+    def _state_key(self, repo_path: str, names: tuple = _STATE_FILES) -> tuple:
+        """mtimes of the .git files that change with repository state"""
+        git_dir = self._git_dir_cache.get(repo_path) or os.path.join(repo_path, ".git")
+        key = []
+        for name in names:
+            try:
+                key.append(os.stat(os.path.join(git_dir, name)).st_mtime_ns)
+            except FileNotFoundError:
+                key.append(None)
+        return tuple(key)
+
+    @staticmethod
+    def _parse_status_v2(output: str) -> tuple[str, int, int, list[str]]:
+        """Parse `git status --branch --porcelain=v2` output.
+
+        Returns (branch, ahead, behind, changes) with changes rendered as
+        porcelain v1 "XY path" lines.
+        """
+        branch = ""
+        ahead = behind = 0
+        changes = []
+
+        for line in output.splitlines():
+            if line.startswith("# branch.head "):
+                head = line[len("# branch.head "):]
+                branch = "" if head == "(detached)" else head
+            elif line.startswith("# branch.ab "):
+                ab = line[len("# branch.ab "):].split()
+                ahead, behind = int(ab[0]), -int(ab[1])
+            elif line.startswith("1 "):
+                parts = line.split(" ", 8)
+                changes.append(f"{parts[1].replace('.', ' ')} {parts[8]}")
+            elif line.startswith("2 "):
+                parts = line.split(" ", 9)
+                new_path, _, orig_path = parts[9].partition("\t")
+                changes.append(f"{parts[1].replace('.', ' ')} {orig_path} -> {new_path}")
+            elif line.startswith("u "):
+                parts = line.split(" ", 10)
+                changes.append(f"{parts[1]} {parts[10]}")
+            elif line.startswith("? "):
+                changes.append(f"?? {line[2:]}")
+
+        return branch, ahead, behind, changes
@@ -0,0 +1,47 @@
+"""
+Process-wide HTTP client shared by the tools, so connections, TLS sessions
+and (with h2 installed) HTTP/2 streams are pooled across the whole agent.
+"""
+
+from http.cookiejar import CookieJar, DefaultCookiePolicy
+from typing import Optional
+
+import httpx
+
+try:
+    import h2  # noqa: F401  (enables HTTP/2 in httpx)
+    H2_AVAILABLE = True
+except ImportError:
+    H2_AVAILABLE = False
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def get_client() -> httpx.AsyncClient:
+    """Return the shared client, creating it on first use.
+
+    Per-caller settings (base URL, auth headers, redirects, timeouts) are
+    passed on each request rather than configured here. The client is
+    shared by every tool and user, so its cookie jar accepts nothing:
+    a Set-Cookie from one caller's response must never be sent on
+    another caller's request. Callers that need cookies send them as a
+    Cookie header.
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            http2=H2_AVAILABLE,
+            # No allowed domains: the jar rejects every cookie
+            cookies=CookieJar(policy=DefaultCookiePolicy(allowed_domains=[])),
+            timeout=30.0,
+            limits=httpx.Limits(max_keepalive_connections=64, max_connections=256)
+        )
+    return _client
+
+
+async def close_client() -> None:
+    """Close the shared client; the next get_client() opens a new one."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
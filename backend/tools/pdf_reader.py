@@ -1,3 +1,4 @@
+import asyncio
 from pathlib import Path
 from .base import BaseTool, ToolResult
 
@@ -7,10 +8,25 @@ try:
 except ImportError:
     PDF_AVAILABLE = False
 
+# Extracted text returned per call
+_MAX_CHARS = 20000
+
+# (document info key, label) pairs reported when extract_metadata is set
+_META_FIELDS = (
+    ("/Title", "Title"),
+    ("/Author", "Author"),
+    ("/Subject", "Subject"),
+    ("/Creator", "Creator"),
+)
+
 
 class PDFReaderTool(BaseTool):
     """Extract text from PDF documents"""
 
+    # Caps concurrent extractions so a burst of large PDFs can't occupy the
+    # whole default thread pool
+    _extract_semaphore = asyncio.Semaphore(4)
+
     def __init__(self, workspace_path: str = "./workspace", max_pages: int = 50):
         self.workspace_path = Path(workspace_path).resolve()
         self.max_pages = max_pages
@@ -51,6 +67,63 @@ Can read specific pages or the entire document."""
             "required": ["path"]
         }
 
+    def _extract_sync(
+        self,
+        file_path: Path,
+        start_page: int,
+        end_page: int,
+        extract_metadata: bool
+    ) -> dict:
+        """Read metadata and page text from a PDF (blocking)."""
+        # Read PDF
+        reader = PdfReader(str(file_path))
+        total_pages = len(reader.pages)
+
+        # Validate page range
+        if start_page < 1:
+            start_page = 1
+        if end_page <= 0 or end_page > total_pages:
+            end_page = min(total_pages, self.max_pages)
+        if end_page < start_page:
+            end_page = start_page
+
+        # Extract metadata
+        # Only fields that are actually set are listed; with none set the
+        # block is skipped (the page count is in the text header anyway)
+        metadata_str = ""
+        meta = reader.metadata if extract_metadata else None
+        if meta:
+            lines = [f"- {label}: {meta[key]}" for key, label in _META_FIELDS if meta.get(key)]
+            if lines:
+                lines.append(f"- Pages: {total_pages}")
+                metadata_str = "**Metadata:**\n" + "\n".join(lines) + "\n\n"
+
+        # Extract text, stopping once the output budget is exceeded so
+        # pages that would be truncated away are never decoded
+        text_content = []
+        total_len = 0
+        truncated = False
+        for page_num in range(start_page - 1, end_page):
+            text = reader.pages[page_num].extract_text()
+            if text and not text.isspace():
+                chunk = f"--- Page {page_num + 1} ---\n{text}"
+                if text_content:
+                    total_len += 2  # "\n\n" separator
+                total_len += len(chunk)
+                text_content.append(chunk)
+                if total_len > _MAX_CHARS:
+                    truncated = True
+                    break
+
+        return {
+            "metadata": metadata_str,
+            "pages": text_content,
+            "truncated": truncated,
+            "start_page": start_page,
+            "end_page": end_page,
+            "total_pages": total_pages
+        }
+
     async def execute(
         self,
         path: str,
@@ -83,38 +156,17 @@ Can read specific pages or the entire document."""
                     error="File is not a PDF"
                 )
 
-            # Read PDF
-            reader = PdfReader(str(file_path))
-            total_pages = len(reader.pages)
-
-            # Validate page range
-            if start_page < 1:
-                start_page = 1
-            if end_page <= 0 or end_page > total_pages:
-                end_page = min(total_pages, self.max_pages)
-            if end_page < start_page:
-                end_page = start_page
-
-            # Extract metadata
-            metadata_str = ""
-            if extract_metadata and reader.metadata:
-                meta = reader.metadata
-                metadata_str = f"""**Metadata:**
-- Title: {meta.get('/Title', 'N/A')}
-- Author: {meta.get('/Author', 'N/A')}
-- Subject: {meta.get('/Subject', 'N/A')}
-- Creator: {meta.get('/Creator', 'N/A')}
-- Pages: {total_pages}
-
-"""
-
-            # Extract text
-            text_content = []
-            for page_num in range(start_page - 1, end_page):
-                page = reader.pages[page_num]
-                text = page.extract_text()
-                if text.strip():
-                    text_content.append(f"--- Page {page_num + 1} ---\n{text}")
+            # PyPDF2 is synchronous and CPU-heavy; keep it off the event loop
+            async with self._extract_semaphore:
+                extracted = await asyncio.to_thread(
+                    self._extract_sync, file_path, start_page, end_page, extract_metadata
+                )
+            metadata_str = extracted["metadata"]
+            text_content = extracted["pages"]
+            truncated = extracted["truncated"]
+            start_page = extracted["start_page"]
+            end_page = extracted["end_page"]
+            total_pages = extracted["total_pages"]
 
             if not text_content:
                 return ToolResult(
@@ -125,9 +177,8 @@ Can read specific pages or the entire document."""
             full_text = "\n\n".join(text_content)
 
             # Truncate if too long
-            max_chars = 20000
-            if len(full_text) > max_chars:
-                full_text = full_text[:max_chars] + "\n\n[Content truncated...]"
+            if truncated:
+                full_text = full_text[:_MAX_CHARS] + "\n\n[Content truncated...]"
 
             output = f"""**PDF: {path}**
 {metadata_str}**Extracted Text (Pages {start_page}-{end_page} of {total_pages}):**
@@ -1,14 +1,268 @@
 import asyncio
 import base64
+import functools
+import json
+import logging
+import os
+import shutil
+import tempfile
 from pathlib import Path
+from typing import Callable
+
+import aiofiles
+
 from .base import BaseTool, ToolResult
 
+logger = logging.getLogger(__name__)
+
 try:
     from playwright.async_api import async_playwright
+    from playwright.async_api import TimeoutError as PlaywrightTimeoutError
     PLAYWRIGHT_AVAILABLE = True
 except ImportError:
     PLAYWRIGHT_AVAILABLE = False
 
+try:
+    import websockets
+    WEBSOCKETS_AVAILABLE = True
+except ImportError:
+    WEBSOCKETS_AVAILABLE = False
+
+_CDP_STARTUP_TIMEOUT = 10  # seconds
+_CDP_NAVIGATION_TIMEOUT = 30  # seconds, same as Playwright's default
+_CHROME_NAMES = ("chromium", "chromium-browser", "google-chrome", "google-chrome-stable")
+
+
+@functools.cache
+def _find_chrome() -> str | None:
+    """Locate a Chrome/Chromium binary: $CHROME_PATH, PATH, then Playwright's download"""
+    if os.environ.get("CHROME_PATH"):
+        return os.environ["CHROME_PATH"]
+    for name in _CHROME_NAMES:
+        path = shutil.which(name)
+        if path:
+            return path
+    cache = Path.home() / ".cache" / "ms-playwright"
+    for path in sorted(cache.glob("chromium-*/chrome-linux/chrome"), reverse=True):
+        return str(path)
+    return None
+
+
+class _CDPBrowser:
+    """Minimal Chrome DevTools Protocol client for a persistent headless Chrome.
+
+    One websocket to the browser endpoint carries every command; page sessions
+    are multiplexed over it with flattened sessionIds.
+    """
+
+    def __init__(self, executable: str):
+        self.executable = executable
+        self._process = None
+        self._profile_dir = None
+        self._ws = None
+        self._reader = None
+        self._next_id = 0
+        self._pending: dict[int, asyncio.Future] = {}
+        # (sessionId, method) -> (future, predicate on the event params)
+        self._event_waiters: dict[tuple, tuple[asyncio.Future, Callable[[dict], bool] | None]] = {}
+
+    @property
+    def is_running(self) -> bool:
+        return self._reader is not None and not self._reader.done()
+
+    async def start(self):
+        self._profile_dir = tempfile.mkdtemp(prefix="cdp-profile-")
+        args = [
+            "--headless=new",
+            "--remote-debugging-port=0",
+            f"--user-data-dir={self._profile_dir}",
+            "--no-first-run",
+            "--no-default-browser-check",
+            "--hide-scrollbars",
+        ]
+        # Chrome refuses to start its sandbox as root (e.g. in containers);
+        # Playwright passes the same flag there
+        if hasattr(os, "geteuid") and os.geteuid() == 0:
+            args.append("--no-sandbox")
+        self._process = await asyncio.create_subprocess_exec(
+            self.executable,
+            *args,
+            "about:blank",
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.DEVNULL
+        )
+
+        # With port 0 Chrome picks a free port and writes it, plus the browser
+        # endpoint path, to DevToolsActivePort once it is listening
+        port_file = Path(self._profile_dir) / "DevToolsActivePort"
+        async with asyncio.timeout(_CDP_STARTUP_TIMEOUT):
+            while True:
+                if self._process.returncode is not None:
+                    raise RuntimeError("Chrome exited during startup")
+                try:
+                    port, path = port_file.read_text().splitlines()[:2]
+                except (FileNotFoundError, ValueError):
+                    await asyncio.sleep(0.05)
+                    continue
+                break
+
+        self._ws = await websockets.connect(f"ws://127.0.0.1:{port}{path}", max_size=None)
+        self._reader = asyncio.create_task(self._read_loop())
+
+    async def _read_loop(self):
+        """Route command responses and awaited events to their futures"""
+        try:
+            async for raw in self._ws:
+                message = json.loads(raw)
+                if "id" in message:
+                    future = self._pending.pop(message["id"], None)
+                    if future is None or future.done():
+                        continue
+                    if "error" in message:
+                        future.set_exception(RuntimeError(message["error"].get("message", "CDP error")))
+                    else:
+                        future.set_result(message.get("result", {}))
+                else:
+                    key = (message.get("sessionId"), message.get("method"))
+                    waiter = self._event_waiters.get(key)
+                    if waiter is None:
+                        continue
+                    future, predicate = waiter
+                    params = message.get("params", {})
+                    if predicate is not None and not predicate(params):
+                        continue
+                    del self._event_waiters[key]
+                    if not future.done():
+                        future.set_result(params)
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            for future in [*self._pending.values(), *(f for f, _ in self._event_waiters.values())]:
+                if not future.done():
+                    future.set_exception(ConnectionError("DevTools connection closed"))
+            self._pending.clear()
+            self._event_waiters.clear()
+
+    async def send(self, method: str, params: dict | None = None, session_id: str | None = None) -> dict:
+        """Send a command and wait for its result"""
+        if not self.is_running:
+            raise ConnectionError("DevTools connection closed")
+
+        self._next_id += 1
+        message = {"id": self._next_id, "method": method, "params": params or {}}
+        if session_id:
+            message["sessionId"] = session_id
+        future = asyncio.get_running_loop().create_future()
+        self._pending[self._next_id] = future
+        await self._ws.send(json.dumps(message))
+        return await future
+
+    def wait_for_event(
+        self,
+        method: str,
+        session_id: str | None = None,
+        predicate: Callable[[dict], bool] | None = None
+    ) -> asyncio.Future:
+        """Return a future for the next matching event; register before triggering it"""
+        future = asyncio.get_running_loop().create_future()
+        self._event_waiters[(session_id, method)] = (future, predicate)
+        return future
+
+    async def capture(self, url: str, width: int, height: int, wait_time: int) -> tuple[bytes, str]:
+        """Load url in a fresh browser context and return (png bytes, page title)"""
+        # A throwaway context per capture keeps cookies/storage isolated, as
+        # with the Playwright path
+        context = await self.send("Target.createBrowserContext")
+        context_id = context["browserContextId"]
+        session_id = None
+        try:
+            target = await self.send(
+                "Target.createTarget",
+                {"url": "about:blank", "browserContextId": context_id}
+            )
+            attached = await self.send(
+                "Target.attachToTarget",
+                {"targetId": target["targetId"], "flatten": True}
+            )
+            session_id = attached["sessionId"]
+
+            await self.send(
+                "Emulation.setDeviceMetricsOverride",
+                {"width": width, "height": height, "deviceScaleFactor": 1, "mobile": False},
+                session_id
+            )
+            await self.send("Page.enable", session_id=session_id)
+            await self.send("Page.setLifecycleEventsEnabled", {"enabled": True}, session_id)
+
+            # Same readiness as the Playwright path: load plus network idle
+            # (no requests for 500ms) of this navigation's document
+            loader = {}
+            loaded = self.wait_for_event("Page.loadEventFired", session_id)
+            network_idle = self.wait_for_event(
+                "Page.lifecycleEvent",
+                session_id,
+                lambda event: event.get("name") == "networkIdle" and event.get("loaderId") == loader.get("id")
+            )
+
+            async with asyncio.timeout(_CDP_NAVIGATION_TIMEOUT):
+                navigation = await self.send("Page.navigate", {"url": url}, session_id)
+                if navigation.get("errorText"):
+                    raise RuntimeError(f"Navigation failed: {navigation['errorText']}")
+                loader["id"] = navigation.get("loaderId")
+                await asyncio.gather(loaded, network_idle)
+
+            # Then, bounded by wait_time, let the document finish if it still isn't complete
+            if wait_time > 0:
+                try:
+                    async with asyncio.timeout(wait_time / 1000):
+                        await self.send(
+                            "Runtime.evaluate",
+                            {
+                                "expression": (
+                                    "document.readyState === 'complete' || new Promise("
+                                    "r => addEventListener('load', () => r(true), {once: true}))"
+                                ),
+                                "awaitPromise": True,
+                            },
+                            session_id
+                        )
+                except TimeoutError:
+                    pass
+
+            title = await self.send(
+                "Runtime.evaluate",
+                {"expression": "document.title", "returnByValue": True},
+                session_id
+            )
+            shot = await self.send("Page.captureScreenshot", {"format": "png"}, session_id)
+        finally:
+            if session_id is not None:
+                self._event_waiters.pop((session_id, "Page.loadEventFired"), None)
+                self._event_waiters.pop((session_id, "Page.lifecycleEvent"), None)
+            # Don't let a failed cleanup replace the error that got us here
+            try:
+                await self.send("Target.disposeBrowserContext", {"browserContextId": context_id})
+            except Exception as e:
+                logger.debug(f"Failed to dispose CDP browser context: {e}")
+
+        return base64.b64decode(shot["data"]), title["result"].get("value", "")
+
+    async def close(self):
+        if self._ws is not None:
+            await self._ws.close()
+        if self._reader is not None:
+            await self._reader
+        if self._process is not None and self._process.returncode is None:
+            self._process.terminate()
+            try:
+                async with asyncio.timeout(5):
+                    await self._process.wait()
+            except TimeoutError:
+                self._process.kill()
+                await self._process.wait()
+        if self._profile_dir is not None:
+            shutil.rmtree(self._profile_dir, ignore_errors=True)
+
 
 class ScreenshotTool(BaseTool):
     """Capture screenshots of web pages"""
@@ -17,6 +271,64 @@ class ScreenshotTool(BaseTool):
         self.workspace_path = Path(workspace_path).resolve()
         self.workspace_path.mkdir(parents=True, exist_ok=True)
 
+        # Chromium is launched once and shared; each screenshot gets its own
+        # context so cookies/storage don't leak between calls
+        self._playwright = None
+        self._browser = None
+        self._browser_lock = asyncio.Lock()
+
+        # Viewport-only shots skip the Playwright driver and talk CDP directly
+        # to a headless Chrome, when one is installed
+        self._cdp = None
+        self._cdp_lock = asyncio.Lock()
+        # Set when Chrome fails to launch, so later calls don't retry the launch
+        self._cdp_error: Exception | None = None
+
+    async def _ensure_browser(self):
+        """Return the shared browser, launching it on first use or after a crash"""
+        async with self._browser_lock:
+            if self._browser is None or not self._browser.is_connected():
+                if self._playwright is None:
+                    self._playwright = await async_playwright().start()
+                self._browser = await self._playwright.chromium.launch(headless=True)
+            return self._browser
+
+    async def _ensure_cdp(self) -> _CDPBrowser:
+        """Return the shared CDP browser, starting it on first use or after a crash"""
+        async with self._cdp_lock:
+            if self._cdp_error is not None:
+                raise RuntimeError(f"Chrome failed to start: {self._cdp_error}")
+            if self._cdp is None or not self._cdp.is_running:
+                if self._cdp is not None:
+                    await self._cdp.close()
+                    self._cdp = None
+                cdp = _CDPBrowser(_find_chrome())
+                try:
+                    await cdp.start()
+                except Exception as e:
+                    await cdp.close()
+                    self._cdp_error = e
+                    raise
+                except BaseException:
+                    await cdp.close()
+                    raise
+                self._cdp = cdp
+            return self._cdp
+
+    async def close(self):
+        """Shut down the shared browsers and Playwright driver"""
+        async with self._cdp_lock:
+            if self._cdp is not None:
+                await self._cdp.close()
+                self._cdp = None
+        async with self._browser_lock:
+            if self._browser is not None:
+                await self._browser.close()
+                self._browser = None
+            if self._playwright is not None:
+                await self._playwright.stop()
+                self._playwright = None
+
     @property
     def name(self) -> str:
         return "screenshot"
@@ -56,8 +368,13 @@ Useful for visual documentation, debugging, and capturing dynamic content."""
                 },
                 "wait_time": {
                     "type": "integer",
-                    "description": "Wait time in ms before screenshot",
+                    "description": "Maximum time in ms to wait for the page to settle before the screenshot",
                     "default": 1000
+                },
+                "return_base64": {
+                    "type": "boolean",
+                    "description": "Also include the PNG as a base64 data URI in the output",
+                    "default": False
                 }
             },
             "required": ["url"]
@@ -70,9 +387,14 @@ Useful for visual documentation, debugging, and capturing dynamic content."""
         full_page: bool = False,
         width: int = 1280,
         height: int = 720,
-        wait_time: int = 1000
+        wait_time: int = 1000,
+        return_base64: bool = False
     ) -> ToolResult:
-        if not PLAYWRIGHT_AVAILABLE:
+        use_cdp = not full_page and WEBSOCKETS_AVAILABLE and _find_chrome() is not None
+        if use_cdp and self._cdp_error is not None and PLAYWRIGHT_AVAILABLE:
+            # Chrome couldn't be launched before; go straight to Playwright
+            use_cdp = False
+        if not use_cdp and not PLAYWRIGHT_AVAILABLE:
             return ToolResult(
                 success=False,
                 output="",
@@ -86,33 +408,25 @@ Useful for visual documentation, debugging, and capturing dynamic content."""
 
             output_path = self.workspace_path / filename
 
-            async with async_playwright() as p:
-                browser = await p.chromium.launch(headless=True)
-                context = await browser.new_context(
-                    viewport={"width": width, "height": height}
-                )
-                page = await context.new_page()
-
-                # Navigate to URL
-                await page.goto(url, wait_until="networkidle")
-
-                # Wait additional time if specified
-                if wait_time > 0:
-                    await asyncio.sleep(wait_time / 1000)
+            png_bytes = None
+            if use_cdp:
+                try:
+                    cdp = await self._ensure_cdp()
+                    png_bytes, title = await cdp.capture(url, width, height, wait_time)
+                except Exception as e:
+                    if not PLAYWRIGHT_AVAILABLE:
+                        raise
+                    logger.warning(f"CDP screenshot failed, falling back to Playwright: {e}")
 
-                # Take screenshot
-                await page.screenshot(
-                    path=str(output_path),
-                    full_page=full_page
+            if png_bytes is None:
+                png_bytes, title = await self._capture_playwright(
+                    url, full_page, width, height, wait_time
                 )
 
-                # Get page title
-                title = await page.title()
+            async with aiofiles.open(output_path, "wb") as f:
+                await f.write(png_bytes)
 
-                await browser.close()
-
-            # Get file size
-            file_size = output_path.stat().st_size / 1024  # KB
+            file_size = len(png_bytes) / 1024  # KB
 
             output = f"""**Screenshot Captured**
 - **URL:** {url}
@@ -124,6 +438,10 @@ Useful for visual documentation, debugging, and capturing dynamic content."""
 
 Screenshot saved to: {output_path}"""
 
+            if return_base64:
+                encoded = base64.b64encode(png_bytes).decode("ascii")
+                output += f"\n\n**Base64:** data:image/png;base64,{encoded}"
+
             return ToolResult(success=True, output=output)
 
         except Exception as e:
@@ -132,3 +450,43 @@ Screenshot saved to: {output_path}"""
                 output="",
                 error=f"Screenshot failed: {str(e)}"
             )
+
+    async def _capture_playwright(
+        self,
+        url: str,
+        full_page: bool,
+        width: int,
+        height: int,
+        wait_time: int
+    ) -> tuple[bytes, str]:
+        """Capture with the shared Playwright browser; returns (png bytes, page title)"""
+        browser = await self._ensure_browser()
+        context = await browser.new_context(
+            viewport={"width": width, "height": height}
+        )
+        try:
+            page = await context.new_page()
+
+            # Navigate to URL
+            await page.goto(url, wait_until="networkidle")
+
+            # goto already waited for network idle; only wait further if
+            # the document still isn't complete, bounded by wait_time
+            if wait_time > 0:
+                try:
+                    await page.wait_for_function(
+                        'document.readyState === "complete"',
+                        timeout=wait_time
+                    )
+                except PlaywrightTimeoutError:
+                    pass
+
+            # Take screenshot into memory; the caller writes the file
+            png_bytes = await page.screenshot(full_page=full_page)
+
+            # Get page title
+            title = await page.title()
+        finally:
+            await context.close()
+
+        return png_bytes, title
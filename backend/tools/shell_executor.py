@@ -1,14 +1,30 @@
 import asyncio
+import functools
+import re
+import shlex
+import shutil
 import subprocess
 import os
 from pathlib import Path
 from typing import List
 from .base import BaseTool, ToolResult
 
+# Pipe reads match the Linux default pipe capacity
+_PIPE_READ_SIZE = 64 * 1024
+
+# Characters that need a real shell to interpret (pipes, redirection,
+# expansion, globbing, grouping, comments, escapes)
+_SHELL_METACHARS = frozenset("|&;<>()$`\\*?[]{}~#!\n")
+
 
 class ShellExecutorTool(BaseTool):
     """Execute shell commands with safety checks"""
 
+    __slots__ = (
+        "workspace_path", "timeout", "allowed_commands", "blocked_commands",
+        "_blocked_patterns", "_blocked_re", "_is_dangerous", "_shell_prefix"
+    )
+
     def __init__(
         self,
         workspace_path: str = "./workspace",
@@ -19,16 +35,18 @@ class ShellExecutorTool(BaseTool):
         self.workspace_path = Path(workspace_path).resolve()
         self.workspace_path.mkdir(parents=True, exist_ok=True)
         self.timeout = timeout
+        self._shell_prefix = ("cmd", "/c") if os.name == "nt" else ("bash", "-c")
 
-        # Default allowed commands (whitelist approach for safety)
-        self.allowed_commands = allowed_commands or [
+        # Default allowed commands (whitelist approach for safety); a
+        # frozenset so _is_allowed is a hash lookup
+        self.allowed_commands = frozenset(allowed_commands or [
             "ls", "dir", "pwd", "echo", "cat", "head", "tail", "grep", "find",
             "wc", "sort", "uniq", "curl", "wget", "pip", "python", "node", "npm",
             "git", "docker", "kubectl", "az", "aws", "gcloud",
             "mkdir", "touch", "cp", "mv", "which", "where", "type",
             "date", "whoami", "hostname", "df", "du", "free", "top", "ps",
             "ping", "nslookup", "dig", "traceroute", "netstat", "ifconfig", "ip"
-        ]
+        ])
 
         # Explicitly blocked dangerous commands
         self.blocked_commands = blocked_commands or [
@@ -38,6 +56,22 @@ class ShellExecutorTool(BaseTool):
             "del /f /s /q c:", "rd /s /q c:",
         ]
 
+        # All blocked patterns as one alternation, so a command is scanned
+        # once instead of once per pattern. Longest first, so the most
+        # specific pattern is reported when several match at one position.
+        # Each pattern gets its own group so the match maps back to it even
+        # when IGNORECASE matched a Unicode case variant (e.g. "ſ" for "s").
+        by_lower = {p.lower(): p for p in self.blocked_commands}
+        self._blocked_patterns = sorted(by_lower.values(), key=len, reverse=True)
+        self._blocked_re = re.compile(
+            "|".join(f"({re.escape(p)})" for p in self._blocked_patterns),
+            re.IGNORECASE
+        ) if self.blocked_commands else None
+
+        # The blocked list is fixed from here on, so verdicts can be memoized;
+        # agents tend to re-issue the same few commands (ls, pwd, git status)
+        self._is_dangerous = functools.lru_cache(maxsize=256)(self._check_dangerous)
+
     @property
     def name(self) -> str:
         return "shell_execute"
@@ -70,14 +104,13 @@ Safety checks are in place to prevent dangerous operations."""
             "required": ["command"]
         }
 
-    def _is_dangerous(self, command: str) -> tuple[bool, str]:
-        """Check if command is dangerous"""
-        command_lower = command.lower()
-
+    def _check_dangerous(self, command: str) -> tuple[bool, str]:
+        """Check if command is dangerous (memoized per instance as _is_dangerous)"""
         # Check blocked patterns
-        for blocked in self.blocked_commands:
-            if blocked.lower() in command_lower:
-                return True, f"Command contains blocked pattern: {blocked}"
+        match = self._blocked_re.search(command) if self._blocked_re else None
+        if match:
+            blocked = self._blocked_patterns[match.lastindex - 1]
+            return True, f"Command contains blocked pattern: {blocked}"
 
         return False, ""
 
@@ -91,6 +124,45 @@ Safety checks are in place to prevent dangerous operations."""
         base_cmd = parts[0].split("/")[-1].split("\\")[-1]  # Get just the command name
         return base_cmd in self.allowed_commands
 
+    def _direct_argv(self, command: str) -> list[str] | None:
+        """argv for running command without a shell, or None if it needs one"""
+        if os.name == "nt" or any(c in _SHELL_METACHARS for c in command):
+            return None
+        try:
+            argv = shlex.split(command)
+        except ValueError:  # unbalanced quotes
+            return None
+        # "VAR=value cmd" assignments and shell builtins need bash. Paths
+        # ("./run.sh", "bin/tool") are left to bash too: which() would resolve
+        # them against the server's cwd rather than the command's working dir.
+        if not argv or "=" in argv[0] or os.sep in argv[0] or shutil.which(argv[0]) is None:
+            return None
+        return argv
+
+    @staticmethod
+    async def _kill_process(process: asyncio.subprocess.Process) -> None:
+        """Stop a child, SIGTERM first with a 1s grace period, and always reap it"""
+        try:
+            process.terminate()
+            try:
+                async with asyncio.timeout(1.0):
+                    await process.wait()
+                return
+            except TimeoutError:
+                process.kill()
+        except ProcessLookupError:
+            pass  # already exited
+        # Shielded so a cancelled caller can't leave a zombie behind
+        await asyncio.shield(process.wait())
+
+    @staticmethod
+    async def _drain(stream: asyncio.StreamReader) -> bytearray:
+        """Read a pipe to EOF in large chunks into one growing buffer"""
+        buf = bytearray()
+        while chunk := await stream.read(_PIPE_READ_SIZE):
+            buf += chunk
+        return buf
+
     async def execute(
         self,
         command: str,
@@ -118,26 +190,28 @@ Safety checks are in place to prevent dangerous operations."""
         work_path.mkdir(parents=True, exist_ok=True)
 
         try:
-            # Determine shell based on OS
-            if os.name == 'nt':  # Windows
-                shell_cmd = ["cmd", "/c", command]
-            else:  # Unix-like
-                shell_cmd = ["bash", "-c", command]
+            # Simple commands are exec'd directly; anything else goes
+            # through the platform shell
+            argv = self._direct_argv(command) or [*self._shell_prefix, command]
 
             process = await asyncio.create_subprocess_exec(
-                *shell_cmd,
+                *argv,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
-                cwd=str(work_path)
+                cwd=str(work_path),
+                limit=1 << 20
             )
 
             try:
-                stdout, stderr = await asyncio.wait_for(
-                    process.communicate(),
-                    timeout=timeout
-                )
-            except asyncio.TimeoutError:
-                process.kill()
+                # Drain both pipes concurrently so neither can fill and stall the child
+                async with asyncio.timeout(timeout):
+                    stdout, stderr = await asyncio.gather(
+                        self._drain(process.stdout),
+                        self._drain(process.stderr)
+                    )
+                    await process.wait()
+            except TimeoutError:
+                await self._kill_process(process)
                 return ToolResult(
                     success=False,
                     output="",
@@ -2,24 +2,51 @@
 Slack integration tool for sending messages and reading channel history.
 """
 
+import asyncio
 import logging
 import os
+import time
+from collections import OrderedDict
 from typing import Optional, List
 from datetime import datetime, timezone
-
-import httpx
+from pathlib import Path
 
 from .base import BaseTool, ToolResult
+from .http_client import get_client
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    import json
+    ORJSON_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
 
+def _to_json(data) -> str:
+    """Compact JSON for tool output (the reader is an LLM, not a person)"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data).decode()
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+
+
 class SlackIntegrationTool(BaseTool):
     """Tool for Slack integration."""
 
+    # Channel lists and user profiles change rarely; reuse them for a while
+    CACHE_TTL = 300.0
+    CACHE_SIZE = 512
+
+    __slots__ = ("token", "base_url", "_headers", "_response_cache")
+
     def __init__(self):
         self.token = os.getenv("SLACK_BOT_TOKEN")
         self.base_url = "https://slack.com/api"
+        self._headers = {"Authorization": f"Bearer {self.token}"}
+        # (endpoint, params) -> (fetched_at, response JSON), in LRU order
+        self._response_cache: OrderedDict[tuple, tuple[float, dict]] = OrderedDict()
+
 
     @property
     def name(self) -> str:
@@ -58,7 +85,7 @@ class SlackIntegrationTool(BaseTool):
                 },
                 "user_id": {
                     "type": "string",
-                    "description": "User ID for get_user_info action"
+                    "description": "User ID for get_user_info action (comma-separate several to look them up at once)"
                 },
                 "file_path": {
                     "type": "string",
@@ -157,27 +184,26 @@ class SlackIntegrationTool(BaseTool):
         if thread_ts:
             payload["thread_ts"] = thread_ts
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.base_url}/chat.postMessage",
-                headers={"Authorization": f"Bearer {self.token}"},
-                json=payload
-            )
+        response = await get_client().post(
+            f"{self.base_url}/chat.postMessage",
+            headers=self._headers,
+            json=payload
+        )
 
-            data = response.json()
+        data = response.json()
 
-            if data.get("ok"):
-                logger.info(f"Message sent to {channel}")
-                return ToolResult(
-                    success=True,
-                    output=f"Message sent successfully to {channel}. Timestamp: {data.get('ts')}"
-                )
-            else:
-                return ToolResult(
-                    success=False,
-                    output="",
-                    error=f"Slack API error: {data.get('error', 'Unknown error')}"
-                )
+        if data.get("ok"):
+            logger.info(f"Message sent to {channel}")
+            return ToolResult(
+                success=True,
+                output=f"Message sent successfully to {channel}. Timestamp: {data.get('ts')}"
+            )
+        else:
+            return ToolResult(
+                success=False,
+                output="",
+                error=f"Slack API error: {data.get('error', 'Unknown error')}"
+            )
 
     async def _read_history(self, channel: Optional[str], limit: int) -> ToolResult:
         """Read message history from a channel."""
@@ -190,79 +216,73 @@ class SlackIntegrationTool(BaseTool):
 
         limit = min(limit, 100)  # Cap at 100
 
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.base_url}/conversations.history",
-                headers={"Authorization": f"Bearer {self.token}"},
-                params={"channel": channel, "limit": limit}
-            )
-
-            data = response.json()
+        response = await get_client().get(
+            f"{self.base_url}/conversations.history",
+            headers=self._headers,
+            params={"channel": channel, "limit": limit}
+        )
+
+        data = response.json()
+
+        if data.get("ok"):
+            messages = data.get("messages", [])
+            fromtimestamp = datetime.fromtimestamp
+            utc = timezone.utc
+            formatted_messages = [
+                {
+                    "user": msg.get("user", "unknown"),
+                    "text": msg.get("text", ""),
+                    "timestamp": fromtimestamp(float(msg.get("ts", 0)), utc).isoformat(),
+                    "thread_ts": msg.get("thread_ts"),
+                    "reply_count": msg.get("reply_count", 0)
+                }
+                for msg in messages
+            ]
 
-            if data.get("ok"):
-                messages = data.get("messages", [])
-                formatted_messages = []
-
-                for msg in messages:
-                    ts = float(msg.get("ts", 0))
-                    dt = datetime.fromtimestamp(ts, tz=timezone.utc)
-                    formatted_messages.append({
-                        "user": msg.get("user", "unknown"),
-                        "text": msg.get("text", ""),
-                        "timestamp": dt.isoformat(),
-                        "thread_ts": msg.get("thread_ts"),
-                        "reply_count": msg.get("reply_count", 0)
-                    })
-
-                import json
-                return ToolResult(
-                    success=True,
-                    output=json.dumps(formatted_messages, indent=2)
-                )
-            else:
-                return ToolResult(
-                    success=False,
-                    output="",
-                    error=f"Slack API error: {data.get('error', 'Unknown error')}"
-                )
+            return ToolResult(
+                success=True,
+                output=_to_json(formatted_messages)
+            )
+        else:
+            return ToolResult(
+                success=False,
+                output="",
+                error=f"Slack API error: {data.get('error', 'Unknown error')}"
+            )
 
     async def _list_channels(self) -> ToolResult:
         """List available Slack channels."""
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.base_url}/conversations.list",
-                headers={"Authorization": f"Bearer {self.token}"},
-                params={"types": "public_channel,private_channel", "limit": 100}
-            )
-
-            data = response.json()
+        data = await self._api_get(
+            "/conversations.list",
+            {"types": "public_channel,private_channel", "limit": 100},
+            cache=True
+        )
+
+        if data.get("ok"):
+            channels = data.get("channels", [])
+            formatted_channels = [
+                {
+                    "id": ch.get("id"),
+                    "name": ch.get("name"),
+                    "is_private": ch.get("is_private", False),
+                    "num_members": ch.get("num_members", 0)
+                }
+                for ch in channels
+            ]
 
-            if data.get("ok"):
-                channels = data.get("channels", [])
-                formatted_channels = [
-                    {
-                        "id": ch.get("id"),
-                        "name": ch.get("name"),
-                        "is_private": ch.get("is_private", False),
-                        "num_members": ch.get("num_members", 0)
-                    }
-                    for ch in channels
-                ]
-
-                import json
-                return ToolResult(
-                    success=True,
-                    output=json.dumps(formatted_channels, indent=2)
-                )
-            else:
-                return ToolResult(
-                    success=False,
-                    output="",
-                    error=f"Slack API error: {data.get('error', 'Unknown error')}"
-                )
+            return ToolResult(
+                success=True,
+                output=_to_json(formatted_channels)
+            )
+        else:
+            return ToolResult(
+                success=False,
+                output="",
+                error=f"Slack API error: {data.get('error', 'Unknown error')}"
+            )
 
     async def _get_user_info(self, user_id: Optional[str]) -> ToolResult:
-        """Get information about a Slack user."""
+        """Get information about a Slack user (or several, comma-separated)."""
         if not user_id:
             return ToolResult(
                 success=False,
@@ -270,39 +290,81 @@ class SlackIntegrationTool(BaseTool):
                 error="user_id is required for get_user_info action"
             )
 
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.base_url}/users.info",
-                headers={"Authorization": f"Bearer {self.token}"},
-                params={"user": user_id}
+        user_ids = [u.strip() for u in user_id.split(",") if u.strip()]
+        if len(user_ids) > 1:
+            return await self._get_users_info(user_ids)
+
+        data = await self._api_get("/users.info", {"user": user_ids[0]}, cache=True)
+
+        if data.get("ok"):
+            return ToolResult(
+                success=True,
+                output=_to_json(self._format_user(data.get("user", {})))
+            )
+        else:
+            return ToolResult(
+                success=False,
+                output="",
+                error=f"Slack API error: {data.get('error', 'Unknown error')}"
             )
 
-            data = response.json()
+    async def _get_users_info(self, user_ids: List[str]) -> ToolResult:
+        """Look up several users concurrently over the shared connection."""
+        results = await asyncio.gather(
+            *(self._api_get("/users.info", {"user": u}, cache=True) for u in user_ids)
+        )
 
+        users = []
+        for uid, data in zip(user_ids, results):
             if data.get("ok"):
-                user = data.get("user", {})
-                user_info = {
-                    "id": user.get("id"),
-                    "name": user.get("name"),
-                    "real_name": user.get("real_name"),
-                    "email": user.get("profile", {}).get("email"),
-                    "title": user.get("profile", {}).get("title"),
-                    "is_admin": user.get("is_admin", False),
-                    "is_bot": user.get("is_bot", False),
-                    "timezone": user.get("tz")
-                }
-
-                import json
-                return ToolResult(
-                    success=True,
-                    output=json.dumps(user_info, indent=2)
-                )
+                users.append(self._format_user(data.get("user", {})))
             else:
-                return ToolResult(
-                    success=False,
-                    output="",
-                    error=f"Slack API error: {data.get('error', 'Unknown error')}"
-                )
+                users.append({"id": uid, "error": data.get("error", "Unknown error")})
+
+        return ToolResult(
+            success=any(data.get("ok") for data in results),
+            output=_to_json(users)
+        )
+
+    @staticmethod
+    def _format_user(user: dict) -> dict:
+        """Pick the fields reported for a Slack user."""
+        return {
+            "id": user.get("id"),
+            "name": user.get("name"),
+            "real_name": user.get("real_name"),
+            "email": user.get("profile", {}).get("email"),
+            "title": user.get("profile", {}).get("title"),
+            "is_admin": user.get("is_admin", False),
+            "is_bot": user.get("is_bot", False),
+            "timezone": user.get("tz")
+        }
+
+    async def _api_get(self, endpoint: str, params: dict, cache: bool = False) -> dict:
+        """GET a Slack API method and return the decoded JSON.
+
+        With cache=True, successful responses are reused for CACHE_TTL seconds.
+        """
+        key = (endpoint, tuple(sorted(params.items())))
+        if cache:
+            entry = self._response_cache.get(key)
+            if entry is not None and time.monotonic() - entry[0] < self.CACHE_TTL:
+                self._response_cache.move_to_end(key)
+                return entry[1]
+
+        response = await get_client().get(
+            f"{self.base_url}{endpoint}",
+            headers=self._headers,
+            params=params
+        )
+        data = response.json()
+
+        if cache and data.get("ok"):
+            self._response_cache[key] = (time.monotonic(), data)
+            self._response_cache.move_to_end(key)
+            if len(self._response_cache) > self.CACHE_SIZE:
+                self._response_cache.popitem(last=False)
+        return data
 
     async def _upload_file(
         self,
@@ -326,7 +388,6 @@ class SlackIntegrationTool(BaseTool):
                 error="file_path is required for upload_file action"
             )
 
-        from pathlib import Path
         path = Path(file_path)
 
         if not path.exists():
@@ -336,35 +397,39 @@ class SlackIntegrationTool(BaseTool):
                 error=f"File not found: {file_path}"
             )
 
-        async with httpx.AsyncClient() as client:
-            files = {"file": (path.name, path.read_bytes())}
-            data = {
-                "channels": channel,
-            }
-            if file_title:
-                data["title"] = file_title
-            if message:
-                data["initial_comment"] = message
-
-            response = await client.post(
+        data = {
+            "channels": channel,
+        }
+        if file_title:
+            data["title"] = file_title
+        if message:
+            data["initial_comment"] = message
+
+        # Pass the open file so httpx streams it into the multipart body in
+        # chunks instead of holding the whole file in memory
+        f = await asyncio.to_thread(open, path, "rb")
+        try:
+            response = await get_client().post(
                 f"{self.base_url}/files.upload",
-                headers={"Authorization": f"Bearer {self.token}"},
+                headers=self._headers,
                 data=data,
-                files=files
+                files={"file": (path.name, f)}
             )
+        finally:
+            f.close()
 
-            result = response.json()
+        result = response.json()
 
-            if result.get("ok"):
-                file_info = result.get("file", {})
-                logger.info(f"File uploaded to {channel}: {file_info.get('name')}")
-                return ToolResult(
-                    success=True,
-                    output=f"File uploaded successfully. File ID: {file_info.get('id')}, URL: {file_info.get('permalink')}"
-                )
-            else:
-                return ToolResult(
-                    success=False,
-                    output="",
-                    error=f"Slack API error: {result.get('error', 'Unknown error')}"
-                )
+        if result.get("ok"):
+            file_info = result.get("file", {})
+            logger.info(f"File uploaded to {channel}: {file_info.get('name')}")
+            return ToolResult(
+                success=True,
+                output=f"File uploaded successfully. File ID: {file_info.get('id')}, URL: {file_info.get('permalink')}"
+            )
+        else:
+            return ToolResult(
+                success=False,
+                output="",
+                error=f"Slack API error: {result.get('error', 'Unknown error')}"
+            )
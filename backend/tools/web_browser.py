@@ -1,17 +1,34 @@
 import httpx
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 from .base import BaseTool, ToolResult
+from .http_client import get_client
+
+try:
+    import lxml  # noqa: F401  (BeautifulSoup's C-backed parser)
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
+# Only <title> and <body> are built into a tree; the rest of <head> is
+# skipped. Needs lxml, which wraps bare fragments in an implied <body>;
+# html.parser doesn't, so a strainer there would drop e.g. "<p>x</p>" entirely
+_TITLE_AND_BODY = SoupStrainer(["title", "body"]) if HTML_PARSER == "lxml" else None
+_DROP_SELECTOR = "script, style, nav, footer, header"
+
+# At most 8000 chars of text are returned, so stop downloading well past that
+_MAX_DOWNLOAD_BYTES = 512 * 1024
 
 
 class WebBrowserTool(BaseTool):
-    def __init__(self):
-        self.client = httpx.AsyncClient(
-            timeout=30.0,
-            follow_redirects=True,
-            headers={
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-            }
-        )
+    __slots__ = ()
+
+    _HEADERS = {
+        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+    }
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        return get_client()
 
     @property
     def name(self) -> str:
@@ -41,13 +58,28 @@ class WebBrowserTool(BaseTool):
 
     async def execute(self, url: str, extract_links: bool = False) -> ToolResult:
         try:
-            response = await self.client.get(url)
-            response.raise_for_status()
+            async with self.client.stream(
+                "GET", url, headers=self._HEADERS, follow_redirects=True
+            ) as response:
+                response.raise_for_status()
+                body = bytearray()
+                async for chunk in response.aiter_bytes():
+                    body += chunk
+                    if len(body) >= _MAX_DOWNLOAD_BYTES:
+                        break
 
-            soup = BeautifulSoup(response.text, "html.parser")
+            # Raw bytes: the parser sniffs <meta charset> itself, with the
+            # Content-Type charset (if any) taking precedence
+            soup = BeautifulSoup(
+                bytes(body[:_MAX_DOWNLOAD_BYTES]),
+                HTML_PARSER,
+                parse_only=_TITLE_AND_BODY,
+                from_encoding=response.charset_encoding
+            )
 
-            # Remove script and style elements
-            for element in soup(["script", "style", "nav", "footer", "header"]):
+            # Remove script, style and page chrome in one selector pass (a
+            # SoupStrainer can't do it: everything under a kept <body> is kept)
+            for element in soup.select(_DROP_SELECTOR):
                 element.decompose()
 
             # Get text content
@@ -63,7 +95,7 @@ class WebBrowserTool(BaseTool):
             # Extract links if requested
             if extract_links:
                 links = []
-                for a in soup.find_all("a", href=True)[:20]:
+                for a in soup.find_all("a", href=True, limit=20):
                     href = a["href"]
                     link_text = a.get_text(strip=True)[:50]
                     if href.startswith("http"):
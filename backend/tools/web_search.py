@@ -1,8 +1,21 @@
+import asyncio
+import time
+from collections import OrderedDict
+
 from .base import BaseTool, ToolResult
 from duckduckgo_search import DDGS
 
 
 class WebSearchTool(BaseTool):
+    # Identical searches within this window reuse the previous results
+    CACHE_TTL = 60.0
+    CACHE_SIZE = 128
+
+    __slots__ = ()
+
+    # (query, max_results) -> (fetched_at, results), shared by all instances
+    _cache: OrderedDict[tuple[str, int], tuple[float, list]] = OrderedDict()
+
     @property
     def name(self) -> str:
         return "web_search"
@@ -31,8 +44,18 @@ class WebSearchTool(BaseTool):
 
     async def execute(self, query: str, max_results: int = 5) -> ToolResult:
         try:
-            with DDGS() as ddgs:
-                results = list(ddgs.text(query, max_results=max_results))
+            key = (query, max_results)
+            cached = self._cache.get(key)
+            if cached is not None and time.monotonic() - cached[0] < self.CACHE_TTL:
+                self._cache.move_to_end(key)
+                results = cached[1]
+            else:
+                # DDGS is synchronous; keep its network round trip off the event loop
+                results = await asyncio.to_thread(self._search_sync, query, max_results)
+                self._cache[key] = (time.monotonic(), results)
+                self._cache.move_to_end(key)
+                if len(self._cache) > self.CACHE_SIZE:
+                    self._cache.popitem(last=False)
 
             if not results:
                 return ToolResult(
@@ -58,3 +81,9 @@ class WebSearchTool(BaseTool):
                 output="",
                 error=f"Search failed: {str(e)}"
             )
+
+    @staticmethod
+    def _search_sync(query: str, max_results: int) -> list:
+        """Run the DuckDuckGo text search (blocking)."""
+        with DDGS() as ddgs:
+            return list(ddgs.text(query, max_results=max_results))
@@ -3,21 +3,46 @@ Centralized logging configuration for AI Task Agent.
 Provides structured JSON logging with rotation support.
 """
 
+import atexit
+import copy
 import logging
 import logging.handlers
 import json
+import os
+import queue
 import sys
-from datetime import datetime, timezone
+import time
 from pathlib import Path
 from typing import Any, Optional
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 
 class JSONFormatter(logging.Formatter):
     """Custom formatter that outputs JSON-structured logs"""
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # (epoch second, "YYYY-MM-DDTHH:MM:SS") of the last formatted record;
+        # consecutive records usually share the second
+        self._last_second: tuple[int, str] = (-1, "")
+
+    def _timestamp(self, created: float) -> str:
+        """ISO 8601 UTC timestamp for a record's creation time"""
+        second = int(created)
+        last_second, prefix = self._last_second
+        if second != last_second:
+            prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(second))
+            self._last_second = (second, prefix)
+        return f"{prefix}.{int((created - second) * 1_000_000):06d}+00:00"
+
     def format(self, record: logging.LogRecord) -> str:
         log_entry = {
-            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "timestamp": self._timestamp(record.created),
             "level": record.levelname,
             "logger": record.name,
             "message": record.getMessage(),
@@ -31,12 +56,120 @@ class JSONFormatter(logging.Formatter):
             log_entry["exception"] = self.formatException(record.exc_info)
 
         # Add extra fields if present
-        if hasattr(record, "extra_data"):
-            log_entry["extra"] = record.extra_data
+        extra_data = record.__dict__.get("extra_data")
+        if extra_data is not None:
+            log_entry["extra"] = extra_data
 
+        if ORJSON_AVAILABLE:
+            return orjson.dumps(log_entry, option=orjson.OPT_NON_STR_KEYS).decode()
         return json.dumps(log_entry)
 
 
+class _BatchedRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """RotatingFileHandler that doesn't hit the disk for every record.
+
+    The stock handler stats the path and seek()/tell()s the stream (which
+    flushes it) in shouldRollover, then flushes again in emit: at least one
+    write() syscall per log line. Here the file size is tracked in memory and
+    records accumulate in the file object's buffer, which is flushed on ERROR
+    and above, once FLUSH_INTERVAL has passed since the last flush, on
+    rollover/close, and by _DrainingQueueListener whenever the queue runs dry.
+    """
+
+    FLUSH_INTERVAL = 1.0  # seconds
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._last_flush = time.monotonic()
+        self._defer_flush = False
+        self._size = self.stream.seek(0, 2) if self.stream else 0
+        self._pending = 0
+        # bpo-45401: never roll over anything other than a regular file
+        self._rotatable = not os.path.exists(self.baseFilename) or os.path.isfile(self.baseFilename)
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        if self.stream is None:
+            self.stream = self._open()
+            self._size = self.stream.seek(0, 2)
+        # Rollover is by encoded bytes, not characters
+        text = self.format(record) + self.terminator
+        self._pending = len(text) if text.isascii() else len(text.encode(self.encoding or "utf-8", "replace"))
+        if self.maxBytes <= 0 or not self._rotatable:
+            return False
+        return self._size > 0 and self._size + self._pending >= self.maxBytes
+
+    def doRollover(self) -> None:
+        super().doRollover()
+        self._size = 0
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self._defer_flush = (
+            record.levelno < logging.ERROR
+            and time.monotonic() - self._last_flush < self.FLUSH_INTERVAL
+        )
+        try:
+            super().emit(record)
+            self._size += self._pending
+        finally:
+            self._defer_flush = False
+
+    def flush(self) -> None:
+        if self._defer_flush:
+            return
+        super().flush()
+        self._last_flush = time.monotonic()
+
+
+class _InProcessQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that leaves formatting to the listener's handlers.
+
+    The stock prepare() renders the record with a plain formatter and drops
+    exc_info, which would flatten tracebacks into the JSON "message". The
+    queue never leaves the process, so only the message args need merging
+    now (they may be mutated after the call returns).
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+class _DrainingQueueListener(logging.handlers.QueueListener):
+    """QueueListener that flushes its handlers whenever the queue is empty.
+
+    Flushes deferred by _BatchedRotatingFileHandler would otherwise wait for
+    the next record, so the last lines before an idle period never reached
+    the file.
+    """
+
+    def dequeue(self, block: bool) -> logging.LogRecord:
+        try:
+            return self.queue.get_nowait()
+        except queue.Empty:
+            if not block:
+                raise
+        for handler in self.handlers:
+            handler.flush()
+        return self.queue.get()
+
+
+# Background thread that writes queued records to the real handlers
+_queue_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the logging listener thread."""
+    global _queue_listener
+    if _queue_listener is not None:
+        _queue_listener.stop()
+        _queue_listener = None
+
+
+atexit.register(shutdown_logging)
+
+
 class ContextLogger(logging.LoggerAdapter):
     """Logger adapter that adds context to all log messages"""
 
@@ -68,11 +201,18 @@ def setup_logging(
     log_path = Path(log_dir)
     log_path.mkdir(parents=True, exist_ok=True)
 
+    # No formatter here reports thread, process or multiprocessing names,
+    # so spare every LogRecord the calls that look them up
+    logging.logThreads = False
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
+
     # Get root logger
     root_logger = logging.getLogger()
     root_logger.setLevel(getattr(logging, log_level.upper()))
 
     # Clear existing handlers
+    shutdown_logging()
     root_logger.handlers.clear()
 
     # Create formatters
@@ -91,10 +231,9 @@ def setup_logging(
         "%(asctime)s | %(levelname)-8s | %(name)s | %(message)s",
         datefmt="%H:%M:%S"
     ))
-    root_logger.addHandler(console_handler)
 
     # File handler with rotation (JSON format)
-    file_handler = logging.handlers.RotatingFileHandler(
+    file_handler = _BatchedRotatingFileHandler(
         log_path / "app.log",
         maxBytes=max_bytes,
         backupCount=backup_count,
@@ -102,7 +241,6 @@ def setup_logging(
     )
     file_handler.setLevel(logging.DEBUG)
     file_handler.setFormatter(formatter)
-    root_logger.addHandler(file_handler)
 
     # Error file handler (errors only)
     error_handler = logging.handlers.RotatingFileHandler(
@@ -113,7 +251,17 @@ def setup_logging(
     )
     error_handler.setLevel(logging.ERROR)
     error_handler.setFormatter(formatter)
-    root_logger.addHandler(error_handler)
+
+    # Callers only enqueue; a listener thread does the formatting, console
+    # writes and file I/O (including rotation) off the event loop
+    global _queue_listener
+    log_queue = queue.SimpleQueue()
+    root_logger.addHandler(_InProcessQueueHandler(log_queue))
+    _queue_listener = _DrainingQueueListener(
+        log_queue, console_handler, file_handler, error_handler,
+        respect_handler_level=True
+    )
+    _queue_listener.start()
 
     # Suppress noisy loggers
     logging.getLogger("httpx").setLevel(logging.WARNING)
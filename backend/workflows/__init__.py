@@ -1,5 +1,5 @@
 from .workflow_engine import WorkflowEngine, Workflow, WorkflowStep
-from .workflow_manager import WorkflowManager
+from .workflow_manager import WorkflowManager, WorkflowSummary
 from .scheduler import WorkflowScheduler
 
 __all__ = [
@@ -7,5 +7,6 @@ __all__ = [
     "Workflow",
     "WorkflowStep",
     "WorkflowManager",
+    "WorkflowSummary",
     "WorkflowScheduler"
 ]
@@ -1,13 +1,16 @@
 import asyncio
-import json
 import logging
 from datetime import datetime, timezone
-from typing import Dict, Any, List, Optional, Callable
-from pydantic import BaseModel
-import uuid
+from typing import Dict, Any, List, Optional, Callable, Set
+from pydantic import BaseModel, Field, PrivateAttr
+from sqlalchemy import select, update, delete, bindparam, or_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+import secrets
 
 try:
     from apscheduler.schedulers.asyncio import AsyncIOScheduler
+    from apscheduler.schedulers.base import STATE_RUNNING
     from apscheduler.triggers.cron import CronTrigger
     from apscheduler.triggers.interval import IntervalTrigger
     from apscheduler.triggers.date import DateTrigger
@@ -15,9 +18,65 @@ try:
 except ImportError:
     SCHEDULER_AVAILABLE = False
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    import json
+    ORJSON_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
 
+# Dialects with INSERT ... ON CONFLICT DO UPDATE
+_UPSERT_INSERTS = {"postgresql": pg_insert, "sqlite": sqlite_insert}
+
+
+_CRON_FIELDS = ("minute", "hour", "day", "month", "day_of_week")
+_INTERVAL_UNITS = {"seconds": 1, "minutes": 60, "hours": 3600, "days": 86400}
+
+
+def _cron_trigger(config: Dict[str, Any]):
+    return CronTrigger(**{field: config.get(field, "*") for field in _CRON_FIELDS})
+
+
+def _interval_seconds(config: Dict[str, Any]):
+    """Total length of an interval config, which may mix units"""
+    return sum(config.get(unit, 0) * factor for unit, factor in _INTERVAL_UNITS.items())
+
+
+def _interval_trigger(config: Dict[str, Any]):
+    if len(config) == 1 and "seconds" in config:
+        return IntervalTrigger(seconds=config["seconds"])
+    return IntervalTrigger(seconds=_interval_seconds(config))
+
+
+def _date_trigger(config: Dict[str, Any]):
+    run_date = config.get("run_date")
+    if isinstance(run_date, str):
+        run_date = datetime.fromisoformat(run_date)
+    return DateTrigger(run_date=run_date)
+
+
+_TRIGGER_FACTORIES = {
+    "cron": _cron_trigger,
+    "interval": _interval_trigger,
+    "date": _date_trigger,
+}
+
+
+def _dumps(data) -> str:
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(data)
+
+
+def _loads(data: str):
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
 class ScheduledTask(BaseModel):
     """A scheduled workflow task"""
     id: str
@@ -27,15 +86,30 @@ class ScheduledTask(BaseModel):
     trigger_config: Dict[str, Any]
     variables: Dict[str, Any] = {}
     enabled: bool = True
-    created_at: datetime = None
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     last_run: Optional[datetime] = None
     next_run: Optional[datetime] = None
     run_count: int = 0
 
-    def __init__(self, **data):
-        super().__init__(**data)
-        if not self.created_at:
-            self.created_at = datetime.now(timezone.utc)
+    # JSON forms of trigger_config/variables as stored in the database; both
+    # are fixed once the task is scheduled, so they're encoded at most once
+    _trigger_config_json: Optional[str] = PrivateAttr(default=None)
+    _variables_json: Optional[str] = PrivateAttr(default=None)
+    # The APScheduler job; with the default memory job store this is the live
+    # instance the scheduler updates, so next_run_time needs no lookup
+    _job: Any = PrivateAttr(default=None)
+
+    @property
+    def trigger_config_json(self) -> str:
+        if self._trigger_config_json is None:
+            self._trigger_config_json = _dumps(self.trigger_config)
+        return self._trigger_config_json
+
+    @property
+    def variables_json(self) -> str:
+        if self._variables_json is None:
+            self._variables_json = _dumps(self.variables)
+        return self._variables_json
 
 
 class WorkflowScheduler:
@@ -45,12 +119,46 @@ class WorkflowScheduler:
     Persists scheduled tasks to database for recovery after restarts.
     """
 
+    FLUSH_INTERVAL = 2.0  # seconds between batched stats writes
+    FLUSH_BATCH_SIZE = 100  # flush early once this many tasks are pending
+    FLUSH_WINDOW = 0.05  # seconds to collect a burst before an early flush
+    SUBSCRIBER_QUEUE_SIZE = 256
+    LOAD_BATCH_SIZE = 500  # rows fetched per round trip when recovering tasks
+    DB_CONCURRENCY = 16  # scheduler sessions open at once; leaves pool room for API requests
+
     def __init__(self, workflow_engine=None, workflow_manager=None, db_session_factory=None):
+        # db_session_factory is an async_sessionmaker (see database.connection.async_session)
         self.workflow_engine = workflow_engine
         self.workflow_manager = workflow_manager
         self.db_session_factory = db_session_factory
+        self._task_model = None
+        if db_session_factory:
+            # Resolved once here rather than in every persistence call. Not at
+            # module scope: database and auth import each other, and this
+            # module can load before either.
+            try:
+                from database.models import ScheduledTaskModel
+                self._task_model = ScheduledTaskModel
+            except ImportError:
+                logger.warning("Could not import ScheduledTaskModel, persistence unavailable")
+                self.db_session_factory = None
         self.scheduled_tasks: Dict[str, ScheduledTask] = {}
+        # Kept in step with scheduled_tasks so get_stats needn't walk it;
+        # add and remove tasks through _add_task/_remove_task
+        self._enabled_count = 0
+        self._total_runs = 0
         self.event_handlers: List[Callable] = []
+        self._subscribers: List[asyncio.Queue] = []
+
+        # Run stats are written back in batches by _flush_loop rather than
+        # one round trip per fired job
+        self._dirty: Dict[str, ScheduledTask] = {}
+        self._dirty_lock = asyncio.Lock()
+        self._flush_wakeup = asyncio.Event()
+        self._flush_task: Optional[asyncio.Task] = None
+        # run_now tasks; the loop only keeps weak references to tasks
+        self._background_tasks: Set[asyncio.Task] = set()
+        self._db_semaphore = asyncio.Semaphore(self.DB_CONCURRENCY)
 
         if SCHEDULER_AVAILABLE:
             self.scheduler = AsyncIOScheduler()
@@ -64,38 +172,52 @@ class WorkflowScheduler:
             logger.warning("No database session factory configured, skipping persistence load")
             return
 
-        try:
-            from database.models import ScheduledTaskModel
+        # Hold job processing while re-adding jobs: every add_job on a
+        # running scheduler recomputes its wakeup, resume() does it once
+        hold_jobs = SCHEDULER_AVAILABLE and self.scheduler.state == STATE_RUNNING
+        if hold_jobs:
+            self.scheduler.pause()
 
-            with self.db_session_factory() as session:
-                db_tasks = session.query(ScheduledTaskModel).filter(
-                    ScheduledTaskModel.enabled == True
-                ).all()
+        try:
+            ScheduledTaskModel = self._task_model
+
+            async with self.db_session_factory() as session:
+                # Stream rows in chunks rather than materialising the table.
+                # Date tasks whose run time has passed are filtered out here:
+                # next_run is set from the job at schedule time and left at
+                # the run date once the job has fired.
+                db_tasks = await session.stream_scalars(
+                    select(ScheduledTaskModel)
+                    .where(
+                        ScheduledTaskModel.enabled.is_(True),
+                        or_(
+                            ScheduledTaskModel.trigger_type != "date",
+                            ScheduledTaskModel.next_run.is_(None),
+                            ScheduledTaskModel.next_run > datetime.now(timezone.utc)
+                        )
+                    )
+                    .order_by(ScheduledTaskModel.next_run)
+                    .execution_options(yield_per=self.LOAD_BATCH_SIZE)
+                )
 
                 loaded_count = 0
-                for db_task in db_tasks:
+                async for db_task in db_tasks:
                     try:
-                        task = ScheduledTask(
+                        # Rows were validated when scheduled; skip re-validating
+                        task = ScheduledTask.model_construct(
                             id=db_task.id,
                             workflow_id=db_task.workflow_id,
                             name=db_task.name,
                             trigger_type=db_task.trigger_type,
-                            trigger_config=json.loads(db_task.trigger_config),
-                            variables=json.loads(db_task.variables) if db_task.variables else {},
+                            trigger_config=_loads(db_task.trigger_config),
+                            variables=_loads(db_task.variables) if db_task.variables else {},
                             enabled=db_task.enabled,
                             created_at=db_task.created_at,
                             last_run=db_task.last_run,
                             run_count=db_task.run_count
                         )
-
-                        # Skip date triggers that have already passed
-                        if task.trigger_type == "date":
-                            run_date = task.trigger_config.get("run_date")
-                            if run_date and isinstance(run_date, str):
-                                run_date = datetime.fromisoformat(run_date)
-                            if run_date and run_date < datetime.now(timezone.utc):
-                                logger.info(f"Skipping expired date task: {task.name}")
-                                continue
+                        task._trigger_config_json = db_task.trigger_config
+                        task._variables_json = db_task.variables
 
                         # Recreate the trigger and add to scheduler
                         trigger = self._create_trigger(task.trigger_type, task.trigger_config)
@@ -105,11 +227,13 @@ class WorkflowScheduler:
                                 trigger=trigger,
                                 args=[task],
                                 id=task.id,
-                                name=task.name
+                                name=task.name,
+                                replace_existing=True
                             )
                             task.next_run = job.next_run_time
+                            task._job = job
 
-                        self.scheduled_tasks[task.id] = task
+                        self._add_task(task)
                         loaded_count += 1
 
                     except Exception as e:
@@ -117,81 +241,178 @@ class WorkflowScheduler:
 
                 logger.info(f"Loaded {loaded_count} scheduled tasks from database")
 
-        except ImportError:
-            logger.warning("Could not import ScheduledTaskModel, persistence unavailable")
         except Exception as e:
             logger.error(f"Failed to load persisted tasks: {e}")
+        finally:
+            if hold_jobs:
+                self.scheduler.resume()
 
-    def _persist_task(self, task: ScheduledTask):
+    async def _persist_task(self, task: ScheduledTask):
         """Save or update a task in the database"""
         if not self.db_session_factory:
             return
 
         try:
-            from database.models import ScheduledTaskModel
-
-            with self.db_session_factory() as session:
-                db_task = session.query(ScheduledTaskModel).filter(
-                    ScheduledTaskModel.id == task.id
-                ).first()
-
-                if db_task:
-                    # Update existing
-                    db_task.workflow_id = task.workflow_id
-                    db_task.name = task.name
-                    db_task.trigger_type = task.trigger_type
-                    db_task.trigger_config = json.dumps(task.trigger_config)
-                    db_task.variables = json.dumps(task.variables)
-                    db_task.enabled = task.enabled
-                    db_task.last_run = task.last_run
-                    db_task.next_run = task.next_run
-                    db_task.run_count = task.run_count
-                else:
-                    # Create new
-                    db_task = ScheduledTaskModel(
-                        id=task.id,
-                        workflow_id=task.workflow_id,
-                        name=task.name,
-                        trigger_type=task.trigger_type,
-                        trigger_config=json.dumps(task.trigger_config),
-                        variables=json.dumps(task.variables),
-                        enabled=task.enabled,
-                        created_at=task.created_at,
-                        last_run=task.last_run,
-                        next_run=task.next_run,
-                        run_count=task.run_count
+            ScheduledTaskModel = self._task_model
+
+            async with self._db_semaphore, self.db_session_factory() as session:
+                row = dict(
+                    id=task.id,
+                    workflow_id=task.workflow_id,
+                    name=task.name,
+                    trigger_type=task.trigger_type,
+                    trigger_config=task.trigger_config_json,
+                    variables=task.variables_json,
+                    enabled=task.enabled,
+                    created_at=task.created_at,
+                    last_run=task.last_run,
+                    next_run=task.next_run,
+                    run_count=task.run_count
+                )
+
+                insert = _UPSERT_INSERTS.get(session.get_bind().dialect.name)
+                if insert is not None:
+                    # Native upsert: one round trip instead of SELECT + INSERT/UPDATE
+                    stmt = insert(ScheduledTaskModel).values(**row)
+                    stmt = stmt.on_conflict_do_update(
+                        index_elements=[ScheduledTaskModel.id],
+                        set_={
+                            key: stmt.excluded[key]
+                            for key in row if key not in ("id", "created_at")
+                        }
                     )
-                    session.add(db_task)
+                    await session.execute(stmt)
+                else:
+                    await session.merge(ScheduledTaskModel(**row))
 
-                session.commit()
+                await session.commit()
 
         except Exception as e:
             logger.error(f"Failed to persist task {task.id}: {e}")
 
-    def _delete_persisted_task(self, task_id: str):
+    async def start(self):
+        """Start the background writer for run stats"""
+        if self.db_session_factory and self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def _flush_loop(self):
+        while True:
+            # asyncio.timeout rather than wait_for: on 3.11 wait_for can
+            # swallow a cancel that races with the wakeup, and shutdown()
+            # would then wait on this loop forever
+            try:
+                async with asyncio.timeout(self.FLUSH_INTERVAL):
+                    await self._flush_wakeup.wait()
+            except TimeoutError:
+                pass
+            else:
+                # Woken early: give updates fired in the same burst a moment
+                # to land so they share the transaction
+                await asyncio.sleep(self.FLUSH_WINDOW)
+            self._flush_wakeup.clear()
+            await self._flush_stats()
+
+    async def _flush_stats(self):
+        """Write the run state (enabled, last_run, run_count, next_run) of every dirty task"""
+        async with self._dirty_lock:
+            if not self._dirty:
+                return
+            snapshot, self._dirty = self._dirty, {}
+
+        try:
+            ScheduledTaskModel = self._task_model
+
+            table = ScheduledTaskModel.__table__
+            async with self._db_semaphore, self.db_session_factory() as session:
+                # A single core executemany. Unlike the ORM bulk UPDATE it
+                # doesn't insist on every row existing, so a task deleted
+                # mid-run can't fail the whole batch.
+                await session.execute(
+                    update(table)
+                    .where(table.c.id == bindparam("b_id"))
+                    .values(
+                        enabled=bindparam("b_enabled"),
+                        last_run=bindparam("b_last_run"),
+                        run_count=bindparam("b_run_count"),
+                        next_run=bindparam("b_next_run"),
+                    ),
+                    [
+                        {
+                            "b_id": task.id,
+                            "b_enabled": task.enabled,
+                            "b_last_run": task.last_run,
+                            "b_run_count": task.run_count,
+                            "b_next_run": task.next_run,
+                        }
+                        for task in snapshot.values()
+                    ],
+                )
+                await session.commit()
+
+        except Exception as e:
+            logger.error(f"Failed to flush stats for {len(snapshot)} scheduled tasks: {e}")
+            # Requeue for the next tick; entries marked since the swap are newer
+            async with self._dirty_lock:
+                for task_id, task in snapshot.items():
+                    self._dirty.setdefault(task_id, task)
+
+    async def _mark_dirty(self, task: ScheduledTask, urgent: bool = False):
+        """Queue a task's run state for the flusher; urgent=True flushes within FLUSH_WINDOW"""
+        if not self.db_session_factory or task.id not in self.scheduled_tasks:
+            return
+        if self._flush_task is None:
+            await self.start()
+        async with self._dirty_lock:
+            self._dirty[task.id] = task
+            if urgent or len(self._dirty) >= self.FLUSH_BATCH_SIZE:
+                self._flush_wakeup.set()
+
+    async def _delete_persisted_task(self, task_id: str):
         """Remove a task from the database"""
         if not self.db_session_factory:
             return
 
         try:
-            from database.models import ScheduledTaskModel
+            ScheduledTaskModel = self._task_model
 
-            with self.db_session_factory() as session:
-                session.query(ScheduledTaskModel).filter(
-                    ScheduledTaskModel.id == task_id
-                ).delete()
-                session.commit()
+            async with self._db_semaphore, self.db_session_factory() as session:
+                await session.execute(
+                    delete(ScheduledTaskModel).where(ScheduledTaskModel.id == task_id)
+                )
+                await session.commit()
 
         except Exception as e:
             logger.error(f"Failed to delete persisted task {task_id}: {e}")
 
     def add_event_handler(self, handler: Callable):
+        """Register a synchronous callback; it runs inline, so keep it quick
+        and use subscribe() for anything that does I/O"""
         self.event_handlers.append(handler)
 
+    def subscribe(self, maxsize: int = None) -> asyncio.Queue:
+        """Get a queue that receives every scheduler event.
+
+        Each subscriber drains its own queue; when one falls behind its oldest
+        events are dropped rather than holding up the scheduler.
+        """
+        queue = asyncio.Queue(maxsize or self.SUBSCRIBER_QUEUE_SIZE)
+        self._subscribers.append(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        if queue in self._subscribers:
+            self._subscribers.remove(queue)
+
     def emit_event(self, event_type: str, data: Dict[str, Any]):
+        event = {"type": event_type, "data": data}
+        for queue in self._subscribers:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(event)
+
         for handler in self.event_handlers:
             try:
-                handler({"type": event_type, "data": data})
+                handler(event)
             except Exception as e:
                 logger.warning(f"Event handler failed: {e}")
 
@@ -207,7 +428,11 @@ class WorkflowScheduler:
         if not SCHEDULER_AVAILABLE:
             return None
 
-        task_id = str(uuid.uuid4())[:12]
+        task_id = secrets.token_hex(6)
+
+        if trigger_type == "interval":
+            # Store intervals as a single length so recovery needn't re-sum units
+            trigger_config = {"seconds": _interval_seconds(trigger_config)}
 
         task = ScheduledTask(
             id=task_id,
@@ -233,10 +458,11 @@ class WorkflowScheduler:
         )
 
         task.next_run = job.next_run_time
-        self.scheduled_tasks[task_id] = task
+        task._job = job
+        self._add_task(task)
 
         # Persist to database
-        self._persist_task(task)
+        await self._persist_task(task)
 
         self.emit_event("task_scheduled", {
             "task_id": task_id,
@@ -251,30 +477,8 @@ class WorkflowScheduler:
         if not SCHEDULER_AVAILABLE:
             return None
 
-        if trigger_type == "cron":
-            return CronTrigger(
-                minute=config.get("minute", "*"),
-                hour=config.get("hour", "*"),
-                day=config.get("day", "*"),
-                month=config.get("month", "*"),
-                day_of_week=config.get("day_of_week", "*")
-            )
-
-        elif trigger_type == "interval":
-            return IntervalTrigger(
-                seconds=config.get("seconds", 0),
-                minutes=config.get("minutes", 0),
-                hours=config.get("hours", 0),
-                days=config.get("days", 0)
-            )
-
-        elif trigger_type == "date":
-            run_date = config.get("run_date")
-            if isinstance(run_date, str):
-                run_date = datetime.fromisoformat(run_date)
-            return DateTrigger(run_date=run_date)
-
-        return None
+        factory = _TRIGGER_FACTORIES.get(trigger_type)
+        return factory(config) if factory else None
 
     async def _run_workflow(self, task: ScheduledTask):
         """Execute a scheduled workflow"""
@@ -302,15 +506,15 @@ class WorkflowScheduler:
             # Update task stats
             task.last_run = datetime.now(timezone.utc)
             task.run_count += 1
+            if self.scheduled_tasks.get(task.id) is task:
+                self._total_runs += 1
 
             # Update next run time
-            if SCHEDULER_AVAILABLE and task.id in self.scheduled_tasks:
-                job = self.scheduler.get_job(task.id)
-                if job:
-                    task.next_run = job.next_run_time
+            if task._job is not None and task.id in self.scheduled_tasks:
+                task.next_run = task._job.next_run_time
 
-            # Persist updated stats
-            self._persist_task(task)
+            # Queue updated stats for the next batched write
+            await self._mark_dirty(task)
 
             self.emit_event("scheduled_run_completed", {
                 "task_id": task.id,
@@ -342,10 +546,12 @@ class WorkflowScheduler:
             return False
 
         self.scheduler.pause_job(task_id)
+        if task.enabled:
+            self._enabled_count -= 1
         task.enabled = False
 
         # Persist disabled state
-        self._persist_task(task)
+        await self._mark_dirty(task, urgent=True)
 
         self.emit_event("task_paused", {"task_id": task_id})
         return True
@@ -359,15 +565,16 @@ class WorkflowScheduler:
         if not task:
             return False
 
-        self.scheduler.resume_job(task_id)
+        job = self.scheduler.resume_job(task_id)
+        if not task.enabled:
+            self._enabled_count += 1
         task.enabled = True
 
-        job = self.scheduler.get_job(task_id)
         if job:
             task.next_run = job.next_run_time
 
         # Persist enabled state
-        self._persist_task(task)
+        await self._mark_dirty(task, urgent=True)
 
         self.emit_event("task_resumed", {"task_id": task_id})
         return True
@@ -380,10 +587,11 @@ class WorkflowScheduler:
         if SCHEDULER_AVAILABLE:
             self.scheduler.remove_job(task_id)
 
-        del self.scheduled_tasks[task_id]
+        self._remove_task(task_id)
+        self._dirty.pop(task_id, None)
 
         # Remove from database
-        self._delete_persisted_task(task_id)
+        await self._delete_persisted_task(task_id)
 
         self.emit_event("task_cancelled", {"task_id": task_id})
         return True
@@ -394,24 +602,69 @@ class WorkflowScheduler:
         if not task:
             return False
 
-        # Run in background
-        asyncio.create_task(self._run_workflow(task))
+        # Run in background, holding a reference until it finishes
+        background = asyncio.create_task(self._run_workflow(task))
+        self._background_tasks.add(background)
+        background.add_done_callback(self._background_tasks.discard)
         return True
 
+    def list_tasks_json(self) -> bytes:
+        """Task summaries plus stats, as served by GET /schedule, encoded in one pass"""
+        payload = {
+            "tasks": [
+                {
+                    "id": t.id,
+                    "workflow_id": t.workflow_id,
+                    "name": t.name,
+                    "enabled": t.enabled,
+                    "last_run": t.last_run,
+                    "next_run": t.next_run,
+                    "run_count": t.run_count
+                }
+                for t in self.scheduled_tasks.values()
+            ],
+            "stats": self.get_stats()
+        }
+        if ORJSON_AVAILABLE:
+            return orjson.dumps(payload)
+        return json.dumps(payload, default=datetime.isoformat).encode()
+
+    def _add_task(self, task: ScheduledTask):
+        if task.id in self.scheduled_tasks:
+            self._remove_task(task.id)
+        self.scheduled_tasks[task.id] = task
+        self._enabled_count += task.enabled
+        self._total_runs += task.run_count
+
+    def _remove_task(self, task_id: str):
+        task = self.scheduled_tasks.pop(task_id)
+        self._enabled_count -= task.enabled
+        self._total_runs -= task.run_count
+
     def get_stats(self) -> Dict[str, Any]:
         """Get scheduler statistics"""
         total = len(self.scheduled_tasks)
-        enabled = sum(1 for t in self.scheduled_tasks.values() if t.enabled)
+        enabled = self._enabled_count
 
         return {
             "total_tasks": total,
             "enabled_tasks": enabled,
             "disabled_tasks": total - enabled,
-            "total_runs": sum(t.run_count for t in self.scheduled_tasks.values()),
+            "total_runs": self._total_runs,
             "scheduler_running": self.scheduler.running if SCHEDULER_AVAILABLE else False
         }
 
-    def shutdown(self):
-        """Shutdown the scheduler"""
+    async def shutdown(self):
+        """Shutdown the scheduler and write out any pending run stats"""
         if SCHEDULER_AVAILABLE and self.scheduler:
             self.scheduler.shutdown()
+
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        if self.db_session_factory:
+            await self._flush_stats()
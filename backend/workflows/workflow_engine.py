@@ -1,16 +1,98 @@
 import json
+import ast
 import asyncio
+import functools
+import hashlib
+import keyword
 import logging
+import random
+import re
+import time
+from collections import ChainMap, OrderedDict
 from datetime import datetime, timezone
-from typing import Dict, Any, List, Optional, Callable
+from typing import Dict, Any, List, Mapping, NamedTuple, Optional, Callable, Set, Tuple
 from enum import Enum
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr, field_serializer
 import uuid
 from simpleeval import simple_eval, EvalWithCompoundTypes
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
 
+_CONDITION_PARSER = EvalWithCompoundTypes()
+
+
+@functools.lru_cache(maxsize=512)
+def _parse_condition(condition: str):
+    """Parse a condition once; loops and wait steps evaluate the same string repeatedly"""
+    return _CONDITION_PARSER.parse(condition)
+
+
+def _compile_reference(reference: str) -> Callable[[Mapping[str, Any]], Any]:
+    """Compile a reference like 'step1.output.data' into a getter over the context"""
+    head, *rest = reference.split(".")
+    if not rest:
+        return lambda context: context.get(head)
+
+    def get(context: Mapping[str, Any]) -> Any:
+        value = context.get(head)
+        for part in rest:
+            if not isinstance(value, dict):
+                return None
+            value = value.get(part)
+        return value
+
+    return get
+
+
+@functools.lru_cache(maxsize=512)
+def _condition_getter(condition: str) -> Optional[Callable[[Mapping[str, Any]], Any]]:
+    """Direct getter for a condition that is a bare reference like 'check_output.success'.
+
+    Returns None for anything else (operators, calls, literals), which goes
+    through simpleeval.
+    """
+    condition = condition.strip()
+    parts = condition.split(".")
+    if parts[0] in _CONDITION_PARSER.functions:
+        return None
+    if not all(part.isidentifier() and not keyword.iskeyword(part) for part in parts):
+        return None
+    return _compile_reference(condition)
+
+
+# orjson silently turns integers wider than 64 bits into floats; any run of
+# 19+ digits could be one, so such input is parsed with the json module
+_LONG_DIGITS_RE = re.compile(r"\d{19}")
+_LONG_DIGITS_BYTES_RE = re.compile(rb"\d{19}")
+
+
+def _json_loads(data: str | bytes | bytearray) -> Any:
+    if ORJSON_AVAILABLE:
+        pattern = _LONG_DIGITS_RE if isinstance(data, str) else _LONG_DIGITS_BYTES_RE
+        if not pattern.search(data):
+            return orjson.loads(data)
+    return json.loads(data)
+
+
+def _memo_hash(config: Dict[str, Any]) -> Optional[str]:
+    """Stable hash of a step's resolved config, or None if it isn't JSON-encodable"""
+    try:
+        if ORJSON_AVAILABLE:
+            encoded = orjson.dumps(config, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+        else:
+            encoded = json.dumps(config, sort_keys=True).encode()
+    except (TypeError, ValueError):
+        return None
+    return hashlib.blake2b(encoded, digest_size=16).hexdigest()
+
+
 class StepType(str, Enum):
     TOOL = "tool"           # Execute a tool
     AGENT = "agent"         # Delegate to an agent
@@ -40,11 +122,25 @@ class WorkflowStep(BaseModel):
     on_error: str = "fail"  # "fail", "skip", "retry"
     max_retries: int = 3
     timeout: int = 300  # seconds
+    pure: bool = False  # Same resolved config always gives the same result; reuse it (tool steps only)
+    cache_ttl: int = 0  # seconds a memoized result stays valid, 0 for no expiry
     status: StepStatus = StepStatus.PENDING
     result: Optional[Dict[str, Any]] = None
     error: Optional[str] = None
     started_at: Optional[datetime] = None
     completed_at: Optional[datetime] = None
+    # (inputs items they were compiled from, getters)
+    _compiled_inputs: Optional[Tuple[Tuple, Dict[str, Callable]]] = PrivateAttr(default=None)
+
+    @property
+    def compiled_inputs(self) -> Dict[str, Callable]:
+        """Input getters, recompiled whenever inputs is replaced or edited"""
+        items = tuple(self.inputs.items())
+        if self._compiled_inputs is None or self._compiled_inputs[0] != items:
+            self._compiled_inputs = (items, {
+                name: _compile_reference(source) for name, source in items
+            })
+        return self._compiled_inputs[1]
 
 
 class Workflow(BaseModel):
@@ -56,35 +152,101 @@ class Workflow(BaseModel):
     steps: List[WorkflowStep] = []
     variables: Dict[str, Any] = {}  # Global variables
     triggers: List[Dict[str, Any]] = []  # Trigger conditions
-    created_at: datetime = None
-    updated_at: datetime = None
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     created_by: str = ""
     tags: List[str] = []
+    # Run steps concurrently where their declared inputs allow. Opt-in, since
+    # steps can depend on each other's side effects (files, shell state)
+    # without saying so.
+    parallel: bool = False
+
+
+def _is_context_free(step: WorkflowStep) -> bool:
+    """Whether a step only sees its own config and resolved inputs"""
+    if step.type == StepType.TOOL:
+        return True
+    if step.type == StepType.PARALLEL and "tasks" not in step.inputs:
+        return all(task.get("type") == "tool" for task in step.config.get("tasks", []))
+    return False
+
+
+def _is_condition_wait(step: WorkflowStep) -> bool:
+    return (
+        step.type == StepType.WAIT
+        and step.config.get("type") == "condition"
+        and "type" not in step.inputs
+    )
+
+
+def _reference_root(reference: str) -> str:
+    """Context key a reference starts from, with steps.<id> mapped to <id>_output"""
+    parts = reference.split(".", 2)
+    if parts[0] == "steps" and len(parts) > 1:
+        return f"{parts[1]}_output"
+    return parts[0]
+
+
+def _condition_names(condition: str) -> Set[str]:
+    """Context names a condition reads"""
+    try:
+        tree = _parse_condition(condition)
+    except Exception:
+        return set()  # unparsable conditions evaluate to False regardless
+
+    names = set()
+    step_refs = set()  # Name nodes already accounted for as steps.<id> / steps["<id>"]
+    for node in ast.walk(tree):  # parents come before children
+        if isinstance(node, (ast.Attribute, ast.Subscript)) and isinstance(node.value, ast.Name) \
+                and node.value.id == "steps":
+            if isinstance(node, ast.Attribute):
+                step_id = node.attr
+            elif isinstance(node.slice, ast.Constant) and isinstance(node.slice.value, str):
+                step_id = node.slice.value
+            else:
+                continue
+            names.add(f"{step_id}_output")
+            step_refs.add(id(node.value))
+        elif isinstance(node, ast.Name) and id(node) not in step_refs:
+            names.add(node.id)
+    return names
 
-    def __init__(self, **data):
-        super().__init__(**data)
-        if not self.created_at:
-            self.created_at = datetime.now(timezone.utc)
-        if not self.updated_at:
-            self.updated_at = datetime.now(timezone.utc)
+
+class _WorkflowPlan(NamedTuple):
+    """What execute needs from a workflow, worked out once per steps list"""
+    steps: List[WorkflowStep]
+    deps: Optional[List[Set[int]]]  # dependencies per step when run in parallel
 
 
 class WorkflowExecution(BaseModel):
     """A single execution of a workflow"""
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
     id: str
     workflow_id: str
     status: str = "running"  # running, completed, failed, cancelled
     current_step: int = 0
-    started_at: datetime = None
+    started_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     completed_at: Optional[datetime] = None
-    context: Dict[str, Any] = {}  # Runtime context/variables
+    # Runtime context: step outputs, then loop scopes, then the initial
+    # context, then workflow variables. Writes land in the first map only.
+    context: ChainMap = Field(default_factory=ChainMap)
     step_results: Dict[str, Any] = {}
     error: Optional[str] = None
+    _semaphore: Optional[asyncio.Semaphore] = PrivateAttr(default=None)
+    # Monotonic start, so durations are immune to wall-clock adjustments
+    _started_ns: int = PrivateAttr(default_factory=time.monotonic_ns)
+    # Set (and replaced) whenever a step result lands; wait steps sleep on it
+    _context_changed: asyncio.Event = PrivateAttr(default_factory=asyncio.Event)
 
-    def __init__(self, **data):
-        super().__init__(**data)
-        if not self.started_at:
-            self.started_at = datetime.now(timezone.utc)
+    @field_serializer("context")
+    def _serialize_context(self, context: ChainMap) -> Dict[str, Any]:
+        # Flattened as a plain dict; "steps" only aliases step_results
+        return {key: value for key, value in context.items() if key != "steps"}
+
+    def notify_context_changed(self):
+        event, self._context_changed = self._context_changed, asyncio.Event()
+        event.set()
 
 
 class WorkflowEngine:
@@ -93,22 +255,98 @@ class WorkflowEngine:
     Supports sequential, parallel, conditional, and loop-based execution.
     """
 
-    def __init__(self, tools: Dict[str, Any] = None, agents: Dict[str, Any] = None):
+    # Events are coalesced for this long and handed to batched handlers as one batch
+    EVENT_BATCH_WINDOW = 0.05
+    # Results of pure steps kept, least recently used evicted first
+    MEMO_CACHE_SIZE = 256
+    # Compiled plans kept, least recently executed workflow evicted first
+    PLAN_CACHE_SIZE = 128
+    # Retry delays are drawn uniformly from [0, min(max, base * 2**attempt)]
+    RETRY_BASE_DELAY = 1.0
+    RETRY_MAX_DELAY = 30.0
+
+    def __init__(
+        self,
+        tools: Dict[str, Any] = None,
+        agents: Dict[str, Any] = None,
+        max_concurrency: int = 16
+    ):
         self.tools = tools or {}
         self.agents = agents or {}
+        # Ceiling on tool/agent calls in flight at once within one execution,
+        # shared by parallel step tasks and loop iterations
+        self.max_concurrency = max_concurrency
+        self._task_dispatch = {
+            "tool": self._execute_tool_step,
+            "agent": self._execute_agent_step,
+        }
+        self._step_dispatch: Dict[StepType, Callable] = {
+            StepType.TOOL: self._execute_tool_step,
+            StepType.AGENT: self._execute_agent_step,
+            StepType.PARALLEL: self._execute_parallel_step,
+            StepType.LOOP: self._execute_loop_step,
+            StepType.CONDITION: self._execute_condition_step,
+            StepType.TRANSFORM: self._execute_transform_step,
+            StepType.WAIT: self._execute_wait_step,
+        }
         self.executions: Dict[str, WorkflowExecution] = {}
         self.event_handlers: List[Callable] = []
-
-    def add_event_handler(self, handler: Callable):
-        self.event_handlers.append(handler)
+        self.batch_event_handlers: List[Callable] = []
+        self._pending_events: List[Dict[str, Any]] = []
+        # (workflow id, step id, config hash) -> (result, monotonic time stored)
+        self._memo: OrderedDict[Tuple[str, str, str], Tuple[Any, float]] = OrderedDict()
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._evaluator = EvalWithCompoundTypes()
+        # workflow id -> plan for its current steps list, in LRU order
+        self._plans: OrderedDict[str, _WorkflowPlan] = OrderedDict()
+
+    def add_event_handler(self, handler: Callable, batched: bool = False):
+        """Register a handler for engine events.
+
+        Handlers are called with each {"type", "data"} event as it happens.
+        Batched handlers are instead called once per EVENT_BATCH_WINDOW with
+        {"type": "batch", "data": {"events": [...]}}.
+        """
+        if batched:
+            self.batch_event_handlers.append(handler)
+        else:
+            self.event_handlers.append(handler)
 
     def emit_event(self, event_type: str, data: Dict[str, Any]):
+        event = {"type": event_type, "data": data}
         for handler in self.event_handlers:
             try:
-                handler({"type": event_type, "data": data})
+                handler(event)
             except Exception as e:
                 logger.warning(f"Event handler failed for '{event_type}': {e}")
 
+        if not self.batch_event_handlers:
+            return
+        self._pending_events.append(event)
+        if self._flush_handle is None:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                self.flush_events()
+                return
+            self._flush_handle = loop.call_later(self.EVENT_BATCH_WINDOW, self.flush_events)
+
+    def flush_events(self):
+        """Deliver pending events to every batched handler as a single batch event"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        events, self._pending_events = self._pending_events, []
+        if not events:
+            return
+
+        batch = {"type": "batch", "data": {"events": events}}
+        for handler in self.batch_event_handlers:
+            try:
+                handler(batch)
+            except Exception as e:
+                logger.warning(f"Event handler failed for batch of {len(events)} events: {e}")
+
     async def execute(
         self,
         workflow: Workflow,
@@ -118,8 +356,11 @@ class WorkflowEngine:
         execution = WorkflowExecution(
             id=str(uuid.uuid4())[:12],
             workflow_id=workflow.id,
-            context={**workflow.variables, **(initial_context or {})}
+            context=ChainMap({}, initial_context or {}, workflow.variables)
         )
+        # Step results are reachable as steps.<step id> in conditions and inputs
+        execution.context.maps[0]["steps"] = execution.step_results
+        execution._semaphore = asyncio.Semaphore(self.max_concurrency)
         self.executions[execution.id] = execution
 
         self.emit_event("workflow_started", {
@@ -129,78 +370,22 @@ class WorkflowEngine:
         })
 
         try:
-            for i, step in enumerate(workflow.steps):
-                execution.current_step = i
-
-                # Check condition
-                if step.condition and not self._evaluate_condition(step.condition, execution.context):
-                    step.status = StepStatus.SKIPPED
-                    self.emit_event("step_skipped", {
-                        "step_id": step.id,
-                        "reason": "condition_not_met"
-                    })
-                    continue
-
-                # Execute step
-                step.status = StepStatus.RUNNING
-                step.started_at = datetime.now(timezone.utc)
-
-                self.emit_event("step_started", {
-                    "step_id": step.id,
-                    "step_name": step.name,
-                    "step_type": step.type
-                })
-
-                try:
-                    result = await self._execute_step(step, execution)
-                    step.status = StepStatus.COMPLETED
-                    step.result = result
-                    execution.step_results[step.id] = result
-
-                    # Update context with step output
-                    if result:
-                        execution.context[f"{step.id}_output"] = result
-
-                    self.emit_event("step_completed", {
-                        "step_id": step.id,
-                        "result_preview": str(result)[:200] if result else None
-                    })
-
-                except Exception as e:
-                    step.error = str(e)
-
-                    if step.on_error == "skip":
-                        step.status = StepStatus.SKIPPED
-                        self.emit_event("step_skipped", {
-                            "step_id": step.id,
-                            "reason": str(e)
-                        })
-                    elif step.on_error == "retry" and step.max_retries > 0:
-                        # Retry logic with exponential backoff
-                        for retry in range(step.max_retries):
-                            try:
-                                await asyncio.sleep(2 ** retry)  # Exponential backoff
-                                result = await self._execute_step(step, execution)
-                                step.status = StepStatus.COMPLETED
-                                step.result = result
-                                break
-                            except Exception as retry_error:
-                                logger.warning(f"Step {step.id} retry {retry + 1}/{step.max_retries} failed: {retry_error}")
-                                if retry == step.max_retries - 1:
-                                    raise
-                    else:
-                        step.status = StepStatus.FAILED
-                        raise
-
-                step.completed_at = datetime.now(timezone.utc)
+            plan = self._plan(workflow)
+            if plan.deps is not None:
+                await self._execute_dag(plan, execution)
+            else:
+                for i, step in enumerate(plan.steps):
+                    execution.current_step = i
+                    await self._run_step(step, execution)
 
             execution.status = "completed"
             execution.completed_at = datetime.now(timezone.utc)
 
             self.emit_event("workflow_completed", {
                 "execution_id": execution.id,
-                "duration": (execution.completed_at - execution.started_at).total_seconds()
+                "duration": (time.monotonic_ns() - execution._started_ns) / 1e9
             })
+            self.flush_events()
 
         except Exception as e:
             execution.status = "failed"
@@ -211,9 +396,168 @@ class WorkflowEngine:
                 "execution_id": execution.id,
                 "error": str(e)
             })
+            self.flush_events()
 
         return execution
 
+    async def _run_step(self, step: WorkflowStep, execution: WorkflowExecution):
+        """Run one step: condition check, events, and its on_error policy"""
+        # Check condition
+        if step.condition and not self._evaluate_condition(step.condition, execution.context):
+            step.status = StepStatus.SKIPPED
+            self.emit_event("step_skipped", {
+                "step_id": step.id,
+                "reason": "condition_not_met"
+            })
+            return
+
+        # Execute step
+        step.status = StepStatus.RUNNING
+        step.started_at = datetime.now(timezone.utc)
+        started_ns = time.monotonic_ns()
+
+        self.emit_event("step_started", {
+            "step_id": step.id,
+            "step_name": step.name,
+            "step_type": step.type
+        })
+
+        try:
+            result = await self._run_with_retry(step, execution)
+            step.status = StepStatus.COMPLETED
+            step.result = result
+            execution.step_results[step.id] = result
+
+            # Update context with step output
+            if result:
+                execution.context[f"{step.id}_output"] = result
+            execution.notify_context_changed()
+
+            self.emit_event("step_completed", {
+                "step_id": step.id,
+                "result_preview": str(result)[:200] if result else None,
+                "duration": (time.monotonic_ns() - started_ns) / 1e9
+            })
+
+        except Exception as e:
+            step.error = str(e)
+
+            if step.on_error == "skip":
+                step.status = StepStatus.SKIPPED
+                self.emit_event("step_skipped", {
+                    "step_id": step.id,
+                    "reason": str(e)
+                })
+            else:
+                step.status = StepStatus.FAILED
+                raise
+
+        step.completed_at = datetime.now(timezone.utc)
+
+    async def _run_with_retry(self, step: WorkflowStep, execution: WorkflowExecution):
+        """Execute a step, retrying with full-jitter backoff if its on_error is "retry" """
+        retries = step.max_retries if step.on_error == "retry" else 0
+        for attempt in range(retries + 1):
+            try:
+                return await self._execute_step(step, execution)
+            except Exception as e:
+                if attempt == retries:
+                    raise
+                delay = random.uniform(0, min(self.RETRY_MAX_DELAY, self.RETRY_BASE_DELAY * 2 ** attempt))
+                logger.warning(
+                    f"Step {step.id} attempt {attempt + 1}/{retries + 1} failed: {e}; "
+                    f"retrying in {delay:.2f}s"
+                )
+                await asyncio.sleep(delay)
+
+    def _plan(self, workflow: Workflow) -> "_WorkflowPlan":
+        """Compile a workflow's steps once; reused until its steps list is replaced"""
+        plan = self._plans.get(workflow.id)
+        if plan is not None and plan.steps is workflow.steps and (plan.deps is not None) == workflow.parallel:
+            self._plans.move_to_end(workflow.id)
+            return plan
+
+        for step in workflow.steps:
+            step.compiled_inputs  # compile input getters now rather than mid-run
+            if step.condition:
+                try:
+                    _parse_condition(step.condition)
+                except Exception:
+                    pass  # reported when the condition is evaluated
+        deps = self._build_dag(workflow.steps) if workflow.parallel else None
+
+        plan = _WorkflowPlan(workflow.steps, deps)
+        self._plans[workflow.id] = plan
+        self._plans.move_to_end(workflow.id)
+        if len(self._plans) > self.PLAN_CACHE_SIZE:
+            self._plans.popitem(last=False)
+        return plan
+
+    async def _execute_dag(self, plan: "_WorkflowPlan", execution: WorkflowExecution):
+        """Run steps as soon as the steps they depend on have finished"""
+        deps = plan.deps
+        steps = plan.steps
+        waiting = list(range(len(steps)))
+        done: Set[int] = set()
+        running: Dict[asyncio.Task, int] = {}
+
+        try:
+            while waiting or running:
+                for i in [i for i in waiting if deps[i] <= done]:
+                    waiting.remove(i)
+                    execution.current_step = i
+                    running[asyncio.create_task(self._run_step(steps[i], execution))] = i
+
+                finished, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in finished:
+                    done.add(running.pop(task))
+                    task.result()  # a failed step fails the workflow, as in sequential mode
+        finally:
+            for task in running:
+                task.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+
+    def _build_dag(self, steps: List[WorkflowStep]) -> List[Set[int]]:
+        """Indices of the steps each step depends on.
+
+        Tool steps (and parallel steps made only of tool tasks) see nothing but
+        their config and resolved inputs, so they depend only on the steps whose
+        outputs their inputs or condition reference. Condition waits only read
+        the context, so they start alongside earlier steps and wake as those
+        finish. Every other step type reads or writes the shared context, so it
+        waits for all earlier steps. Later steps wait for both kinds. References
+        to later steps are ignored, as they resolve to nothing in sequential
+        order too.
+        """
+        producers: Dict[str, int] = {}
+        barrier = None
+        deps = []
+        for i, step in enumerate(steps):
+            if _is_condition_wait(step):
+                # Waits for its condition while earlier steps run, not after them;
+                # later steps still wait for it
+                step_deps = set() if barrier is None else {barrier}
+                barrier = i
+            elif _is_context_free(step):
+                refs = {_reference_root(source) for source in step.inputs.values()}
+                if step.condition:
+                    refs |= _condition_names(step.condition)
+                if "steps" in refs:
+                    # steps used other than as steps.<id> can read any earlier step
+                    step_deps = set(range(i))
+                else:
+                    step_deps = {producers[ref] for ref in refs if ref in producers}
+                if barrier is not None:
+                    step_deps.add(barrier)
+            else:
+                step_deps = set(range(i))
+                barrier = i
+            deps.append(step_deps)
+            producers[f"{step.id}_output"] = i
+
+        return deps
+
     async def _execute_step(
         self,
         step: WorkflowStep,
@@ -221,36 +565,49 @@ class WorkflowEngine:
     ) -> Dict[str, Any]:
         """Execute a single workflow step"""
         # Resolve inputs
-        resolved_inputs = {}
-        for input_name, source in step.inputs.items():
-            resolved_inputs[input_name] = self._resolve_reference(source, execution.context)
+        context = execution.context
+        resolved_inputs = {name: get(context) for name, get in step.compiled_inputs.items()}
 
         # Merge with config
         step_config = {**step.config, **resolved_inputs}
 
-        if step.type == StepType.TOOL:
-            return await self._execute_tool_step(step_config, execution)
-
-        elif step.type == StepType.AGENT:
-            return await self._execute_agent_step(step_config, execution)
-
-        elif step.type == StepType.PARALLEL:
-            return await self._execute_parallel_step(step_config, execution)
-
-        elif step.type == StepType.LOOP:
-            return await self._execute_loop_step(step_config, execution)
-
-        elif step.type == StepType.CONDITION:
-            return await self._execute_condition_step(step_config, execution)
-
-        elif step.type == StepType.TRANSFORM:
-            return await self._execute_transform_step(step_config, execution)
-
-        elif step.type == StepType.WAIT:
-            return await self._execute_wait_step(step_config, execution)
-
-        else:
+        # Only steps that see nothing beyond their resolved config can be keyed
+        # by it; condition, agent, wait and transform steps read the context
+        if not step.pure or not _is_context_free(step):
+            return await self._dispatch_step(step, step_config, execution)
+
+        config_hash = _memo_hash(step_config)
+        if config_hash is None:
+            return await self._dispatch_step(step, step_config, execution)
+
+        key = (execution.workflow_id, step.id, config_hash)
+        cached = self._memo.get(key)
+        if cached is not None:
+            result, stored_at = cached
+            if not step.cache_ttl or time.monotonic() - stored_at < step.cache_ttl:
+                self._memo.move_to_end(key)
+                return result
+
+        result = await self._dispatch_step(step, step_config, execution)
+        # Tool steps report failure in the result rather than raising
+        if not (isinstance(result, dict) and result.get("success") is False):
+            self._memo[key] = (result, time.monotonic())
+            self._memo.move_to_end(key)
+            if len(self._memo) > self.MEMO_CACHE_SIZE:
+                self._memo.popitem(last=False)
+        return result
+
+    async def _dispatch_step(
+        self,
+        step: WorkflowStep,
+        step_config: Dict[str, Any],
+        execution: WorkflowExecution
+    ) -> Dict[str, Any]:
+        """Run a step's handler with its resolved config"""
+        handler = self._step_dispatch.get(step.type)
+        if handler is None:
             raise ValueError(f"Unknown step type: {step.type}")
+        return await handler(step_config, execution)
 
     async def _execute_tool_step(
         self,
@@ -286,7 +643,10 @@ class WorkflowEngine:
         agent = self.agents[agent_name]
         task = config.get("task", "")
 
-        result = await agent.execute(task, context=execution.context)
+        # Agents serialize their context into the prompt, so hand them a plain
+        # dict without the steps namespace, which repeats the *_output entries
+        context = {key: value for key, value in execution.context.items() if key != "steps"}
+        result = await agent.execute(task, context=context)
 
         return {
             "success": result.success,
@@ -303,11 +663,11 @@ class WorkflowEngine:
         tasks = config.get("tasks", [])
 
         async def run_task(task_config):
-            if task_config.get("type") == "tool":
-                return await self._execute_tool_step(task_config, execution)
-            elif task_config.get("type") == "agent":
-                return await self._execute_agent_step(task_config, execution)
-            return {"error": "Unknown task type"}
+            handler = self._task_dispatch.get(task_config.get("type"))
+            if handler is None:
+                return {"error": "Unknown task type"}
+            async with execution._semaphore:
+                return await handler(task_config, execution)
 
         results = await asyncio.gather(*[run_task(t) for t in tasks])
 
@@ -318,16 +678,34 @@ class WorkflowEngine:
         config: Dict[str, Any],
         execution: WorkflowExecution
     ) -> Dict[str, Any]:
-        """Execute a loop over items"""
+        """Execute a loop over items, up to config["concurrency"] at a time (default 1)
+
+        The loop variable only exists inside the iterations; it is not left
+        in the context afterwards.
+        """
         items = config.get("items", [])
         loop_var = config.get("variable", "item")
         loop_body = config.get("body", {})
 
-        results = []
-        for item in items:
-            execution.context[loop_var] = item
-            result = await self._execute_tool_step(loop_body, execution)
-            results.append(result)
+        semaphore = asyncio.Semaphore(max(1, int(config.get("concurrency", 1))))
+        maps = execution.context.maps
+
+        async def run_item(item):
+            async with semaphore, execution._semaphore:
+                # Each iteration sees its own loop variable, layered below step outputs
+                context = ChainMap(maps[0], {loop_var: item}, *maps[1:])
+                return await self._execute_tool_step(
+                    loop_body, execution.model_copy(update={"context": context})
+                )
+
+        tasks = [asyncio.create_task(run_item(item)) for item in items]
+        try:
+            results = await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
 
         return {"results": results}
 
@@ -358,8 +736,12 @@ class WorkflowEngine:
         input_data = config.get("input")
 
         if transform_type == "json_parse":
-            return {"result": json.loads(input_data)}
+            if not isinstance(input_data, (str, bytes, bytearray)):
+                return {"result": input_data}  # already parsed
+            return {"result": _json_loads(input_data)}
         elif transform_type == "json_stringify":
+            # json.dumps formatting (spaced separators, ASCII escapes) is
+            # what downstream steps have always received
             return {"result": json.dumps(input_data)}
         elif transform_type == "extract":
             key = config.get("key", "")
@@ -367,7 +749,7 @@ class WorkflowEngine:
                 return {"result": input_data.get(key)}
         elif transform_type == "template":
             template = config.get("template", "")
-            return {"result": template.format(**execution.context)}
+            return {"result": template.format_map(execution.context)}
 
         return {"result": input_data}
 
@@ -389,24 +771,40 @@ class WorkflowEngine:
             timeout = config.get("timeout", 60)
             interval = config.get("interval", 1)
 
-            elapsed = 0
-            while elapsed < timeout:
+            # Re-check whenever a step finishes, and every interval regardless
+            # in case the condition depends on something outside the workflow
+            loop = asyncio.get_running_loop()
+            started = loop.time()
+            while True:
+                changed = execution._context_changed
+                elapsed = loop.time() - started
                 if self._evaluate_condition(condition, execution.context):
                     return {"condition_met": True, "elapsed": elapsed}
-                await asyncio.sleep(interval)
-                elapsed += interval
+                remaining = timeout - elapsed
+                if remaining <= 0:
+                    break
+                try:
+                    async with asyncio.timeout(min(interval, remaining)):
+                        await changed.wait()
+                except TimeoutError:
+                    pass
 
             return {"condition_met": False, "timeout": True}
 
         return {}
 
-    def _evaluate_condition(self, condition: str, context: Dict[str, Any]) -> bool:
+    def _evaluate_condition(self, condition: str, context: Mapping[str, Any]) -> bool:
         """Safely evaluate a condition expression using simpleeval"""
         try:
             # Use simpleeval for safe expression evaluation
-            # Supports: comparisons, boolean ops, arithmetic, attribute access
-            evaluator = EvalWithCompoundTypes(names=context)
-            result = evaluator.eval(condition)
+            # Supports: comparisons, boolean ops, arithmetic, attribute access.
+            # The parsed tree is cached per condition string and the evaluator
+            # is reused; evaluation is synchronous, so rebinding names is safe.
+            getter = _condition_getter(condition)
+            if getter is not None:
+                return bool(getter(context))
+            self._evaluator.names = context
+            result = self._evaluator.eval(condition, _parse_condition(condition))
             return bool(result)
         except (ValueError, TypeError, SyntaxError, KeyError) as e:
             logger.warning(f"Condition evaluation failed for '{condition}': {e}")
@@ -415,18 +813,9 @@ class WorkflowEngine:
             logger.error(f"Unexpected error evaluating condition '{condition}': {e}")
             return False
 
-    def _resolve_reference(self, reference: str, context: Dict[str, Any]) -> Any:
+    def _resolve_reference(self, reference: str, context: Mapping[str, Any]) -> Any:
         """Resolve a reference like 'step1.output.data' from context"""
-        parts = reference.split(".")
-        value = context
-
-        for part in parts:
-            if isinstance(value, dict):
-                value = value.get(part)
-            else:
-                return None
-
-        return value
+        return _compile_reference(reference)(context)
 
     def get_execution(self, execution_id: str) -> Optional[WorkflowExecution]:
         """Get execution by ID"""
@@ -1,11 +1,71 @@
-import json
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Set
 import uuid
 
+from pydantic import BaseModel, PrivateAttr
+
 from .workflow_engine import Workflow, WorkflowStep, StepType
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    import json
+    ORJSON_AVAILABLE = False
+
+
+def _dumps(data) -> str:
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(data, indent=2)
+
+
+def _loads(data):
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _read_json(file_path: Path):
+    return _loads(file_path.read_bytes())
+
+
+class WorkflowSummary(BaseModel):
+    """Listing metadata for a workflow, read without building its steps"""
+    id: str
+    name: str
+    description: str = ""
+    tags: List[str] = []
+    steps_count: int = 0
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    # Lowercased once so list() searches don't re-lower every workflow per query
+    _name_lower: str = PrivateAttr("")
+    _description_lower: str = PrivateAttr("")
+
+    def model_post_init(self, __context: Any):
+        self._name_lower = self.name.lower()
+        self._description_lower = self.description.lower()
+
+    def matches(self, search_lower: str) -> bool:
+        return search_lower in self._name_lower or search_lower in self._description_lower
+
+
+def _summarize(data: Dict[str, Any]) -> WorkflowSummary:
+    return WorkflowSummary(
+        id=data["id"],
+        name=data["name"],
+        description=data.get("description", ""),
+        tags=data.get("tags", []),
+        steps_count=len(data.get("steps", [])),
+        created_at=datetime.fromisoformat(data["created_at"]) if data.get("created_at") else None,
+        updated_at=datetime.fromisoformat(data["updated_at"]) if data.get("updated_at") else None
+    )
+
 
 class WorkflowManager:
     """
@@ -13,37 +73,114 @@ class WorkflowManager:
     Allows creating, saving, loading, and sharing workflows.
     """
 
+    # Threads used to read template files at startup
+    LOAD_WORKERS = 16
+
     def __init__(self, storage_path: str = "./data/workflows"):
         self.storage_path = Path(storage_path)
         self.storage_path.mkdir(parents=True, exist_ok=True)
-        self.workflows: Dict[str, Workflow] = {}
         self.templates: Dict[str, Workflow] = {}
+        # Workflow files are indexed at startup and parsed on first use
+        self._workflow_paths: Dict[str, Path] = {}
+        self._workflow_cache: Dict[str, Workflow] = {}
+        self._summaries: Dict[str, WorkflowSummary] = {}
+        # tag -> ids of summarized workflows carrying it
+        self._by_tag: Dict[str, Set[str]] = {}
+        # mtime of each workflow file as of when it was last indexed or written
+        self._file_mtimes: Dict[Path, float] = {}
         self._load_all()
         self._load_templates()
 
     def _load_all(self):
-        """Load all workflows from storage"""
+        """Index workflow files, dropping cached copies of files changed on disk"""
         for file_path in self.storage_path.glob("*.json"):
             if file_path.name.startswith("template_"):
                 continue
             try:
-                with open(file_path, "r") as f:
-                    data = json.load(f)
-                    workflow = self._dict_to_workflow(data)
-                    self.workflows[workflow.id] = workflow
+                mtime = file_path.stat().st_mtime
+            except OSError:
+                continue
+            if self._file_mtimes.get(file_path) == mtime:
+                continue
+            workflow_id = file_path.stem
+            self._workflow_paths[workflow_id] = file_path
+            self._file_mtimes[file_path] = mtime
+            self._workflow_cache.pop(workflow_id, None)
+            self._drop_summary(workflow_id)
+
+    def _load(self, workflow_id: str) -> Optional[Workflow]:
+        """Return a workflow, parsing its file on first access"""
+        workflow = self._workflow_cache.get(workflow_id)
+        if workflow is None:
+            file_path = self._workflow_paths.get(workflow_id)
+            if file_path is None:
+                return None
+            try:
+                workflow = self._dict_to_workflow(_read_json(file_path))
             except Exception as e:
                 print(f"Error loading workflow {file_path}: {e}")
+                return None
+            self._workflow_cache[workflow_id] = workflow
+        return workflow
 
-    def _load_templates(self):
-        """Load workflow templates"""
-        for file_path in self.storage_path.glob("template_*.json"):
+    def _set_summary(self, workflow_id: str, summary: WorkflowSummary):
+        self._drop_summary(workflow_id)
+        self._summaries[workflow_id] = summary
+        for tag in summary.tags:
+            self._by_tag.setdefault(tag, set()).add(workflow_id)
+
+    def _drop_summary(self, workflow_id: str):
+        summary = self._summaries.pop(workflow_id, None)
+        if summary is None:
+            return
+        for tag in summary.tags:
+            ids = self._by_tag.get(tag)
+            if ids is not None:
+                ids.discard(workflow_id)
+                if not ids:
+                    del self._by_tag[tag]
+
+    async def _fill_summaries(self, workflow_ids: List[str]):
+        """Build missing summaries, reading uncached workflow files concurrently"""
+        to_read = []
+        for workflow_id in workflow_ids:
+            workflow = self._workflow_cache.get(workflow_id)
+            if workflow is not None:
+                self._set_summary(workflow_id, _summarize(self._workflow_to_dict(workflow)))
+            else:
+                to_read.append((workflow_id, self._workflow_paths[workflow_id]))
+
+        mtimes = [self._file_mtimes.get(file_path) for _, file_path in to_read]
+        results = await asyncio.gather(
+            *(asyncio.to_thread(_read_json, file_path) for _, file_path in to_read),
+            return_exceptions=True
+        )
+        for (workflow_id, file_path), mtime, data in zip(to_read, mtimes, results):
+            if self._file_mtimes.get(file_path) != mtime:
+                continue  # saved or deleted while we were reading
             try:
-                with open(file_path, "r") as f:
-                    data = json.load(f)
-                    workflow = self._dict_to_workflow(data)
-                    self.templates[workflow.id] = workflow
+                if isinstance(data, BaseException):
+                    raise data
+                self._set_summary(workflow_id, _summarize(data))
             except Exception as e:
-                print(f"Error loading template {file_path}: {e}")
+                print(f"Error reading workflow {file_path}: {e}")
+
+    def reload(self):
+        """Pick up workflow files added or changed on disk"""
+        self._load_all()
+
+    def _load_templates(self):
+        """Load workflow templates, reading the files concurrently"""
+        paths = list(self.storage_path.glob("template_*.json"))
+        if paths:
+            with ThreadPoolExecutor(max_workers=min(self.LOAD_WORKERS, len(paths))) as pool:
+                futures = [pool.submit(_read_json, file_path) for file_path in paths]
+                for file_path, future in zip(paths, futures):
+                    try:
+                        workflow = self._dict_to_workflow(future.result())
+                        self.templates[workflow.id] = workflow
+                    except Exception as e:
+                        print(f"Error loading template {file_path}: {e}")
 
         # Add built-in templates
         self._add_builtin_templates()
@@ -153,7 +290,9 @@ class WorkflowManager:
                     "condition": step.condition,
                     "on_error": step.on_error,
                     "max_retries": step.max_retries,
-                    "timeout": step.timeout
+                    "timeout": step.timeout,
+                    "pure": step.pure,
+                    "cache_ttl": step.cache_ttl
                 }
                 for step in workflow.steps
             ],
@@ -162,37 +301,32 @@ class WorkflowManager:
             "created_at": workflow.created_at.isoformat() if workflow.created_at else None,
             "updated_at": workflow.updated_at.isoformat() if workflow.updated_at else None,
             "created_by": workflow.created_by,
-            "tags": workflow.tags
+            "tags": workflow.tags,
+            "parallel": workflow.parallel
         }
 
     def _dict_to_workflow(self, data: Dict[str, Any]) -> Workflow:
         """Convert dictionary to workflow"""
-        steps = []
-        for step_data in data.get("steps", []):
-            steps.append(WorkflowStep(
-                id=step_data["id"],
-                name=step_data["name"],
-                type=StepType(step_data["type"]),
-                config=step_data.get("config", {}),
-                inputs=step_data.get("inputs", {}),
-                condition=step_data.get("condition"),
-                on_error=step_data.get("on_error", "fail"),
-                max_retries=step_data.get("max_retries", 3),
-                timeout=step_data.get("timeout", 300)
-            ))
-
-        return Workflow(
-            id=data["id"],
-            name=data["name"],
-            description=data.get("description", ""),
-            version=data.get("version", "1.0"),
-            steps=steps,
-            variables=data.get("variables", {}),
-            triggers=data.get("triggers", []),
-            created_at=datetime.fromisoformat(data["created_at"]) if data.get("created_at") else None,
-            updated_at=datetime.fromisoformat(data["updated_at"]) if data.get("updated_at") else None,
-            created_by=data.get("created_by", ""),
-            tags=data.get("tags", [])
+        # Validating the nested dict in one call is cheaper than building each
+        # WorkflowStep separately. Missing timestamps fall back to the defaults.
+        data = {
+            key: value for key, value in data.items()
+            if value is not None or key not in ("created_at", "updated_at")
+        }
+        return Workflow.model_validate(data)
+
+    def _parse_step(self, step_data: Dict[str, Any]) -> WorkflowStep:
+        """Build a step from API/request data"""
+        return WorkflowStep(
+            id=step_data.get("id", str(uuid.uuid4())[:8]),
+            name=step_data["name"],
+            type=StepType(step_data["type"]),
+            config=step_data.get("config", {}),
+            inputs=step_data.get("inputs", {}),
+            condition=step_data.get("condition"),
+            on_error=step_data.get("on_error", "fail"),
+            pure=step_data.get("pure", False),
+            cache_ttl=step_data.get("cache_ttl", 0)
         )
 
     async def create(
@@ -201,22 +335,13 @@ class WorkflowManager:
         description: str = "",
         steps: List[Dict[str, Any]] = None,
         variables: Dict[str, Any] = None,
-        tags: List[str] = None
+        tags: List[str] = None,
+        parallel: bool = False
     ) -> Workflow:
         """Create a new workflow"""
         workflow_id = str(uuid.uuid4())[:12]
 
-        parsed_steps = []
-        for step_data in (steps or []):
-            parsed_steps.append(WorkflowStep(
-                id=step_data.get("id", str(uuid.uuid4())[:8]),
-                name=step_data["name"],
-                type=StepType(step_data["type"]),
-                config=step_data.get("config", {}),
-                inputs=step_data.get("inputs", {}),
-                condition=step_data.get("condition"),
-                on_error=step_data.get("on_error", "fail")
-            ))
+        parsed_steps = [self._parse_step(step_data) for step_data in (steps or [])]
 
         workflow = Workflow(
             id=workflow_id,
@@ -224,23 +349,28 @@ class WorkflowManager:
             description=description,
             steps=parsed_steps,
             variables=variables or {},
-            tags=tags or []
+            tags=tags or [],
+            parallel=parallel
         )
 
-        self.workflows[workflow_id] = workflow
+        self._workflow_cache[workflow_id] = workflow
         await self._save(workflow)
 
         return workflow
 
     async def _save(self, workflow: Workflow):
-        """Save workflow to disk"""
+        """Save workflow to disk, atomically so readers never see a partial file"""
         file_path = self.storage_path / f"{workflow.id}.json"
-        with open(file_path, "w") as f:
-            json.dump(self._workflow_to_dict(workflow), f, indent=2)
+        tmp_path = file_path.with_suffix(".json.tmp")
+        tmp_path.write_text(_dumps(self._workflow_to_dict(workflow)))
+        os.replace(tmp_path, file_path)
+        self._file_mtimes[file_path] = file_path.stat().st_mtime
+        self._workflow_paths[workflow.id] = file_path
+        self._drop_summary(workflow.id)
 
     async def get(self, workflow_id: str) -> Optional[Workflow]:
         """Get workflow by ID"""
-        return self.workflows.get(workflow_id)
+        return self._load(workflow_id)
 
     async def update(
         self,
@@ -248,30 +378,34 @@ class WorkflowManager:
         name: str = None,
         description: str = None,
         steps: List[Dict[str, Any]] = None,
-        variables: Dict[str, Any] = None
+        variables: Dict[str, Any] = None,
+        parallel: bool = None
     ) -> Optional[Workflow]:
         """Update an existing workflow"""
-        workflow = self.workflows.get(workflow_id)
+        workflow = self._load(workflow_id)
         if not workflow:
             return None
 
-        if name:
+        changed = False
+        if name and name != workflow.name:
             workflow.name = name
-        if description:
+            changed = True
+        if description and description != workflow.description:
             workflow.description = description
-        if variables:
+            changed = True
+        if variables and variables != workflow.variables:
             workflow.variables = variables
+            changed = True
+        if parallel is not None and parallel != workflow.parallel:
+            workflow.parallel = parallel
+            changed = True
         if steps:
-            workflow.steps = [
-                WorkflowStep(
-                    id=s.get("id", str(uuid.uuid4())[:8]),
-                    name=s["name"],
-                    type=StepType(s["type"]),
-                    config=s.get("config", {}),
-                    inputs=s.get("inputs", {})
-                )
-                for s in steps
-            ]
+            changed = True
+            workflow.steps = [self._parse_step(s) for s in steps]
+
+        if not changed:
+            # Nothing to persist; keep the version and skip the rewrite
+            return workflow
 
         workflow.updated_at = datetime.now()
         workflow.version = self._increment_version(workflow.version)
@@ -288,12 +422,13 @@ class WorkflowManager:
 
     async def delete(self, workflow_id: str) -> bool:
         """Delete a workflow"""
-        if workflow_id not in self.workflows:
+        file_path = self._workflow_paths.pop(workflow_id, None)
+        if file_path is None:
             return False
 
-        del self.workflows[workflow_id]
-
-        file_path = self.storage_path / f"{workflow_id}.json"
+        self._workflow_cache.pop(workflow_id, None)
+        self._drop_summary(workflow_id)
+        self._file_mtimes.pop(file_path, None)
         if file_path.exists():
             file_path.unlink()
 
@@ -303,19 +438,23 @@ class WorkflowManager:
         self,
         tags: List[str] = None,
         search: str = None
-    ) -> List[Workflow]:
+    ) -> List[WorkflowSummary]:
         """List workflows with optional filtering"""
-        results = list(self.workflows.values())
+        if len(self._summaries) < len(self._workflow_paths):
+            await self._fill_summaries([
+                workflow_id for workflow_id in self._workflow_paths
+                if workflow_id not in self._summaries
+            ])
 
         if tags:
-            results = [w for w in results if any(t in w.tags for t in tags)]
+            ids = set().union(*(self._by_tag.get(tag, ()) for tag in tags))
+            results = [self._summaries[workflow_id] for workflow_id in ids]
+        else:
+            results = list(self._summaries.values())
 
         if search:
             search_lower = search.lower()
-            results = [
-                w for w in results
-                if search_lower in w.name.lower() or search_lower in w.description.lower()
-            ]
+            results = [w for w in results if w.matches(search_lower)]
 
         return sorted(results, key=lambda w: w.updated_at or w.created_at, reverse=True)
 
@@ -353,21 +492,21 @@ class WorkflowManager:
 
     async def export(self, workflow_id: str) -> Optional[str]:
         """Export workflow as JSON string"""
-        workflow = self.workflows.get(workflow_id)
+        workflow = self._load(workflow_id)
         if not workflow:
             return None
-        return json.dumps(self._workflow_to_dict(workflow), indent=2)
+        return _dumps(self._workflow_to_dict(workflow))
 
     async def import_workflow(self, json_str: str) -> Workflow:
         """Import workflow from JSON string"""
-        data = json.loads(json_str)
+        data = _loads(json_str)
         # Generate new ID to avoid conflicts
         data["id"] = str(uuid.uuid4())[:12]
         data["created_at"] = datetime.now().isoformat()
         data["updated_at"] = datetime.now().isoformat()
 
         workflow = self._dict_to_workflow(data)
-        self.workflows[workflow.id] = workflow
+        self._workflow_cache[workflow.id] = workflow
         await self._save(workflow)
 
         return workflow